@@ -3,6 +3,7 @@ import numpy as np
 from numpy.core.multiarray import array as array
 import plotly.graph_objects as go
 
+from collections import deque
 from datetime import datetime
 from logging import getLogger
 from typing import NamedTuple
@@ -12,6 +13,7 @@ from quantfreedom.indicators.tv_indicators import rsi_tv
 from quantfreedom.enums import CandleBodyType
 from quantfreedom.strategies.strategy import Strategy
 from quantfreedom.email_sender import EmailSender
+from stream_indicator import StreamingRSI, new_candle_rows
 
 
 logger = getLogger("info")
@@ -232,21 +234,39 @@ class RSIRisingFalling(Strategy):
             rsi_is_below=self.rsi_is_below,
             rsi_length=self.rsi_length,
         )
+        self.last_live_timestamp = None
 
         logger.info("live_set_ind_settings finished")
 
+    def live_update_indicators(
+        self,
+        candles: np.array,
+    ):
+        new_candles, rebuild = new_candle_rows(
+            candles=candles,
+            last_timestamp=self.last_live_timestamp,
+        )
+        if rebuild:
+            logger.info(f"Warming up live rsi on {new_candles.shape[0]} candles")
+            self.live_rsi = StreamingRSI(length=self.rsi_length)
+            # get_strategy_plot_filename plots the last 50 rsi values
+            self.live_rsi_values = deque(maxlen=50)
+
+        for close in new_candles[:, CandleBodyType.Close]:
+            self.live_rsi_values.append(round(self.live_rsi.update(close), 1))
+
+        if new_candles.shape[0] > 0:
+            self.last_live_timestamp = new_candles[-1, CandleBodyType.Timestamp]
+
+        self.rsi = np.array(self.live_rsi_values)
+
     def long_live_evaluate(
         self,
         candles: np.array,
     ):
         try:
-            rsi = rsi_tv(
-                source=candles[:, CandleBodyType.Close],
-                length=self.rsi_length,
-            )
-
-            self.rsi = np.around(rsi, 1)
-            logger.info(f"Created RSI rsi_length= {self.rsi_length}")
+            self.live_update_indicators(candles=candles)
+            logger.info(f"Updated RSI rsi_length= {self.rsi_length}")
 
             current_rsi = self.rsi[-1]
             prev_rsi = self.rsi[-2]
@@ -278,13 +298,8 @@ class RSIRisingFalling(Strategy):
         candles: np.array,
     ):
         try:
-            rsi = rsi_tv(
-                source=candles[:, CandleBodyType.Close],
-                length=self.rsi_length,
-            )
-
-            self.rsi = np.around(rsi, 1)
-            logger.info(f"Created RSI rsi_length= {self.rsi_length}")
+            self.live_update_indicators(candles=candles)
+            logger.info(f"Updated RSI rsi_length= {self.rsi_length}")
 
             current_rsi = self.rsi[-1]
             prev_rsi = self.rsi[-2]
@@ -11,6 +11,7 @@ from typing import NamedTuple
 from quantfreedom.helper_funcs import cart_product
 from quantfreedom.indicators.tv_indicators import macd_tv, ema_tv,rsi_tv,sma_tv
 from quantfreedom.enums import CandleBodyType
+from quantfreedom.indicators.signal_filters import any_below
 from quantfreedom.strategies.strategy import Strategy
 
 logger = getLogger("info")
@@ -172,10 +173,8 @@ class MacdCrossAndRSIOver(Strategy):
             macd_below_number = self.macd < self.macd_below
             
             look_back = 10
-            has_recent_oversold_rsi = np.zeros_like(self.closing_prices, dtype=bool)  # Initialize as False
-            for i in range(look_back, len(rsi)):
-                window = rsi[i - look_back: i]
-                has_recent_oversold_rsi[i] = np.any(window < self.rsi_is_below)    
+            # any rsi below rsi_is_below in the look_back bars before this one
+            has_recent_oversold_rsi = any_below(values=rsi, threshold=self.rsi_is_below, window=look_back, lag=1)    
                 
             volume_above_ma = self.volume > self.ma_volume
             
@@ -11,6 +11,10 @@ from typing import NamedTuple
 from quantfreedom.helper_funcs import cart_product
 from quantfreedom.indicators.tv_indicators import macd_tv, ema_tv,rsi_tv,sma_tv
 from quantfreedom.enums import CandleBodyType
+from quantfreedom.indicators.signal_filters import any_above, any_below
+from quantfreedom.indicators.indicator_cache import indicator_cache
+from quantfreedom.indicators.batch_tv_indicators import ema_tv_batch, macd_tv_batch, rsi_tv_batch
+from quantfreedom.entries_matrix import EntriesExitsMatrix, empty_entries_exits_matrix, set_entries_exits_rows
 from quantfreedom.strategies.strategy import Strategy
 
 logger = getLogger("info")
@@ -89,6 +93,7 @@ class MacdCrossAndRSIOver(Strategy):
             self.log_indicator_settings = self.long_log_indicator_settings
             self.entry_message = self.long_entry_message
             self.live_evalutate = self.long_live_evaluate
+            self.entries_exits_matrix = self.long_entries_exits_matrix
             self.chart_title = "Long Signal"
         else:
             self.set_entries_exits_array = self.short_set_entries_exits_array
@@ -139,13 +144,16 @@ class MacdCrossAndRSIOver(Strategy):
                 slow_length= self.slow_length,
             )
             
-            self.ma_volume = sma_tv(
+            # same candles and lengths across most of the grid so these come out of the cache
+            self.ma_volume = indicator_cache.get(
+                sma_tv,
                 source=self.volume,
-                length=30
+                length=30,
             )
 
-            rsi = rsi_tv(
-                source=candles[:, CandleBodyType.Close],
+            rsi = indicator_cache.get(
+                rsi_tv,
+                source=self.closing_prices,
                 length=self.rsi_length,
             )
 
@@ -154,14 +162,16 @@ class MacdCrossAndRSIOver(Strategy):
             
             is_below = self.rsi < self.rsi_is_below
             
-            self.histogram, self.macd, self.signal = macd_tv(
+            self.histogram, self.macd, self.signal = indicator_cache.get(
+                macd_tv,
                 source=self.closing_prices,
                 fast_length=self.fast_length,
                 slow_length=self.slow_length,
                 signal_smoothing=self.signal_smoothing,
             )
 
-            self.ema = ema_tv(
+            self.ema = indicator_cache.get(
+                ema_tv,
                 source=self.closing_prices,
                 length=self.ema_length,
             )
@@ -178,20 +188,14 @@ class MacdCrossAndRSIOver(Strategy):
             macd_below_number = self.macd < self.macd_below
             
             look_back = 10            
-            has_recent_oversold_rsi = np.zeros_like(self.closing_prices, dtype=bool)  # Initialize as False
-            for i in range(look_back, len(rsi)):
-                window = rsi[i - look_back: i]
-                has_recent_oversold_rsi[i] = np.any(window < self.rsi_is_below)
+            # any rsi below rsi_is_below in the look_back bars before this one
+            has_recent_oversold_rsi = any_below(values=rsi, threshold=self.rsi_is_below, window=look_back, lag=1)
                 
             look_back_ema = 48
-            has_close_above_ema = np.zeros_like(self.closing_prices, dtype=bool)  # Initialize as False
+            # any close above this bar's ema in the look_back_ema bars before this one
+            has_close_above_ema = any_above(values=self.closing_prices, threshold=self.ema, window=look_back_ema, lag=1)
             # Ensure you have at least 48 candles of data 
-            if len(self.closing_prices) >= look_back_ema:                
-                for i in range(look_back_ema, len(self.closing_prices)):
-                    tmp = self.closing_prices[i - look_back_ema: i]
-                    ema_value = self.ema[i]
-                    has_close_above_ema[i] = np.any(tmp > ema_value) 
-            else:
+            if len(self.closing_prices) < look_back_ema:
                 # Handle the case where you don't have enough data yet 
                 print("Not enough candles for calculation")   
                 
@@ -268,6 +272,91 @@ class MacdCrossAndRSIOver(Strategy):
             f"Entry time!!! {self.rsi[bar_index-2]} > {self.rsi[bar_index-1]} < {self.rsi[bar_index]} and {self.rsi[bar_index]} < {self.rsi_is_below}"
         )
         
+    def long_entries_exits_matrix(
+        self,
+        candles: np.array,
+        chunk_size: int = 256,
+    ) -> EntriesExitsMatrix:
+        """
+        Entries of long_set_entries_exits_array for every indicator setting in one call, nothing is set on the strategy
+
+        Every distinct rsi, ema and macd setting is only worked out once, then the entries are put together
+        chunk_size settings at a time and packed so the whole grid only ever keeps 1 bit per bar per setting.
+        There are no exit signals so the exits matrix is empty.
+        """
+        try:
+            closing_prices = candles[:, CandleBodyType.Close]
+            volume = candles[:, CandleBodyType.Volume]
+            settings = self.indicator_settings_arrays
+            total_ind_sets = settings.rsi_length.size
+
+            volume_above_ma = volume > sma_tv(source=volume, length=30)
+
+            look_back = 10
+            rsi_pairs, rsi_rows = np.unique(
+                np.column_stack((settings.rsi_length, settings.rsi_is_below)),
+                axis=0,
+                return_inverse=True,
+            )
+            rsi_lengths, rsi_length_rows = np.unique(rsi_pairs[:, 0].astype(np.int_), return_inverse=True)
+            rsi = rsi_tv_batch(source=closing_prices, length=rsi_lengths)
+            has_recent_oversold_rsi = np.stack(
+                [
+                    any_below(values=rsi[length_row], threshold=rsi_is_below, window=look_back, lag=1)
+                    for length_row, rsi_is_below in zip(rsi_length_rows.reshape(-1), rsi_pairs[:, 1])
+                ]
+            )
+
+            look_back_ema = 48
+            ema_lengths, ema_rows = np.unique(settings.ema_length, return_inverse=True)
+            has_close_above_ema = np.stack(
+                [
+                    any_above(values=closing_prices, threshold=ema, window=look_back_ema, lag=1)
+                    for ema in ema_tv_batch(source=closing_prices, length=ema_lengths)
+                ]
+            )
+
+            macd_settings, macd_rows = np.unique(
+                np.column_stack((settings.fast_length, settings.slow_length, settings.signal_smoothing)),
+                axis=0,
+                return_inverse=True,
+            )
+            _, macd, signal = macd_tv_batch(
+                source=closing_prices,
+                fast_length=macd_settings[:, 0],
+                slow_length=macd_settings[:, 1],
+                signal_smoothing=macd_settings[:, 2],
+            )
+            prev_macd = np.full_like(macd, np.nan)
+            prev_macd[:, 1:] = macd[:, :-1]
+            prev_signal = np.full_like(signal, np.nan)
+            prev_signal[:, 1:] = signal[:, :-1]
+            macd_cross = (macd > signal) & (prev_macd < prev_signal)
+
+            rsi_rows = rsi_rows.reshape(-1)
+            ema_rows = ema_rows.reshape(-1)
+            macd_rows = macd_rows.reshape(-1)
+
+            matrix = empty_entries_exits_matrix(n_ind_sets=total_ind_sets, n_bars=closing_prices.size)
+            for first in range(0, total_ind_sets, chunk_size):
+                rows = slice(first, min(first + chunk_size, total_ind_sets))
+                entries = (
+                    macd_cross[macd_rows[rows]]
+                    & has_recent_oversold_rsi[rsi_rows[rows]]
+                    & has_close_above_ema[ema_rows[rows]]
+                    & volume_above_ma
+                )
+                set_entries_exits_rows(
+                    matrix=matrix,
+                    first_ind_set_index=first,
+                    entries=entries,
+                    exits=np.zeros_like(entries),
+                )
+            return matrix
+        except Exception as e:
+            logger.error(f"Exception long_entries_exits_matrix -> {e}")
+            raise Exception(f"Exception long_entries_exits_matrix -> {e}")
+
     #######################################################
     #######################################################
     ####################     Plot     #####################
@@ -4,6 +4,7 @@ from numpy.core.multiarray import array as array
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from collections import deque
 from datetime import datetime
 from logging import getLogger
 from typing import NamedTuple
@@ -11,8 +12,18 @@ from typing import NamedTuple
 from quantfreedom.helper_funcs import cart_product
 from quantfreedom.indicators.tv_indicators import macd_tv, ema_tv,rsi_tv,sma_tv
 from quantfreedom.enums import CandleBodyType
+from quantfreedom.indicators.signal_filters import any_below
 from quantfreedom.strategies.strategy import Strategy
 from quantfreedom.email_sender import EmailSender
+from stream_indicator import (
+    RollingCount,
+    StreamingEMA,
+    StreamingExtremum,
+    StreamingMACD,
+    StreamingRSI,
+    StreamingSMA,
+    new_candle_rows,
+)
 
 logger = getLogger("info")
 
@@ -95,6 +106,10 @@ class MacdCrossAndRSIOver(Strategy):
             self.entry_message = self.short_entry_message
             self.live_evaluate = self.short_live_evaluate
             self.chart_title = "short Signal"
+
+        # rsi and close above ema look backs used by live_evaluate
+        self.look_back = 10
+        self.look_back_ema = 48
             
     #######################################################
     #######################################################
@@ -176,10 +191,8 @@ class MacdCrossAndRSIOver(Strategy):
             macd_below_number = self.macd < self.macd_below
             
             look_back = 10
-            has_recent_oversold_rsi = np.zeros_like(self.closing_prices, dtype=bool)  # Initialize as False
-            for i in range(look_back, len(rsi)):
-                window = rsi[i - look_back: i]
-                has_recent_oversold_rsi[i] = np.any(window < self.rsi_is_below)    
+            # any rsi below rsi_is_below in the look_back bars before this one
+            has_recent_oversold_rsi = any_below(values=rsi, threshold=self.rsi_is_below, window=look_back, lag=1)    
                 
             volume_above_ma = self.volume > self.ma_volume
             
@@ -279,85 +292,95 @@ class MacdCrossAndRSIOver(Strategy):
                 signal_smoothing= self.signal_smoothing,
                 slow_length= self.slow_length,
             )
+        self.last_live_timestamp = None
         logger.info("live_set_ind_settings finished")
 
+    def live_reset_indicators(
+        self,
+        window_size: int,
+    ):
+        self.live_ma_volume = StreamingSMA(length=30)
+        self.live_rsi = StreamingRSI(length=self.rsi_length)
+        self.live_macd = StreamingMACD(
+            fast_length=self.fast_length,
+            slow_length=self.slow_length,
+            signal_smoothing=self.signal_smoothing,
+        )
+        self.live_ema = StreamingEMA(length=self.ema_length)
+        self.live_rsi_values = deque(maxlen=self.look_back)
+        self.live_macd_values = deque(maxlen=2)
+        self.live_signal_values = deque(maxlen=2)
+        # highest close of the look_back_ema bars before the current one
+        self.live_prev_closes_max = StreamingExtremum(length=self.look_back_ema)
+        # the full window version checks every bar from look_back_ema to the end of the window
+        self.live_close_above_ema_count = RollingCount(length=max(window_size - self.look_back_ema, 1))
+        self.live_volume = np.nan
+
+    def live_update_indicators(
+        self,
+        candles: np.array,
+    ):
+        new_candles, rebuild = new_candle_rows(candles=candles, last_timestamp=self.last_live_timestamp)
+        if rebuild:
+            logger.info(f"Warming up live indicators on {new_candles.shape[0]} candles")
+            self.live_reset_indicators(window_size=candles.shape[0])
+
+        for candle in new_candles:
+            close = candle[CandleBodyType.Close]
+            self.live_volume = candle[CandleBodyType.Volume]
+
+            self.live_ma_volume.update(self.live_volume)
+            self.live_rsi_values.append(round(self.live_rsi.update(close), 1))
+            _, macd, signal = self.live_macd.update(close)
+            self.live_macd_values.append(macd)
+            self.live_signal_values.append(signal)
+
+            ema_value = self.live_ema.update(close)
+            if self.live_prev_closes_max.index >= self.look_back_ema - 1:
+                self.live_close_above_ema_count.update(self.live_prev_closes_max.value > ema_value)
+            self.live_prev_closes_max.update(close)
+
+        if new_candles.shape[0] > 0:
+            self.last_live_timestamp = new_candles[-1, CandleBodyType.Timestamp]
+
     def long_live_evaluate(
         self,
         candles: np.array,
     ):
         print("long_live_evaluate")
         try:            
-            self.open_prices = candles[:,CandleBodyType.Open]
-            self.closing_prices = candles[:, CandleBodyType.Close]
-            self.low_prices = candles[:, CandleBodyType.Low]
-            self.volume = candles[:,CandleBodyType.Volume]
-            
-            
-            self.ma_volume = sma_tv(
-                source=self.volume,
-                length=30
-            )
-                        
-            rsi = rsi_tv(
-                source=candles[:, CandleBodyType.Close],
-                length=self.rsi_length,
-            )
-
-            self.rsi = np.around(rsi, 1)
-                        
-
-            current_rsi = self.rsi[-1]
-            prev_rsi = self.rsi[-2]
-            prev_prev_rsi = self.rsi[-3]
-            
-            self.histogram, self.macd, self.signal = macd_tv(
-                source=self.closing_prices,
-                fast_length=self.fast_length,
-                slow_length=self.slow_length,
-                signal_smoothing=self.signal_smoothing,
-            )            
-            self.ema = ema_tv(
-                source=self.closing_prices,
-                length=self.ema_length,
-            )
-                        
-            
+            self.live_update_indicators(candles=candles)
+            ma_volume = self.live_ma_volume.value
             
-            prev_macd = self.macd[-2]
-            prev_signal = self.signal[-2]
+            prev_macd = self.live_macd_values[-2]
+            prev_signal = self.live_signal_values[-2]
+            current_macd = self.live_macd_values[-1]
+            current_signal = self.live_signal_values[-1]
 
             macd_below_signal = prev_macd < prev_signal
-            macd_above_signal = self.macd[-1] > self.signal[-1]
+            macd_above_signal = current_macd > current_signal
             # low_price_below_ema = low_prices > self.ema
-            macd_below_number = self.macd[-1] < self.macd_below
+            macd_below_number = current_macd < self.macd_below
                         
-            look_back = 10
-            has_recent_oversold_rsi = np.any(self.rsi[-look_back:] < self.rsi_is_below)
+            look_back = self.look_back
+            has_recent_oversold_rsi = any(rsi < self.rsi_is_below for rsi in self.live_rsi_values)
             
-            look_back_ema = 48
+            look_back_ema = self.look_back_ema
             # Ensure you have at least 48 candles of data 
-            if len(self.closing_prices) >= look_back_ema:                
-                has_close_above_ema = False  # Initialize
-
-                for i in range(look_back_ema, len(self.closing_prices)):
-                    tmp = self.closing_prices[i - look_back_ema: i]
-                    ema_value = self.ema[i]
-                    if np.any(tmp > ema_value):
-                        has_close_above_ema = True 
-                        break  # Exit the loop early if the condition is met
-
+            if candles.shape[0] >= look_back_ema:                
+                has_close_above_ema = self.live_close_above_ema_count.count > 0
             else:
                     # Handle the case where you don't have enough data yet 
                     has_close_above_ema = False
                     print("Not enough candles for calculation")
                                               
-            volume_above_ma = self.volume[-1] > self.ma_volume[-1]
+            volume_above_ma = self.live_volume > ma_volume
             
-            logger.info(f"Created RSI rsi_length= {self.rsi_length}")
+            logger.info(f"Updated RSI rsi_length= {self.rsi_length}")
             logger.info(f"macd_below_signal= {prev_macd} < {prev_signal} {macd_below_signal}")
-            logger.info(f"macd_above_signal= {self.macd[-1]} > {self.signal[-1]} {macd_above_signal}")
-            logger.info(f"volume_above_ma= {self.volume[-1]} > {self.ma_volume[-1]} {volume_above_ma}")
-            # logger.info(f"macd_below_number= {self.macd[-1]} < {self.macd_below} {macd_below_number}")
+            logger.info(f"macd_above_signal= {current_macd} > {current_signal} {macd_above_signal}")
+            logger.info(f"volume_above_ma= {self.live_volume} > {ma_volume} {volume_above_ma}")
+            # logger.info(f"macd_below_number= {current_macd} < {self.macd_below} {macd_below_number}")
             logger.info(f"has_recent_oversold_rsi= look_back {look_back} {has_recent_oversold_rsi}")
             logger.info(f"has_close_above_ema= look_back_ema {look_back_ema} {has_close_above_ema}")
             
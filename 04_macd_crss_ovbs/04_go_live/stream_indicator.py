@@ -0,0 +1,310 @@
+import numpy as np
+
+from collections import deque
+
+from quantfreedom.enums import CandleBodyType
+
+
+def new_candle_rows(
+    candles: np.array,
+    last_timestamp: float,
+):
+    """Finds the candles that have not been fed to the streaming indicators yet.
+
+    Args:
+        candles (np.array): 2-D candle array in CandleBodyType column order.
+        last_timestamp (float): Timestamp of the last candle already fed, None if nothing was fed.
+
+    Returns:
+        tuple: the new candle rows and True when the indicators have to be rebuilt
+        from all of the candles (first call, or the last fed candle is no longer in the window).
+    """
+    if last_timestamp is None:
+        return candles, True
+
+    timestamps = candles[:, CandleBodyType.Timestamp]
+    start = int(np.searchsorted(timestamps, last_timestamp, side="right"))
+    if start == 0 or timestamps[start - 1] != last_timestamp:
+        return candles, True
+
+    return candles[start:], False
+
+
+class StreamingSMA:
+    """Simple moving average over the last `length` values kept as a running sum."""
+
+    def __init__(
+        self,
+        length: int,
+    ) -> None:
+        self.length = int(length)
+        self.window = deque(maxlen=self.length)
+        self.total = 0.0
+        self.updates = 0
+        self.value = np.nan
+
+    def update(
+        self,
+        new_value: float,
+    ):
+        if len(self.window) == self.length:
+            self.total -= self.window[0]
+        self.window.append(new_value)
+        self.total += new_value
+        self.updates += 1
+
+        # re-sum once per full window so float drift from the running sum can't build up
+        if self.updates % self.length == 0:
+            self.total = float(np.sum(self.window))
+
+        if len(self.window) == self.length:
+            self.value = self.total / self.length
+        return self.value
+
+
+class StreamingEMA:
+    """Recursive moving average seeded with the SMA of the first `length` values.
+
+    alpha defaults to 2 / (length + 1) (EMA), pass 1 / length for Wilder's RMA.
+    """
+
+    def __init__(
+        self,
+        length: int,
+        alpha: float = None,
+    ) -> None:
+        self.length = int(length)
+        self.alpha = 2 / (self.length + 1) if alpha is None else alpha
+        self.seed_total = 0.0
+        self.seed_count = 0
+        self.value = np.nan
+
+    def update(
+        self,
+        new_value: float,
+    ):
+        if self.seed_count < self.length:
+            self.seed_total += new_value
+            self.seed_count += 1
+            if self.seed_count == self.length:
+                self.value = self.seed_total / self.length
+        else:
+            self.value = self.alpha * new_value + (1 - self.alpha) * self.value
+        return self.value
+
+
+class StreamingRMA(StreamingEMA):
+    """Wilder's moving average (alpha = 1 / length) as used by rsi and atr."""
+
+    def __init__(
+        self,
+        length: int,
+    ) -> None:
+        super().__init__(length=length, alpha=1 / length)
+
+
+class StreamingRSI:
+    """TradingView style RSI: RMA of the close to close gains and losses."""
+
+    def __init__(
+        self,
+        length: int,
+    ) -> None:
+        self.avg_gain = StreamingRMA(length=length)
+        self.avg_loss = StreamingRMA(length=length)
+        self.prev_close = np.nan
+        self.value = np.nan
+
+    def update(
+        self,
+        close: float,
+    ):
+        if not np.isnan(self.prev_close):
+            change = close - self.prev_close
+            up = self.avg_gain.update(max(change, 0.0))
+            down = self.avg_loss.update(max(-change, 0.0))
+            if not np.isnan(up):
+                if down == 0:
+                    self.value = 100.0
+                elif up == 0:
+                    self.value = 0.0
+                else:
+                    self.value = 100 - (100 / (1 + up / down))
+        self.prev_close = close
+        return self.value
+
+
+class StreamingMACD:
+    """MACD line, signal line and histogram from two EMAs and an EMA of the MACD line."""
+
+    def __init__(
+        self,
+        fast_length: int,
+        slow_length: int,
+        signal_smoothing: int,
+    ) -> None:
+        self.fast_ema = StreamingEMA(length=fast_length)
+        self.slow_ema = StreamingEMA(length=slow_length)
+        self.signal_ema = StreamingEMA(length=signal_smoothing)
+        self.macd = np.nan
+        self.signal = np.nan
+        self.histogram = np.nan
+
+    def update(
+        self,
+        close: float,
+    ):
+        fast = self.fast_ema.update(close)
+        slow = self.slow_ema.update(close)
+        self.macd = fast - slow
+        if not np.isnan(self.macd):
+            self.signal = self.signal_ema.update(self.macd)
+            self.histogram = self.macd - self.signal
+        return self.histogram, self.macd, self.signal
+
+
+class StreamingATR:
+    """Average true range with Wilder smoothing, same seeding as indicator.atr."""
+
+    def __init__(
+        self,
+        length: int,
+    ) -> None:
+        self.rma = StreamingRMA(length=length)
+        self.prev_close = np.nan
+        self.value = np.nan
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+    ):
+        if np.isnan(self.prev_close):
+            true_range = 0.0  # first bar has no previous close
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.value = self.rma.update(true_range)
+        return self.value
+
+
+class StreamingExtremum:
+    """Max (or min) of the last `length` values using a monotonic deque."""
+
+    def __init__(
+        self,
+        length: int,
+        is_max: bool = True,
+    ) -> None:
+        self.length = int(length)
+        self.is_max = is_max
+        self.window = deque()
+        self.index = -1
+        self.value = np.nan
+
+    def update(
+        self,
+        new_value: float,
+    ):
+        self.index += 1
+        if self.is_max:
+            while self.window and self.window[-1][1] <= new_value:
+                self.window.pop()
+        else:
+            while self.window and self.window[-1][1] >= new_value:
+                self.window.pop()
+        self.window.append((self.index, new_value))
+
+        if self.window[0][0] <= self.index - self.length:
+            self.window.popleft()
+
+        if self.index >= self.length - 1:
+            self.value = self.window[0][1]
+        return self.value
+
+
+class StreamingDonchian:
+    """Donchian channel fed one candle at a time, same output as indicator.donchian_channels."""
+
+    def __init__(
+        self,
+        period: int,
+        legacy_upper: bool = True,
+    ) -> None:
+        self.period = int(period)
+        # the legacy upper band looks at period + 1 highs and both bands start at bar index period
+        self.first_index = self.period if legacy_upper else self.period - 1
+        self.highest = StreamingExtremum(length=self.period + 1 if legacy_upper else self.period)
+        self.lowest = StreamingExtremum(length=self.period, is_max=False)
+        self.bars = 0
+        self.basis = np.nan
+        self.upper = np.nan
+        self.lower = np.nan
+
+    def update(
+        self,
+        high: float,
+        low: float,
+    ):
+        upper = self.highest.update(high)
+        lower = self.lowest.update(low)
+        if self.bars >= self.first_index:
+            self.upper = upper
+            self.lower = lower
+            self.basis = (upper + lower) / 2
+        self.bars += 1
+        return self.basis, self.upper, self.lower
+
+
+class StreamingLWTI:
+    """Larry Williams Large Trade Index with EMA averaging, same formula as indicator.lwti."""
+
+    def __init__(
+        self,
+        period: int,
+    ) -> None:
+        self.closes = deque(maxlen=int(period) + 1)
+        self.ma_diff = StreamingEMA(length=period)
+        self.ma_tr = StreamingEMA(length=period)
+        self.value = 50.0
+
+    def update(
+        self,
+        high: float,
+        low: float,
+        close: float,
+    ):
+        if self.closes:
+            true_range = max(high - low, abs(high - self.closes[-1]))
+        else:
+            true_range = high - low
+        self.closes.append(close)
+        ma_tr = self.ma_tr.update(true_range)
+
+        if len(self.closes) == self.closes.maxlen:
+            ma_diff = self.ma_diff.update(close - self.closes[0])
+            if not np.isnan(ma_diff) and ma_tr != 0:
+                self.value = (ma_diff / ma_tr) * 50 + 50
+        return self.value
+
+
+class RollingCount:
+    """Number of True values among the last `length` updates."""
+
+    def __init__(
+        self,
+        length: int,
+    ) -> None:
+        self.window = deque(maxlen=int(length))
+        self.count = 0
+
+    def update(
+        self,
+        new_value: bool,
+    ):
+        if len(self.window) == self.window.maxlen:
+            self.count -= self.window[0]
+        self.window.append(bool(new_value))
+        self.count += bool(new_value)
+        return self.count
@@ -13,6 +13,7 @@ from typing import NamedTuple
 from quantfreedom.helper_funcs import cart_product
 from quantfreedom.indicators.tv_indicators import rsi_tv
 from quantfreedom.enums import CandleBodyType
+from quantfreedom.indicators.signal_filters import cooldown_filter
 from quantfreedom.strategies.strategy import Strategy
 
 
@@ -90,21 +91,13 @@ class DonChainLWTI(Strategy):
 
             entries = np.where(price_touch_upper & lwti_uptrend & volume_above_ma & rising & rising2,True,False)
 
-            signal_history = np.zeros_like(entries)  # Array to track recent signals
+            # drop signals within filter_distance candles of the last one kept
             filter_distance = 10  # Number of candles to look back
-            for i, signal in enumerate(entries):
-                if signal:
-                    # Check for previous signals within the filter distance
-                    if np.any(signal_history[max(0, i - filter_distance):i]):
-                        entries[i] = False  # Filter out the current signal
-                    else:
-                        signal_history[i] = True  # Record this signal
-                        
-                filtered_indices = np.where(entries == True)
-                        
-                self.entry_signals = np.where(entries, self.close_prices, np.nan)
-                self.exit_prices = np.full_like(self.close_prices, np.nan)            
-                    
+            entries = cooldown_filter(signals=entries, cooldown=filter_distance)
+
+            self.entry_signals = np.where(entries, self.close_prices, np.nan)
+            self.exit_prices = np.full_like(self.close_prices, np.nan)
+
         except Exception as e:
             logger.error(f"Exception long_set_entries_exits_array -> {e}")
             raise Exception(f"Exception long_set_entries_exits_array -> {e}")
@@ -13,6 +13,9 @@ from typing import NamedTuple
 from quantfreedom.helper_funcs import cart_product
 from quantfreedom.indicators.tv_indicators import rsi_tv
 from quantfreedom.enums import CandleBodyType
+from quantfreedom.indicators.signal_filters import cooldown_filter
+from quantfreedom.indicators.indicator_cache import indicator_cache
+from quantfreedom.entries_matrix import EntriesExitsMatrix, empty_entries_exits_matrix, set_entries_exits_rows
 from quantfreedom.strategies.strategy import Strategy
 
 
@@ -46,6 +49,7 @@ class DonChainLWTI(Strategy):
             self.log_indicator_settings = self.long_log_indicator_settings
             self.entry_message = self.long_entry_message
             self.live_evalutate = self.long_live_evaluate
+            self.entries_exits_matrix = self.long_entries_exits_matrix
             self.chart_title = "Long Signal"
         else:
             self.set_entries_exits_array = self.short_set_entries_exits_array
@@ -82,12 +86,13 @@ class DonChainLWTI(Strategy):
             self.high_prices = candles[:, CandleBodyType.High];
             self.low_prices = candles[:, CandleBodyType.Low];    
             self.volume = candles[:, CandleBodyType.Volume];    
-            self.lwti_values = lwti(close=self.close_prices, high_prices=self.high_prices , low_prices=self.low_prices, period=25, smooth=True, smooth_type="EMA", smooth_period=20)              
+            # lwti and the volume ma don't depend on the period so they only get worked out once per candles
+            self.lwti_values = indicator_cache.get(lwti, close=self.close_prices, high_prices=self.high_prices , low_prices=self.low_prices, period=25, smooth=True, smooth_type="EMA", smooth_period=20)              
             
             # Calculate Donchian Channels (with an offset to handle the initial period)
             
             self.offset = self.period - 1  # Offset to skip incomplete calculations            
-            basis, upper, lower = donchian_channels(self.high_prices, self.low_prices, self.period, self.offset)
+            basis, upper, lower = indicator_cache.get(donchian_channels, high=self.high_prices, low=self.low_prices, period=self.period, offset=self.offset)
             self.offset = self.offset
             self.basis = basis
             self.upper = upper
@@ -97,7 +102,7 @@ class DonChainLWTI(Strategy):
             self.adj_basis = shift_and_pad(self.basis, shift_amount=2, num_nan=self.offset)
             self.adj_lower = shift_and_pad(self.lower, shift_amount=2, num_nan=self.offset)
             
-            ma_volume = sma(self.volume, 30)
+            ma_volume = indicator_cache.get(sma, data=self.volume, period=30)
             prev_close = np.roll(self.close_prices,1)
             prev_close[0] = np.nan
 
@@ -113,27 +118,72 @@ class DonChainLWTI(Strategy):
 
             self.entries = np.where(price_touch_upper & lwti_uptrend & volume_above_ma & rising,True,False)
 
-            signal_history = np.zeros_like(self.entries)  # Array to track recent signals
+            # drop signals within filter_distance candles of the last one kept
             filter_distance = 24  # Number of candles to look back
-            for i, signal in enumerate(self.entries):
-                if signal:
-                    # Check for previous signals within the filter distance
-                    if np.any(signal_history[max(0, i - filter_distance):i]):
-                        self.entries[i] = False  # Filter out the current signal
-                    else:
-                        signal_history[i] = True  # Record this signal
-                        
-                # filtered_indices = np.where(entries == True)
-                        
-                self.entry_signals = np.where(self.entries, self.close_prices, np.nan)
-                self.exit_prices = np.full_like(self.close_prices, np.nan)    
-                self.exit_condition = self.close_prices < self.adj_basis  
-                self.exit_prices[self.exit_condition] = self.close_prices[self.exit_condition]         
-                    
+            self.entries = cooldown_filter(signals=self.entries, cooldown=filter_distance)
+
+            self.entry_signals = np.where(self.entries, self.close_prices, np.nan)
+            self.exit_prices = np.full_like(self.close_prices, np.nan)
+            self.exit_condition = self.close_prices < self.adj_basis
+            self.exit_prices[self.exit_condition] = self.close_prices[self.exit_condition]
+
         except Exception as e:
             logger.error(f"Exception long_set_entries_exits_array -> {e}")
             raise Exception(f"Exception long_set_entries_exits_array -> {e}")
     
+    def long_entries_exits_matrix(
+        self,
+        candles: np.array,
+        chunk_size: int = 256,
+    ) -> EntriesExitsMatrix:
+        """
+        Entries and exits of long_set_entries_exits_array for every period in one call, nothing is set on the strategy
+
+        lwti, the volume ma and every donchian channel are worked out once, then each distinct period gets its
+        entries, exits and cooldown and the rows are packed chunk_size settings at a time.
+        """
+        try:
+            close_prices = candles[:, CandleBodyType.Close]
+            high_prices = candles[:, CandleBodyType.High]
+            low_prices = candles[:, CandleBodyType.Low]
+            volume = candles[:, CandleBodyType.Volume]
+            total_ind_sets = self.indicator_settings_arrays.period.size
+
+            lwti_values = indicator_cache.get(lwti, close=close_prices, high_prices=high_prices , low_prices=low_prices, period=25, smooth=True, smooth_type="EMA", smooth_period=20)
+            ma_volume = indicator_cache.get(sma, data=volume, period=30)
+            prev_close = np.roll(close_prices,1)
+            prev_close[0] = np.nan
+            signals = (lwti_values > 50) & (volume > ma_volume) & (close_prices > prev_close)
+
+            periods, period_rows = np.unique(self.indicator_settings_arrays.period, return_inverse=True)
+            # offset 0 keeps every channel the same length, each period drops its own offset below
+            basis, upper, _ = donchian_channels(high_prices, low_prices, periods, 0)
+
+            period_entries = np.zeros((periods.size, close_prices.size), dtype=np.bool_)
+            period_exits = np.zeros((periods.size, close_prices.size), dtype=np.bool_)
+            filter_distance = 24  # Number of candles to look back
+            for row, period in enumerate(periods):
+                offset = period - 1
+                adj_upper = shift_and_pad(upper[row, offset:], shift_amount=2, num_nan=offset)
+                adj_basis = shift_and_pad(basis[row, offset:], shift_amount=2, num_nan=offset)
+                period_entries[row] = cooldown_filter(signals=signals & (close_prices > adj_upper), cooldown=filter_distance)
+                period_exits[row] = close_prices < adj_basis
+
+            period_rows = period_rows.reshape(-1)
+            matrix = empty_entries_exits_matrix(n_ind_sets=total_ind_sets, n_bars=close_prices.size)
+            for first in range(0, total_ind_sets, chunk_size):
+                rows = period_rows[first : first + chunk_size]
+                set_entries_exits_rows(
+                    matrix=matrix,
+                    first_ind_set_index=first,
+                    entries=period_entries[rows],
+                    exits=period_exits[rows],
+                )
+            return matrix
+        except Exception as e:
+            logger.error(f"Exception long_entries_exits_matrix -> {e}")
+            raise Exception(f"Exception long_entries_exits_matrix -> {e}")
+
     def long_log_indicator_settings(
         self,
         ind_set_index: int,
@@ -2,62 +2,137 @@
 import numpy as np
 import ta
 
-def donchian_channels(high, low, period=96, offset=0):
-        """Calculates Donchian Channels with an offset."""
+from quantfreedom.indicators.signal_filters import rolling_max, rolling_min
 
-        upper = np.full_like(high, np.nan)  # Initialize with NaN
-        lower = np.full_like(low, np.nan)
-        basis = np.full_like(high, np.nan)
+try:
+    from scipy.signal import lfilter
+except ImportError:  # fall back to the python recursion in _recursive_filter
+    lfilter = None
 
-        for i in range(period, len(high)):
-            # Enhanced Debugging
-            # print("Iteration:", i)
-            # print("Index Range:", i - period + 1, "to", i)
-            # print("Current high slice:", high[i - period + 1:i + 1])
 
-            upper[i] = max(high[i - period: i + 1])  # Adjust from i - period + 1 
-            lower[i] = min(low[i - period + 1:i + 1])
-            basis[i] = (upper[i] + lower[i]) / 2
+def donchian_channels(high, low, period=96, offset=0, legacy_upper=True):
+    """Calculates Donchian Channels with an offset.
 
-        # print("Length of input data:", len(high), len(low))
-        # print("Length of upper array:", len(upper))
+    Args:
+        high (array-like): Array of high prices.
+        low (array-like): Array of low prices.
+        period (int or array-like): The lookback period, or a 1-D array of periods
+            to get every channel in one pass.
+        offset (int): Number of leading bars to drop from the results.
+        legacy_upper (bool): Keep the original `high[i - period: i + 1]` window on the
+            upper band (period + 1 bars) with the first value at index `period`.
+            When False every band uses `period` bars and starts at `period - 1`.
+
+    Returns:
+        tuple: basis, upper, lower. 1-D arrays for an int period, otherwise
+        (len(period), n - offset) arrays with one row per period.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    periods = np.atleast_1d(np.asarray(period, dtype=np.int_))
+
+    # one sparse table per band from signal_filters, a window with a nan bar in it is nan like np.max / np.min
+    if legacy_upper:
+        upper = rolling_max(high, periods + 1, skip_nan=False)
+        lower = rolling_min(low, periods, skip_nan=False)
+        # the original loop starts at i = period so the lower band has no value at period - 1
+        for row, p in enumerate(periods):
+            lower[row, : max(p, 0)] = np.nan
+    else:
+        upper = rolling_max(high, periods, skip_nan=False)
+        lower = rolling_min(low, periods, skip_nan=False)
+
+    basis = (upper + lower) / 2
 
-        return basis[offset:], upper[offset:].copy(), lower[offset:]
+    if np.ndim(period) == 0:
+        return basis[0, offset:], upper[0, offset:], lower[0, offset:]
+    return basis[:, offset:], upper[:, offset:], lower[:, offset:]
     
+def _as_batch(data, period):
+    """Turns data/period into a 2-D (rows, n_bars) float array and a period per row.
+
+    1-D data with an array of periods is repeated once per period, 2-D data is one
+    series per row and takes either one period or one period per row.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    periods = np.atleast_1d(np.asarray(period, dtype=np.int_))
+    single = data.ndim == 1 and np.ndim(period) == 0
+    if data.ndim == 1:
+        data = np.broadcast_to(data, (periods.shape[0], data.shape[0]))
+    if periods.shape[0] == 1:
+        periods = np.full(data.shape[0], periods[0])
+    if periods.shape[0] != data.shape[0]:
+        raise ValueError(f"Got {periods.shape[0]} periods for {data.shape[0]} series")
+    return data, periods, single
+
+
+def _recursive_filter(data, alpha, seed):
+    """y[i] = alpha * data[i] + (1 - alpha) * y[i - 1] with y[-1] = seed, along the last axis."""
+    if lfilter is not None:
+        zi = np.reshape((1 - alpha) * seed, np.shape(seed) + (1,))
+        return lfilter([alpha], [1.0, alpha - 1.0], data, axis=-1, zi=zi)[0]
+
+    out = np.empty_like(data)
+    prev = seed
+    for i in range(data.shape[-1]):
+        prev = alpha * data[..., i] + (1 - alpha) * prev
+        out[..., i] = prev
+    return out
+
+
+def _seeded_recursion(data, periods, alpha):
+    """Runs the SMA seeded recursive filter used by ema and atr for every row."""
+    values = np.zeros(data.shape)
+    for row, p in enumerate(periods):
+        values[row, p - 1] = data[row, :p].mean()  # Initial simple average
+        values[row, p:] = _recursive_filter(data[row, p:], alpha[row], values[row, p - 1])
+    return values
+
+
 def ema(data, period):
     """Calculates the Exponential Moving Average (EMA).
 
     Args:
-        data (array-like): Array of values  
-        period (int): The smoothing period.
+        data (array-like): Array of values, or a 2-D array with one series per row.
+        period (int or array-like): The smoothing period, or a 1-D array of periods.
 
     Returns:
-        array-like: The calculated EMA values.
+        array-like: The calculated EMA values, 2-D with one row per series/period
+        when more than one is given. Bars before period - 1 are 0.
     """
-    alpha = 2 / (period + 1)  # Smoothing factor
-    ema_values = np.zeros_like(data)
-    ema_values[period - 1] = np.mean(data[:period])  # Initial simple average
+    data, periods, single = _as_batch(data, period)
+    alpha = 2 / (periods + 1)  # Smoothing factor
+    ema_values = _seeded_recursion(data, periods, alpha)
 
-    for i in range(period, len(data)):
-        ema_values[i] = alpha * data[i] + (1 - alpha) * ema_values[i - 1]
+    return ema_values[0] if single else ema_values
 
-    return ema_values
 
 def sma(data, period):
     """Calculates the Simple Moving Average (SMA).
 
     Args:
-        data (array-like): Array of values.
-        period (int): The smoothing period.
+        data (array-like): Array of values, or a 2-D array with one series per row.
+        period (int or array-like): The smoothing period, or a 1-D array of periods.
 
     Returns:
-        array-like: The calculated SMA values.
+        array-like: The calculated SMA values, 2-D with one row per series/period
+        when more than one is given. Bars before period - 1 are 0, a window with a
+        NaN in it is NaN.
     """
-    sma_values = np.zeros_like(data)
-    for i in range(period - 1, len(data)):
-        sma_values[i] = np.mean(data[i - period + 1: i + 1])
+    data, periods, single = _as_batch(data, period)
+    # NaNs are summed as 0 and counted, so one NaN only spoils the windows it is in
+    nans = np.isnan(data)
+    cum_sum = np.zeros((data.shape[0], data.shape[1] + 1))
+    np.cumsum(np.where(nans, 0.0, data), axis=-1, out=cum_sum[:, 1:])
+    cum_nans = np.zeros(cum_sum.shape, dtype=np.int_)
+    np.cumsum(nans, axis=-1, out=cum_nans[:, 1:])
 
-    return sma_values
+    sma_values = np.zeros(data.shape)
+    for row, p in enumerate(periods):
+        sma_values[row, p - 1:] = (cum_sum[row, p:] - cum_sum[row, :-p]) / p
+        sma_values[row, p - 1:][cum_nans[row, p:] > cum_nans[row, :-p]] = np.nan
+
+    return sma_values[0] if single else sma_values
 
 def calculate_ma(data, period, ma_type):
     if ma_type == "SMA":
@@ -77,6 +152,24 @@ def smooth_indicator(data, smooth_type, period):
         return data 
     
 
+def true_range(high, low, close):
+    """True range along the last axis, the first bar is 0 since it has no previous close."""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    tr = np.zeros(high.shape)
+    prev_close = close[..., :-1]
+    tr[..., 1:] = np.maximum.reduce(
+        [
+            high[..., 1:] - low[..., 1:],
+            np.abs(high[..., 1:] - prev_close),
+            np.abs(low[..., 1:] - prev_close),
+        ]
+    )
+    return tr
+
+
 def atr(high, low, close, period):
     """Calculates the Average True Range (ATR).
 
@@ -84,47 +177,50 @@ def atr(high, low, close, period):
         high (array-like): Array of high prices.
         low (array-like): Array of low prices.
         close (array-like): Array of closing prices.
-        period (int): The lookback period.
+        period (int or array-like): The lookback period, or a 1-D array of periods.
 
     Returns:
-        array-like: The calculated ATR values.
+        array-like: The calculated ATR values (Wilder smoothing), 2-D with one row per
+        series/period when more than one is given. Bars before period - 1 are 0.
     """
-    tr = np.zeros_like(high)
-    atr_values = np.zeros_like(high)
-
-    for i in range(1, len(high)):
-        tr[i] = max(
-            high[i] - low[i], 
-            abs(high[i] - close[i - 1]), 
-            abs(low[i] - close[i - 1])
-        )
+    tr, periods, single = _as_batch(true_range(high, low, close), period)
+    atr_values = _seeded_recursion(tr, periods, 1 / periods)
 
-    atr_values[period - 1] = np.mean(tr[:period])  # Initial simple average
+    return atr_values[0] if single else atr_values
 
-    for i in range(period, len(high)):
-        atr_values[i] = (atr_values[i - 1] * (period - 1) + tr[i]) / period
+def lwti(close, high_prices=None, low_prices=None, period=8, smooth=False, smooth_type="SMA", smooth_period=5):
+    """Calculates the Larry Williams Large Trade Index (LWTI).
 
-    return atr_values
+    Args:
+        period (int or array-like): The lookback period, or a 1-D array of periods.
+            The range is worked out once for every period and with smooth_type "EMA"
+            all the moving averages are one batched ema call.
 
-def lwti(close, high_prices=None, low_prices=None, period=8, smooth=False, smooth_type="SMA", smooth_period=5):
-    """Calculates the Larry Williams Large Trade Index (LWTI)."""
+    Returns:
+        array-like: The LWTI values, 2-D with one row per period when period is an array.
+    """
 
     def calculate_range(high, low):  # True Range helper 
         tr = np.maximum(high - low, np.abs(np.subtract(high, np.roll(close, 1))))
         return tr
 
-    diff = close - np.roll(close, period)
     tr = calculate_range(high_prices, low_prices) 
+    periods = np.atleast_1d(np.asarray(period, dtype=np.int_))
+    diff = np.stack([close - np.roll(close, p) for p in periods])
 
-    ma_diff = calculate_ma(diff, period, smooth_type) 
-    ma_tr = calculate_ma(tr, period, smooth_type) 
+    if smooth_type == "EMA":
+        ma_diff = ema(diff, periods)
+        ma_tr = ema(tr, periods)
+    else:
+        ma_diff = np.stack([calculate_ma(diff[row], p, smooth_type) for row, p in enumerate(periods)])
+        ma_tr = np.stack([calculate_ma(tr, p, smooth_type) for p in periods])
 
     lwti = np.where(ma_tr == 0, 50, (ma_diff / ma_tr) * 50 + 50) 
 
     if smooth:
-        lwti = smooth_indicator(lwti, smooth_type, smooth_period)
+        lwti = np.stack([smooth_indicator(row, smooth_type, smooth_period) for row in lwti])
 
-    return lwti
+    return lwti[0] if np.ndim(period) == 0 else lwti
 
 def get_lwti_color(value):
     if value > 50:
@@ -5,6 +5,9 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import ta
 from indicator import *
+from stream_indicator import StreamingDonchian, StreamingLWTI, StreamingSMA, new_candle_rows
+
+from collections import deque
 
 from datetime import datetime
 from logging import getLogger
@@ -13,6 +16,7 @@ from typing import NamedTuple
 from quantfreedom.helper_funcs import cart_product
 from quantfreedom.indicators.tv_indicators import rsi_tv
 from quantfreedom.enums import CandleBodyType
+from quantfreedom.indicators.signal_filters import cooldown_filter
 from quantfreedom.strategies.strategy import Strategy
 from quantfreedom.email_sender import EmailSender
 
@@ -115,23 +119,15 @@ class DonChainLWTI(Strategy):
 
             self.entries = np.where(price_touch_upper & lwti_uptrend & volume_above_ma & rising,True,False)
 
-            signal_history = np.zeros_like(self.entries)  # Array to track recent signals
+            # drop signals within filter_distance candles of the last one kept
             filter_distance = 24  # Number of candles to look back
-            for i, signal in enumerate(self.entries):
-                if signal:
-                    # Check for previous signals within the filter distance
-                    if np.any(signal_history[max(0, i - filter_distance):i]):
-                        self.entries[i] = False  # Filter out the current signal
-                    else:
-                        signal_history[i] = True  # Record this signal
-                        
-                # filtered_indices = np.where(entries == True)
-                        
-                self.entry_signals = np.where(self.entries, self.close_prices, np.nan)
-                self.exit_prices = np.full_like(self.close_prices, np.nan)    
-                self.exit_condition = self.close_prices < self.adj_basis  
-                self.exit_prices[self.exit_condition] = self.close_prices[self.exit_condition]         
-                    
+            self.entries = cooldown_filter(signals=self.entries, cooldown=filter_distance)
+
+            self.entry_signals = np.where(self.entries, self.close_prices, np.nan)
+            self.exit_prices = np.full_like(self.close_prices, np.nan)
+            self.exit_condition = self.close_prices < self.adj_basis
+            self.exit_prices[self.exit_condition] = self.close_prices[self.exit_condition]
+
         except Exception as e:
             logger.error(f"Exception long_set_entries_exits_array -> {e}")
             raise Exception(f"Exception long_set_entries_exits_array -> {e}")
@@ -173,50 +169,65 @@ class DonChainLWTI(Strategy):
         self.current_ind_settings = IndicatorSettingsArrays(
             period=self.period
         )                     
+        self.last_live_timestamp = None
         logger.info("live_set_ind_settings finished")     
-        
+
+    def live_reset_indicators(self):
+        self.live_lwti = StreamingLWTI(period=25)
+        self.live_donchian = StreamingDonchian(period=self.period)
+        self.live_ma_volume = StreamingSMA(length=30)
+        # adj_upper[-1] from shift_and_pad is the upper band from 2 bars back
+        self.live_upper = deque([np.nan] * 3, maxlen=3)
+        self.live_lwti_values = deque(maxlen=24)
+        self.live_closes = deque(maxlen=3)
+        self.live_volume = np.nan
+
+    def live_update_indicators(
+        self,
+        candles: np.array,
+    ):
+        new_candles, rebuild = new_candle_rows(candles=candles, last_timestamp=self.last_live_timestamp)
+        if rebuild:
+            logger.info(f"Warming up live indicators on {new_candles.shape[0]} candles")
+            self.live_reset_indicators()
+
+        for candle in new_candles:
+            high = candle[CandleBodyType.High]
+            low = candle[CandleBodyType.Low]
+            close = candle[CandleBodyType.Close]
+            self.live_volume = candle[CandleBodyType.Volume]
+
+            self.live_lwti_values.append(self.live_lwti.update(high=high, low=low, close=close))
+            self.live_upper.append(self.live_donchian.update(high=high, low=low)[1])
+            self.live_ma_volume.update(self.live_volume)
+            self.live_closes.append(close)
+
+        if new_candles.shape[0] > 0:
+            self.last_live_timestamp = new_candles[-1, CandleBodyType.Timestamp]
+
     def long_live_evaluate(
         self,
         candles: np.array,
     ):
         try:               
-            self.open_prices = candles[:, CandleBodyType.Open];
-            self.close_prices = candles[:, CandleBodyType.Close];
-            self.high_prices = candles[:, CandleBodyType.High];
-            self.low_prices = candles[:, CandleBodyType.Low];    
-            self.volume = candles[:, CandleBodyType.Volume];    
-            self.lwti_values = lwti(close=self.close_prices, high_prices=self.high_prices , low_prices=self.low_prices, period=25, smooth=True, smooth_type="EMA", smooth_period=20)              
-            
-            # Calculate Donchian Channels (with an offset to handle the initial period)
-            
-            self.offset = self.period - 1  # Offset to skip incomplete calculations            
-            basis, upper, lower = donchian_channels(self.high_prices, self.low_prices, self.period, self.offset)
-            self.offset = self.offset
-            self.basis = basis
-            self.upper = upper
-            self.lower = lower
-            
-            self.adj_upper = shift_and_pad(self.upper, shift_amount=2, num_nan=self.offset)
-            self.adj_basis = shift_and_pad(self.basis, shift_amount=2, num_nan=self.offset)
-            self.adj_lower = shift_and_pad(self.lower, shift_amount=2, num_nan=self.offset)
-                        
-            ma_volume = sma(self.volume, 30)
-            current_ma_volume = ma_volume[-1]
+            self.live_update_indicators(candles=candles)
+            ma_volume = self.live_ma_volume.value
             
-            current_prices = self.close_prices[-1]
-            prev_close = self.close_prices[-2]
+            current_prices = self.live_closes[-1]
+            prev_close = self.live_closes[-2]
 
-            prev_prev_close = self.close_prices[-3]
+            prev_prev_close = self.live_closes[-3]
 
-            price_touch_upper = current_prices > self.adj_upper[-1] # Close                                
+            adj_upper = self.live_upper[0]
+            price_touch_upper = current_prices > adj_upper # Close                                
             
-            lwti_uptrend = self.lwti_values[-1] > 50
-            look_back_lwti_below_50 = 24
+            current_lwti = self.live_lwti.value
+            lwti_uptrend = current_lwti > 50
             
-            has_lwti_below_50 = np.any(self.lwti_values[-look_back_lwti_below_50:] < 50)
+            has_lwti_below_50 = any(value < 50 for value in self.live_lwti_values)
                     
             
-            volume_above_ma = self.volume[-1] > ma_volume[-1]
+            volume_above_ma = self.live_volume > ma_volume
             rising = current_prices > prev_close
             rising2 = prev_close > prev_prev_close
             if(price_touch_upper & lwti_uptrend & volume_above_ma & has_lwti_below_50):
@@ -225,13 +236,13 @@ class DonChainLWTI(Strategy):
                     f"Entry time!!!"
                 )
                 logger.info(
-                    f"price_touch_upper {current_prices} > {self.adj_upper[-1]}"
+                    f"price_touch_upper {current_prices} > {adj_upper}"
                 )
                 logger.info(
-                    f"lwti_uptrend {self.lwti_values[-1]} > {50}"
+                    f"lwti_uptrend {current_lwti} > {50}"
                 )
                 logger.info(
-                    f"volume_above_ma {self.volume[-1]} > {ma_volume[-1]}"
+                    f"volume_above_ma {self.live_volume} > {ma_volume}"
                 )
                 logger.info(
                     f"rising {current_prices} > {prev_close}"
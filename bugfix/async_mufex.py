@@ -0,0 +1,351 @@
+import asyncio
+import aiohttp
+
+from logging import getLogger
+from threading import Lock
+from time import perf_counter
+
+from quantfreedom.enums import PositionModeType, TriggerDirectionType
+from quantfreedom.exchanges.mufex_exchange.http_session import EndpointLatency
+from quantfreedom.exchanges.mufex_exchange.mufex import Mufex
+
+logger = getLogger("info")
+
+
+class AsyncMufex(Mufex):
+    def __init__(
+        # Exchange Vars
+        self,
+        use_test_net: bool,
+        api_key: str = None,
+        secret_key: str = None,
+        url_start: str = None,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        pool_maxsize: int = 20,
+    ):
+        """
+        asyncio version of the Mufex calls AsyncMufexLiveMode makes around an entry, so independent requests like
+        sending the sl and the tp or checking the orders and the position can be in flight at the same time instead of
+        one after the other.
+
+        Everything that only runs once at start up (set_exchange_settings, get_candles ...) is the normal blocking
+        Mufex method, the coroutines all start with async_. Pass url_start to point the client somewhere else, like
+        the local MufexStandInServer.
+
+        The aiohttp session is made on the first request, call async_close when you are done with it.
+        """
+        super().__init__(use_test_net=use_test_net, api_key=api_key, secret_key=secret_key)
+        if url_start is not None:
+            self.url_start = url_start
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.pool_maxsize = pool_maxsize
+        self.async_session: aiohttp.ClientSession = None
+        self.async_latency: dict[str, EndpointLatency] = {}
+        self.__latency_lock = Lock()
+
+    ################################################################
+    ################################################################
+    ###################                          ###################
+    ###################                          ###################
+    ################### Sending Info Functionsns ###################
+    ###################                          ###################
+    ###################                          ###################
+    ################################################################
+    ################################################################
+
+    async def __get_async_session(self):
+        if self.async_session is None or self.async_session.closed:
+            self.async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_maxsize),
+                timeout=self.timeout,
+            )
+        return self.async_session
+
+    async def __async_request(
+        self,
+        method: str,
+        end_point: str,
+        sign,
+    ):
+        """
+        sign returns the url, headers and data of the request, it is called after the rate limiter lets the request go
+        so waiting for a token never makes the signature stale
+        """
+        session = await self.__get_async_session()
+        # same rate budget as the blocking requests of this exchange
+        await self.http_session.rate_limiter.async_acquire(end_point=end_point)
+        kwargs = sign()
+        error = True
+        start = perf_counter()
+        try:
+            async with session.request(method=method, **kwargs) as response:
+                error = not response.ok
+                self.http_session.rate_limiter.update_from_response(
+                    end_point=end_point,
+                    status_code=response.status,
+                    headers=response.headers,
+                )
+                return await response.json(content_type=None)
+        finally:
+            with self.__latency_lock:
+                if end_point not in self.async_latency:
+                    self.async_latency[end_point] = EndpointLatency()
+                self.async_latency[end_point].add(seconds=perf_counter() - start, error=error)
+
+    async def __async_HTTP_post_request(
+        self,
+        end_point: str,
+        params: dict,
+    ):
+        def sign():
+            params_as_dict_string, headers = self.request_signer.sign_post(params=params)
+            return {"url": self.url_start + end_point, "headers": headers, "data": params_as_dict_string}
+
+        try:
+            return await self.__async_request(method="POST", end_point=end_point, sign=sign)
+        except Exception as e:
+            raise Exception(f"AsyncMufex __async_HTTP_post_request - > {e}")
+
+    async def __async_HTTP_get_request(
+        self,
+        end_point: str,
+        params: dict,
+    ):
+        def sign():
+            params_as_path, headers = self.request_signer.sign_get(params=params)
+            return {"url": self.url_start + end_point + "?" + params_as_path, "headers": headers}
+
+        try:
+            return await self.__async_request(method="GET", end_point=end_point, sign=sign)
+        except Exception as e:
+            raise Exception(f"AsyncMufex __async_HTTP_get_request - > {e}")
+
+    async def async_close(self):
+        if self.async_session is not None and not self.async_session.closed:
+            await self.async_session.close()
+        self.close()
+
+    def get_async_latency_stats(self):
+        with self.__latency_lock:
+            return {
+                end_point: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "avg_ms": round(stats.avg_ms, 1),
+                    "max_ms": round(stats.max_sec * 1000, 1),
+                }
+                for end_point, stats in self.async_latency.items()
+            }
+
+    ###################################################################
+    ###################################################################
+    ###################                             ###################
+    ###################                             ###################
+    ###################       Async Functions       ###################
+    ###################                             ###################
+    ###################                             ###################
+    ###################################################################
+    ###################################################################
+
+    async def async_create_order(
+        self,
+        symbol: str,
+        buy_sell: str,
+        position_mode: PositionModeType,  # type: ignore
+        order_type: str,
+        asset_size: float,
+        time_in_force: str = "GoodTillCancel",
+        price: float = None,
+        triggerDirection: TriggerDirectionType = None,  # type: ignore
+        triggerPrice: str = None,
+        custom_order_id: str = None,
+        reduce_only: bool = None,
+    ):
+        """
+        https://www.mufex.finance/apidocs/derivatives/contract/index.html#t-dv_placeorder
+
+        same as create_order with only the params live mode uses
+        """
+        end_point = "/private/v1/trade/create"
+        params = {}
+        params["symbol"] = symbol.upper()
+        params["side"] = buy_sell.capitalize()
+        params["positionIdx"] = position_mode
+        params["orderType"] = order_type.capitalize()
+        params["qty"] = str(asset_size)
+        params["price"] = str(price) if price else price
+        params["triggerDirection"] = triggerDirection
+        params["triggerPrice"] = str(triggerPrice) if triggerPrice else triggerPrice
+        params["timeInForce"] = time_in_force
+        params["orderLinkId"] = custom_order_id
+        params["reduceOnly"] = reduce_only
+
+        response: dict = await self.__async_HTTP_post_request(end_point=end_point, params=params)
+        try:
+            order_id = response["data"]["orderId"]
+            return order_id
+        except Exception as e:
+            raise Exception(f"AsyncMufex async_create_order {response['message']} -> {e}")
+
+    async def async_create_orders(
+        self,
+        orders: list[dict],
+    ) -> list:
+        """
+        create_orders with every order sent at the same time on the event loop
+
+        Returns
+        -------
+        list
+            the order id of every order in the same order as orders, or the Exception it raised
+        """
+        results = await asyncio.gather(*(self.async_create_order(**order) for order in orders), return_exceptions=True)
+        return list(results)
+
+    async def async_get_all_open_orders(
+        self,
+        symbol: str,
+        limit: int = 50,
+    ) -> list:
+        end_point = "/private/v1/trade/activity-orders"
+        params = {}
+        params["symbol"] = symbol
+        params["limit"] = limit
+        response: dict = await self.__async_HTTP_get_request(end_point=end_point, params=params)
+        try:
+            return list(response["data"]["list"])
+        except Exception as e:
+            raise Exception(f"AsyncMufex async_get_all_open_orders {response['message']} -> {e}")
+
+    async def async_get_all_filled_orders(
+        self,
+        symbol: str,
+        limit: int = 200,
+    ) -> list:
+        end_point = "/private/v1/trade/fills"
+        params = {}
+        params["symbol"] = symbol
+        params["limit"] = limit
+        response: dict = await self.__async_HTTP_get_request(end_point=end_point, params=params)
+        try:
+            return list(response["data"]["list"])
+        except Exception as e:
+            raise Exception(f"AsyncMufex async_get_all_filled_orders {response['message']} -> {e}")
+
+    async def async_get_position_info(
+        self,
+        symbol: str = None,
+        limit: int = 50,
+    ):
+        """
+        https://www.mufex.finance/apidocs/derivatives/contract/index.html?console#t-dv_myposition
+        """
+        end_point = "/private/v1/account/positions"
+        params = {}
+        params["symbol"] = symbol
+        params["limit"] = limit
+        response: dict = await self.__async_HTTP_get_request(end_point=end_point, params=params)
+        try:
+            response["data"]["list"][0]
+            data_list = response["data"]["list"]
+            return data_list
+        except Exception as e:
+            raise Exception(f"AsyncMufex async_get_position_info = Data or List is empty {response['message']} -> {e}")
+
+    async def async_cancel_all_open_orders_per_symbol(
+        self,
+        symbol: str,
+    ):
+        end_point = "/private/v1/trade/cancel-all"
+        params = {
+            "symbol": symbol,
+        }
+        response: dict = await self.__async_HTTP_post_request(end_point=end_point, params=params)
+        try:
+            if response["message"] == "OK":
+                return True
+            else:
+                raise Exception
+        except Exception as e:
+            raise Exception(f"AsyncMufex async_cancel_all_open_orders_per_symbol message = {response['message']} -> {e}")
+
+    async def async_get_equity_of_asset(
+        self,
+        trading_with: str,
+    ):
+        end_point = "/private/v1/account/balance"
+        params = {
+            "coin": trading_with,
+        }
+        response: dict = await self.__async_HTTP_get_request(end_point=end_point, params=params)
+        try:
+            return float(response["data"]["list"][0]["equity"])
+        except Exception as e:
+            raise Exception(f"AsyncMufex async_get_equity_of_asset = Data or List is empty {response['message']} -> {e}")
+
+    async def async_get_latest_pnl_result(
+        self,
+        symbol: str,
+        limit: int = 200,
+    ):
+        end_point = "/private/v1/account/closed-pnl"
+        params = {}
+        params["symbol"] = symbol
+        params["limit"] = limit
+        response: dict = await self.__async_HTTP_get_request(end_point=end_point, params=params)
+        try:
+            return float(response["data"]["list"][0]["closedPnl"])
+        except Exception as e:
+            raise Exception(f"AsyncMufex async_get_latest_pnl_result = Data or List is empty {response['message']} -> {e}")
+
+    async def async_set_leverage(
+        self,
+        symbol: str,
+        leverage: float,
+    ):
+        end_point = "/private/v1/account/set-leverage"
+        leverage_str = str(leverage)
+        params = {
+            "symbol": symbol,
+            "buyLeverage": leverage_str,
+            "sellLeverage": leverage_str,
+        }
+        response: dict = await self.__async_HTTP_post_request(end_point=end_point, params=params)
+        try:
+            if response["message"] in ["OK", "leverage not modified"]:
+                return True
+            else:
+                raise Exception
+        except Exception as e:
+            raise Exception(f"AsyncMufex async_set_leverage {response['message']} -> {e}")
+
+    #######################################################
+    #######################################################
+    #######################################################
+    ##################      Live     ######################
+    ##################      Live     ######################
+    ##################      Live     ######################
+    #######################################################
+    #######################################################
+    #######################################################
+
+    async def async_create_long_hedge_mode_entry_market_order(
+        self,
+        asset_size: float,
+        symbol: str,
+    ):
+        return await self.async_create_order(
+            symbol=symbol,
+            position_mode=1,
+            buy_sell="Buy",
+            order_type="Market",
+            asset_size=asset_size,
+            time_in_force="GoodTillCancel",
+        )
+
+    async def async_get_long_hedge_mode_position_info(
+        self,
+        symbol: str,
+    ):
+        return dict(sorted((await self.async_get_position_info(symbol=symbol))[0].items()))
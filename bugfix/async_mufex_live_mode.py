@@ -0,0 +1,226 @@
+import asyncio
+import numpy as np
+
+from logging import getLogger
+from time import time
+
+from quantfreedom.email_sender import EmailSender
+from quantfreedom.enums import PositionModeType, RejectedOrder
+from quantfreedom.exchanges.mufex_exchange.async_mufex import AsyncMufex
+from quantfreedom.exchanges.mufex_exchange.bar_scheduler import BarCloseScheduler
+from quantfreedom.exchanges.mufex_exchange.candle_cache import CandleCache
+from quantfreedom.exchanges.mufex_exchange.mufex_live_mode import MufexLiveMode
+from quantfreedom.order_handler.order import OrderHandler
+from quantfreedom.strategies.strategy import Strategy
+
+logger = getLogger("info")
+
+
+class AsyncMufexLiveMode(MufexLiveMode):
+    def __init__(
+        self,
+        email_sender: EmailSender,
+        entry_order_type: str,
+        exchange: AsyncMufex,
+        order: OrderHandler,
+        strategy: Strategy,
+        symbol: str,
+        trading_with: str,
+        tp_order_type: str,
+        candle_cache: CandleCache = None,
+        bar_scheduler: BarCloseScheduler = None,
+        verify_timeout: float = 5.0,
+    ):
+        """
+        Same as MufexLiveMode but the bar loop runs on asyncio
+
+        The strategy is evaluated on a thread while the latest pnl request is in flight, and the entry goes through
+        the order lifecycle's async_ path: the position and equity are fetched together, leverage is set while the old
+        orders are canceled, and the sl and tp are sent together and checked with the position, each step the same as
+        MufexLiveMode.place_entry. The stop loss check is MufexLiveMode's check_move_stop_loss run on a thread.
+        verify_timeout is how long the order lifecycle keeps polling an order before calling it not verified.
+
+        Start it with asyncio.run(live_mode.async_run(candles_to_dl=..., timeframe=...))
+        """
+        super().__init__(
+            email_sender=email_sender,
+            entry_order_type=entry_order_type,
+            exchange=exchange,
+            order=order,
+            strategy=strategy,
+            symbol=symbol,
+            trading_with=trading_with,
+            tp_order_type=tp_order_type,
+            candle_cache=candle_cache,
+            bar_scheduler=bar_scheduler,
+        )
+        self.order_lifecycle.timeout = verify_timeout
+
+        if self.exchange.position_mode == PositionModeType.HedgeMode:
+            if strategy.long_short == "long":
+                self.async_get_position_info = exchange.async_get_long_hedge_mode_position_info
+                if entry_order_type == "market":
+                    self.async_entry_order = exchange.async_create_long_hedge_mode_entry_market_order
+
+    async def async_run(
+        self,
+        candles_to_dl: int,
+        timeframe: str,
+    ):
+        logger.info(f"Starting async live trading")
+        print(f"Starting async live trading")
+        self.last_pnl = await self.__async_get_latest_pnl()
+
+        # fills the candle cache and sets exchange.last_fetched_ms_time
+        await asyncio.to_thread(
+            self.candle_cache.get_candles,
+            symbol=self.symbol,
+            timeframe=timeframe,
+            candles_to_dl=candles_to_dl,
+        )
+        logger.info(f"Last Candle time {self.exchange.last_fetched_time_to_pd_datetime()}")
+
+        try:
+            while True:
+                try:
+                    candles, close_ms = await asyncio.to_thread(
+                        self.bar_scheduler.wait_for_bar,
+                        candle_cache=self.candle_cache,
+                        symbol=self.symbol,
+                        timeframe=timeframe,
+                        candles_to_dl=candles_to_dl,
+                    )
+                    if candles is None:
+                        logger.warning("Skipping this bar, its candle never showed up")
+                        continue
+                    await self.async_run_bar(candles=candles)
+                    self.bar_scheduler.record_bar(
+                        close_ms=close_ms,
+                        signal_ms_time=self.signal_ms_time,
+                        order_ms_time=self.entry_ms_time,
+                    )
+                except Exception as e:
+                    logger.error(f"Exception -> {e}")
+                    self.last_pnl = 0
+        finally:
+            await self.exchange.async_close()
+
+    async def async_run_bar(
+        self,
+        candles: np.array,
+    ):
+        """
+        run_bar with the pnl request sent while the strategy is evaluated, raises when something couldn't be verified
+        """
+        bar_index = self.set_bar(candles=candles)
+
+        entry_signal, latest_pnl = await asyncio.gather(
+            asyncio.to_thread(self.evaluate),
+            self.__async_get_latest_pnl(),
+        )
+        if entry_signal:
+            await self.async_place_entry(bar_index=bar_index)
+        else:
+            self.check_new_pnl(latest_pnl=latest_pnl)
+
+        await asyncio.to_thread(self.check_move_stop_loss, bar_index=bar_index)
+
+    async def async_place_entry(
+        self,
+        bar_index: int,
+    ):
+        """
+        place_entry with the requests that don't depend on each other sent at the same time
+        """
+        msg = "Couldn't verify that the following orders were placed "
+        # nothing moves the stop while the orders are being replaced
+        self.position_monitor.clear_position()
+        try:
+            pos_info, equity = await asyncio.gather(
+                self.async_get_position_info(symbol=self.symbol),
+                self.exchange.async_get_equity_of_asset(trading_with=self.trading_with),
+            )
+            self.position_cache.update(symbol=self.symbol, position_info=pos_info)
+            self.set_order_position(equity=equity)
+            self.calculate_entry_order(bar_index=bar_index)
+
+            # a tp or sl left over from a position that was closed would still be open when flat
+            logger.info("Setting leverage and canceling the open orders before the entry")
+            leverage_set, canceled = await asyncio.gather(
+                self.exchange.async_set_leverage(
+                    symbol=self.symbol,
+                    leverage=self.order.leverage,
+                ),
+                self.exchange.async_cancel_all_open_orders_per_symbol(symbol=self.symbol),
+            )
+            self.position_cache.invalidate(symbol=self.symbol)
+            if leverage_set:
+                logger.info(f"Leverage Changed")
+            else:
+                logger.warning("Couldn't verify that leverage was set")
+                msg += f"leverage was set "
+            if canceled:
+                logger.info(f"Canceled the orders")
+            else:
+                logger.warning("Wasn't able to verify that the tp and sl were canceled")
+
+            logger.info("Placing Entry Order")
+            entry = await self.order_lifecycle.async_submit(
+                role="entry",
+                place=self.async_entry_order,
+                asset_size=self.order.entry_size_asset,
+                symbol=self.symbol,
+            )
+            self.entry_ms_time = time() * 1000
+
+            if await self.order_lifecycle.async_wait_until_filled(tracked=entry):
+                logger.info("Entry was filled")
+            else:
+                msg += f"entry_order_id {entry.order_id} "
+                logger.warning(f"Couldn't verify entry order was filled {entry.order_id}")
+
+            sl = tp = None
+            pos_info = await self.async_get_position_info(symbol=self.symbol)
+            self.ex_position_size_asset = float(pos_info["size"])
+            if self.ex_position_size_asset > 0:
+                logger.info(f"Submitting stop loss and take profit orders")
+                sl, tp = await self.order_lifecycle.async_submit_batch(
+                    roles=["sl", "tp"],
+                    orders=self.get_sl_tp_orders_params(),
+                    retry=True,
+                )
+                self.sl_order_id = sl.order_id
+
+                # the position is read again for the report while the sl and tp are checked
+                all_open, pos_info = await asyncio.gather(
+                    self.order_lifecycle.async_wait_until_all_open(tracked_orders=[sl, tp]),
+                    self.async_get_position_info(symbol=self.symbol),
+                )
+                if all_open:
+                    logger.info(f"sl and tp orders were placed")
+            self.position_cache.update(symbol=self.symbol, position_info=pos_info)
+
+            self.verify_protected(entry=entry, sl=sl, tp=tp, leverage_set=leverage_set, msg=msg)
+            # the reconciler still has the fills from the entry check and the open orders from the sl and tp check
+            order_reconciler = self.order_lifecycle.order_reconciler
+            self.set_exchange_variables_from_info(
+                pos_info=pos_info,
+                entry_info=order_reconciler.get_filled_order(order_id=entry.order_id),
+                tp_info=order_reconciler.get_open_order(order_id=tp.order_id),
+                sl_info=order_reconciler.get_open_order(order_id=sl.order_id),
+            )
+            order_reconciler.log_stats()
+            self.report_entry()
+
+        except RejectedOrder as e:
+            pass
+        except Exception as e:
+            logger.error(f"Exception Entry -> {e}")
+            raise Exception(f"Exception Entry -> {e}")
+
+    async def __async_get_latest_pnl(self):
+        try:
+            return await self.exchange.async_get_latest_pnl_result(symbol=self.symbol)
+        except Exception as e:
+            logger.error(f"async_get_latest_pnl_result {e}")
+            return self.last_pnl
@@ -0,0 +1,252 @@
+import numpy as np
+
+from collections import deque
+from logging import getLogger
+from threading import Lock
+from time import perf_counter, sleep, time
+
+from quantfreedom.enums import CandleBodyType
+from quantfreedom.exchanges.exchange import Exchange
+from quantfreedom.exchanges.mufex_exchange.candle_cache import CandleCache
+
+logger = getLogger("info")
+
+LATENCY_BUCKETS_MS = np.array([5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000])
+WEEK_IN_MS = 7 * 24 * 60 * 60 * 1000
+# weekly bars open monday 00:00 utc and the epoch was a thursday, every shorter bar lines up with the epoch
+WEEK_OPEN_OFFSET_MS = 4 * 24 * 60 * 60 * 1000
+
+
+class LatencyHistogram:
+    def __init__(
+        self,
+        name: str,
+        max_samples: int = 10000,
+    ):
+        """
+        Counts latencies into LATENCY_BUCKETS_MS buckets (last bucket is everything above 10 s) and keeps the latest
+        max_samples for percentiles
+        """
+        self.name = name
+        self.counts = np.zeros(LATENCY_BUCKETS_MS.size + 1, dtype=np.int64)
+        self.samples = deque(maxlen=max_samples)
+        self.lock = Lock()
+
+    def add(
+        self,
+        ms: float,
+    ):
+        with self.lock:
+            self.counts[np.searchsorted(LATENCY_BUCKETS_MS, ms)] += 1
+            self.samples.append(ms)
+
+    def percentile(
+        self,
+        pct: float,
+    ):
+        return float(np.percentile(self.samples, pct)) if self.samples else np.nan
+
+    def get_stats(self):
+        return {
+            "count": int(self.counts.sum()),
+            "p50_ms": round(self.percentile(50), 1),
+            "p90_ms": round(self.percentile(90), 1),
+            "p99_ms": round(self.percentile(99), 1),
+            "max_ms": round(max(self.samples), 1) if self.samples else np.nan,
+            "buckets": {
+                f"<={edge}": int(count) for edge, count in zip(list(LATENCY_BUCKETS_MS) + ["inf"], self.counts)
+            },
+        }
+
+
+class BarCloseScheduler:
+    def __init__(
+        self,
+        exchange: Exchange,
+        wake_after_ms: int = 250,
+        poll_interval_ms: int = 200,
+        poll_timeout_sec: float = 30.0,
+        clock_samples: int = 5,
+        resync_every_bars: int = 60,
+    ):
+        """
+        Wakes live mode right after a bar closes on the exchange's clock instead of sleeping a whole number of
+        seconds off the local clock.
+
+        The offset between the local clock and exchange.get_server_time_ms is measured with clock_samples requests,
+        keeping the one with the shortest round trip, and re-measured every resync_every_bars bars. The scheduler
+        sleeps until wake_after_ms after the close and then polls the candle cache every poll_interval_ms until the
+        bar that just closed shows up, so the strategy gets it as soon as the exchange has it.
+
+        Latencies are kept in three histograms, all measured from the bar close on the exchange's clock:
+        close_to_data (new candle in hand), close_to_signal (strategy evaluated) and signal_to_order (entry sent).
+        """
+        self.exchange = exchange
+        self.wake_after_ms = wake_after_ms
+        self.poll_interval_ms = poll_interval_ms
+        self.poll_timeout_sec = poll_timeout_sec
+        self.clock_samples = clock_samples
+        self.resync_every_bars = resync_every_bars
+        self.clock_offset_ms = 0.0
+        self.bars = 0
+        self.close_to_data = LatencyHistogram(name="close_to_data")
+        self.close_to_signal = LatencyHistogram(name="close_to_signal")
+        self.signal_to_order = LatencyHistogram(name="signal_to_order")
+
+    def sync_clock(self):
+        best_round_trip = np.inf
+        for _ in range(self.clock_samples):
+            try:
+                sent_ms = time() * 1000
+                server_ms = self.exchange.get_server_time_ms()
+                received_ms = time() * 1000
+            except Exception as e:
+                logger.warning(f"BarCloseScheduler couldn't get the server time -> {e}")
+                continue
+            if received_ms - sent_ms < best_round_trip:
+                best_round_trip = received_ms - sent_ms
+                self.clock_offset_ms = server_ms - (sent_ms + received_ms) / 2
+
+        if best_round_trip < np.inf:
+            self.exchange.clock_offset_ms = int(self.clock_offset_ms)
+            logger.info(f"Clock offset to exchange {round(self.clock_offset_ms, 1)} ms round trip {round(best_round_trip, 1)} ms")
+
+    def server_time_ms(self):
+        return time() * 1000 + self.clock_offset_ms
+
+    def get_bar_offset_ms(
+        self,
+        timeframe_in_ms: int,
+    ):
+        return WEEK_OPEN_OFFSET_MS if timeframe_in_ms == WEEK_IN_MS else 0
+
+    def next_bar_close_ms(
+        self,
+        timeframe_in_ms: int,
+    ):
+        offset_ms = self.get_bar_offset_ms(timeframe_in_ms=timeframe_in_ms)
+        return ((int(self.server_time_ms()) - offset_ms) // timeframe_in_ms + 1) * timeframe_in_ms + offset_ms
+
+    def is_bar_close(
+        self,
+        close_ms: int,
+        timeframe_in_ms: int,
+    ):
+        """
+        True when a timeframe_in_ms bar closes at close_ms
+        """
+        return (close_ms - self.get_bar_offset_ms(timeframe_in_ms=timeframe_in_ms)) % timeframe_in_ms == 0
+
+    def sleep_until(
+        self,
+        server_ms: float,
+    ):
+        # one long sleep then short ones so oversleeping is a few ms at most
+        remaining_ms = server_ms - self.server_time_ms()
+        if remaining_ms > 50:
+            sleep((remaining_ms - 20) / 1000)
+        while (remaining_ms := server_ms - self.server_time_ms()) > 0:
+            sleep(min(remaining_ms, 5) / 1000)
+
+    def wait_for_bar(
+        self,
+        candle_cache: CandleCache,
+        symbol: str,
+        timeframe: str,
+        candles_to_dl: int,
+    ):
+        """
+        Sleeps until the next bar close, then polls until the candle cache has that bar
+
+        Returns
+        -------
+        tuple
+            (candles, bar close time in ms on the exchange's clock), candles is None when the bar never showed up
+        """
+        timeframe_in_ms = self.exchange.get_timeframe_in_ms(timeframe=timeframe)
+        close_ms = self.sleep_until_bar_close(timeframe_in_ms=timeframe_in_ms)
+        candles = self.poll_for_bar(
+            candle_cache=candle_cache,
+            symbol=symbol,
+            timeframe=timeframe,
+            candles_to_dl=candles_to_dl,
+            close_ms=close_ms,
+            timeframe_in_ms=timeframe_in_ms,
+        )
+        return candles, close_ms
+
+    def sleep_until_bar_close(
+        self,
+        timeframe_in_ms: int,
+    ):
+        """
+        Sleeps until wake_after_ms after the next close of timeframe_in_ms bars and returns the close time
+        """
+        if self.bars % self.resync_every_bars == 0:
+            self.sync_clock()
+        self.bars += 1
+
+        close_ms = self.next_bar_close_ms(timeframe_in_ms=timeframe_in_ms)
+        logger.info(f"Will sleep for {round((close_ms - self.server_time_ms()) / 1000, 3)} seconds till next bar")
+        self.sleep_until(close_ms + self.wake_after_ms)
+        return close_ms
+
+    def poll_for_bar(
+        self,
+        candle_cache: CandleCache,
+        symbol: str,
+        timeframe: str,
+        candles_to_dl: int,
+        close_ms: int,
+        timeframe_in_ms: int,
+    ):
+        """
+        Returns
+        -------
+        np.array
+            the candles with the bar closing at close_ms as the last one, or None after poll_timeout_sec without it so
+            the bar is skipped instead of run on the bar before it again
+        """
+        last_closed_open_ms = close_ms - timeframe_in_ms
+        deadline = perf_counter() + self.poll_timeout_sec
+        while True:
+            candles = candle_cache.get_candles(
+                symbol=symbol,
+                timeframe=timeframe,
+                candles_to_dl=candles_to_dl,
+            )
+            if candles[-1, CandleBodyType.Timestamp] >= last_closed_open_ms:
+                break
+            if perf_counter() > deadline:
+                logger.warning(f"{symbol} bar closing at {close_ms} still not there after {self.poll_timeout_sec} seconds")
+                return None
+            sleep(self.poll_interval_ms / 1000)
+
+        self.close_to_data.add(self.server_time_ms() - close_ms)
+        return candles
+
+    def record_bar(
+        self,
+        close_ms: float,
+        signal_ms_time: float = None,
+        order_ms_time: float = None,
+    ):
+        """
+        signal_ms_time and order_ms_time are local time() * 1000 stamps, None when there was no signal / order
+        """
+        if signal_ms_time is not None:
+            self.close_to_signal.add(signal_ms_time + self.clock_offset_ms - close_ms)
+            if order_ms_time is not None:
+                self.signal_to_order.add(order_ms_time - signal_ms_time)
+
+    def get_latency_stats(self):
+        return {
+            histogram.name: histogram.get_stats()
+            for histogram in [self.close_to_data, self.close_to_signal, self.signal_to_order]
+        }
+
+    def log_latency_stats(self):
+        for name, stats in self.get_latency_stats().items():
+            logger.info(
+                f"{name} count={stats['count']} p50_ms={stats['p50_ms']} p90_ms={stats['p90_ms']} p99_ms={stats['p99_ms']} max_ms={stats['max_ms']}"
+            )
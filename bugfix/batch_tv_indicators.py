@@ -0,0 +1,250 @@
+import numpy as np
+
+from quantfreedom.indicators.tv_indicators import true_range_tv
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # fall back to stepping every row at once in _seeded_recursion
+    lfilter = None
+
+####################################################################
+# Same values as the tv_indicators functions but for many lengths in one call.
+# Every function returns a (lengths.size, source.size) array, row i is the tv indicator with lengths[i],
+# so a cart_product grid can be worked out once and indexed with ind_set_index.
+####################################################################
+
+
+def _as_lengths(
+    length,
+) -> np.array:
+    lengths = np.atleast_1d(np.asarray(length, dtype=np.int_))
+    if lengths.ndim != 1 or np.any(lengths < 1):
+        raise ValueError(f"Lengths have to be a 1-D array of ints above 0, got {length}")
+    return lengths
+
+
+def _seeded_recursion(
+    source: np.array,
+    alpha: np.array,
+    start: np.array,
+    seed: np.array,
+) -> np.array:
+    """
+    out[row, start - 1] = seed and out[row, i] = alpha * source[row, i] + (1 - alpha) * out[row, i - 1] after it,
+    nan before start - 1
+    """
+    rows, bars = source.shape
+    out = np.full((rows, bars), np.nan)
+
+    if lfilter is not None:
+        for row in range(rows):
+            first = start[row]
+            if first - 1 >= bars:
+                continue
+            out[row, first - 1] = seed[row]
+            if first < bars:
+                zi = [(1 - alpha[row]) * seed[row]]
+                out[row, first:] = lfilter([alpha[row]], [1.0, alpha[row] - 1.0], source[row, first:], zi=zi)[0]
+        return out
+
+    prev = np.full(rows, np.nan)
+    for i in range(start.min() - 1, bars):
+        prev = np.where(start - 1 == i, seed, alpha * source[:, i] + (1 - alpha) * prev)
+        out[:, i] = prev
+    return out
+
+
+def _leading_nans(
+    source: np.array,
+) -> np.array:
+    """
+    Number of nan values per row, the tv functions assume they are all at the start
+    """
+    return np.isnan(source).sum(axis=-1)
+
+
+def sma_tv_batch(
+    source: np.array,
+    length,
+) -> np.array:
+    """
+    sma_tv for every length from one cumulative sum
+
+    Parameters
+    ----------
+    source : np.array
+        Values to process
+    length : np.array
+        Number of bars, one per row
+
+    Returns
+    -------
+    np.array
+        sma, one row per length
+    """
+    source = np.asarray(source, dtype=np.float64)
+    lengths = _as_lengths(length)
+    nans = _leading_nans(source)
+
+    cum_sum = np.zeros(source.size + 1)
+    np.cumsum(np.nan_to_num(source), out=cum_sum[1:])
+
+    sma = np.full((lengths.size, source.size), np.nan)
+    for row, bars in enumerate(lengths):
+        first = nans + bars - 1
+        if first < source.size:
+            sma[row, first:] = (cum_sum[first + 1 :] - cum_sum[first + 1 - bars : source.size + 1 - bars]) / bars
+    return sma
+
+
+def ema_tv_batch(
+    source: np.array,
+    length,
+) -> np.array:
+    """
+    ema_tv for every length, source can be 1-D or 2-D with one series per length
+
+    Parameters
+    ----------
+    source : np.array
+        Values to process
+    length : np.array
+        Number of bars, one per row
+
+    Returns
+    -------
+    np.array
+        ema, one row per length
+    """
+    lengths = _as_lengths(length)
+    source = np.broadcast_to(np.asarray(source, dtype=np.float64), (lengths.size, np.shape(source)[-1]))
+    start = _leading_nans(source) + lengths
+    seed = np.array([row[first - 1] if first - 1 < row.size else np.nan for row, first in zip(source, start)])
+    return _seeded_recursion(source=source, alpha=2 / (lengths + 1), start=start, seed=seed)
+
+
+def rma_tv_batch(
+    source: np.array,
+    length,
+) -> np.array:
+    """
+    rma_tv for every length, source can be 1-D or 2-D with one series per length
+
+    Parameters
+    ----------
+    source : np.array
+        Values to process
+    length : np.array
+        Number of bars, one per row
+
+    Returns
+    -------
+    np.array
+        rma, one row per length
+    """
+    lengths = _as_lengths(length)
+    source = np.broadcast_to(np.asarray(source, dtype=np.float64), (lengths.size, np.shape(source)[-1]))
+    start = _leading_nans(source) + lengths
+    seed = np.array(
+        [
+            row[first - bars : first].mean() if first - 1 < row.size else np.nan
+            for row, first, bars in zip(source, start, lengths)
+        ]
+    )
+    return _seeded_recursion(source=source, alpha=1 / lengths, start=start, seed=seed)
+
+
+def rsi_tv_batch(
+    source: np.array,
+    length,
+) -> np.array:
+    """
+    rsi_tv for every length, the gains and losses are only worked out once
+
+    Parameters
+    ----------
+    source : np.array
+        Values to process
+    length : np.array
+        Number of bars, one per row
+
+    Returns
+    -------
+    np.array
+        rsi, one row per length
+    """
+    source = np.asarray(source, dtype=np.float64)
+    change = np.full_like(source, np.nan)
+    change[1:] = source[1:] - source[:-1]
+
+    gains = np.where(change > 0, change, 0)
+    losses = np.where(change < 0, -(change), 0)
+    gains[0] = np.nan
+    losses[0] = np.nan
+
+    rs = rma_tv_batch(source=gains, length=length) / rma_tv_batch(source=losses, length=length)
+    return 100 - (100 / (1 + rs))
+
+
+def macd_tv_batch(
+    source: np.array,
+    fast_length,
+    slow_length,
+    signal_smoothing,
+) -> tuple[np.array, np.array, np.array]:
+    """
+    macd_tv for every (fast_length, slow_length, signal_smoothing) row, like the flat arrays out of cart_product
+
+    Every distinct fast or slow length only gets one ema no matter how many rows use it.
+
+    Parameters
+    ----------
+    source : np.array
+        Values to process
+    fast_length : np.array
+        Number of bars, one per row
+    slow_length : np.array
+        Number of bars, one per row
+    signal_smoothing : np.array
+        Number of bars, one per row
+
+    Returns
+    -------
+    np.array, np.array, np.array
+        histogram, macd, signal, one row per setting
+    """
+    fast_lengths, slow_lengths, signal_lengths = np.broadcast_arrays(
+        _as_lengths(fast_length),
+        _as_lengths(slow_length),
+        _as_lengths(signal_smoothing),
+    )
+
+    ma_lengths, ma_rows = np.unique(np.concatenate([fast_lengths, slow_lengths]), return_inverse=True)
+    emas = ema_tv_batch(source=source, length=ma_lengths)
+
+    macd = emas[ma_rows[: fast_lengths.size]] - emas[ma_rows[fast_lengths.size :]]
+    signal = ema_tv_batch(source=macd, length=signal_lengths)
+    histogram = macd - signal
+    return histogram, macd, signal
+
+
+def atr_tv_batch(
+    candles: np.array,
+    length,
+) -> np.array:
+    """
+    atr_tv with rma smoothing for every length, the true range is only worked out once
+
+    Parameters
+    ----------
+    candles : np.array
+        2-dim np.array with columns in the following order [timestamp, open, high, low, close, volume]
+    length : np.array
+        Number of bars, one per row
+
+    Returns
+    -------
+    np.array
+        atr, one row per length
+    """
+    return rma_tv_batch(source=true_range_tv(candles=candles), length=length)
@@ -0,0 +1,141 @@
+import numpy as np
+
+from logging import getLogger
+
+from quantfreedom.enums import CandleBodyType
+from quantfreedom.exchanges.exchange import Exchange
+
+logger = getLogger("info")
+
+
+class CandleBuffer:
+    def __init__(
+        self,
+        rows: int,
+        columns: int = 6,
+    ):
+        """
+        Preallocated candle array that always hands out the latest `rows` candles as a view.
+
+        The array has room for 2x rows so appending is a plain copy into free space, once it is full
+        the latest candles are moved back to the front, so every view is contiguous and nothing is
+        reallocated. A view is only valid until the next append.
+        """
+        self.rows = rows
+        self.data = np.empty((rows * 2, columns))
+        self.end = 0
+
+    def append(
+        self,
+        candles: np.array,
+    ):
+        num_new = candles.shape[0]
+        if num_new >= self.rows:
+            self.data[: self.rows] = candles[-self.rows :]
+            self.end = self.rows
+            return
+
+        if self.end + num_new > self.data.shape[0]:
+            keep = min(self.end, self.rows - num_new)
+            self.data[:keep] = self.data[self.end - keep : self.end]
+            self.end = keep
+
+        self.data[self.end : self.end + num_new] = candles
+        self.end += num_new
+
+    def view(self) -> np.array:
+        return self.data[max(self.end - self.rows, 0) : self.end]
+
+    @property
+    def last_timestamp(self) -> int:
+        return int(self.data[self.end - 1, CandleBodyType.Timestamp])
+
+
+class CandleCache:
+    def __init__(
+        self,
+        exchange: Exchange,
+    ):
+        """
+        Keeps the latest candles per (symbol, timeframe) so live mode only downloads the bars that closed
+        since the last call instead of the whole window.
+
+        exchange needs get_candles for the first download and get_candles_since for the top ups.
+        """
+        self.exchange = exchange
+        self.buffers: dict[tuple, CandleBuffer] = {}
+
+    def get_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles_to_dl: int,
+    ) -> np.array:
+        """
+        Returns a view of the latest candles_to_dl candles, the first call per (symbol, timeframe) downloads the
+        full window and every call after that only fetches candles newer than the last cached one.
+        """
+        key = (symbol, timeframe)
+        buffer = self.buffers.get(key)
+
+        if buffer is None or buffer.rows < candles_to_dl:
+            logger.info(f"Downloading {candles_to_dl} candles for {symbol} {timeframe} into the candle cache")
+            candles = self.exchange.get_candles(
+                symbol=symbol,
+                timeframe=timeframe,
+                candles_to_dl=candles_to_dl,
+            )
+            buffer = CandleBuffer(rows=candles_to_dl, columns=candles.shape[1])
+            buffer.append(candles)
+            self.buffers[key] = buffer
+        else:
+            new_candles = self.exchange.get_candles_since(
+                symbol=symbol,
+                timeframe=timeframe,
+                since_ms_time=buffer.last_timestamp,
+            )
+            logger.debug(f"Got {new_candles.shape[0]} new candles for {symbol} {timeframe}")
+            buffer.append(new_candles)
+
+        self.exchange.last_fetched_ms_time = buffer.last_timestamp
+        return buffer.view()[-candles_to_dl:]
+
+    def append_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: np.array,
+    ) -> int:
+        """
+        Adds candles that came from somewhere else (a websocket), anything not newer than the last cached candle is
+        skipped. get_candles has to have been called once for (symbol, timeframe) first.
+
+        Returns
+        -------
+        int
+            number of candles added
+        """
+        buffer = self.buffers[(symbol, timeframe)]
+        new_candles = candles[candles[:, CandleBodyType.Timestamp] > buffer.last_timestamp]
+        if new_candles.shape[0] > 0:
+            buffer.append(new_candles)
+            self.exchange.last_fetched_ms_time = buffer.last_timestamp
+        return new_candles.shape[0]
+
+    def get_last_timestamp(
+        self,
+        symbol: str,
+        timeframe: str,
+    ) -> int:
+        return self.buffers[(symbol, timeframe)].last_timestamp
+
+    def get_cached_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles_to_dl: int,
+    ) -> np.array:
+        """
+        Latest candles_to_dl cached candles without asking the exchange for new ones
+        """
+        return self.buffers[(symbol, timeframe)].view()[-candles_to_dl:]
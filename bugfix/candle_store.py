@@ -0,0 +1,293 @@
+import os
+import numpy as np
+
+from datetime import datetime, timezone
+from logging import getLogger
+from time import time
+
+from quantfreedom.enums import CandleBodyType
+from quantfreedom.exchanges.exchange import Exchange
+
+logger = getLogger("info")
+
+TIMEFRAME_IN_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "12h": 43_200_000,
+    "d": 86_400_000,
+}
+
+
+def ms_to_datetime(ms_time: int) -> datetime:
+    return datetime.fromtimestamp(ms_time / 1000, tz=timezone.utc)
+
+
+def month_start_ms(ms_time: int) -> int:
+    dt = ms_to_datetime(ms_time)
+    return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def next_month_start_ms(ms_time: int) -> int:
+    dt = ms_to_datetime(ms_time)
+    year, month = (dt.year + 1, 1) if dt.month == 12 else (dt.year, dt.month + 1)
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class CandleStore:
+    def __init__(
+        self,
+        exchange: Exchange = None,
+        exchange_name: str = "mufex",
+        store_folder: str = None,
+    ):
+        """
+        On disk candle store so backtests don't re-download the same candles on every kernel restart
+
+        Candles are saved as memory mapped .npy files, one per exchange/symbol/timeframe/month, with one row per
+        candle slot of that month so a candle's row is (timestamp - month start) // timeframe. Rows that were never
+        downloaded stay NaN and a matching .fetched.npy mask remembers which slots were already asked for, so gaps
+        the exchange doesn't have are not downloaded again.
+
+        Pass exchange=None to work offline with whatever is already saved.
+        """
+        self.exchange = exchange
+        self.exchange_name = exchange_name
+        if store_folder is None:
+            store_folder = os.path.join(os.path.expanduser("~"), ".quantfreedom", "candles")
+        self.store_folder = store_folder
+
+    def get_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        since_datetime: datetime = None,
+        until_datetime: datetime = None,
+        candles_to_dl: int = 1500,
+    ) -> np.array:
+        """
+        Same idea as dl_ex_candles but only the missing candles are downloaded
+
+        Parameters
+        ----------
+        symbol : str
+            exchange symbol
+        timeframe : str
+            "1m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "12h", "d"
+        since_datetime : datetime
+            start date, naive datetimes are treated as UTC. Defaults to candles_to_dl candles before until_datetime
+        until_datetime : datetime
+            end date (not included), naive datetimes are treated as UTC. Defaults to now
+        candles_to_dl : int
+            used when since_datetime is None
+
+        Returns
+        -------
+        np.array
+            a 2 dim array with the CandleBodyType columns "timestamp", "open", "high", "low", "close", "volume".
+            It is a view of the memory map when the range is inside one month, otherwise one concatenated array
+        """
+        timeframe_in_ms = self.__get_timeframe_in_ms(timeframe=timeframe)
+
+        if until_datetime is None:
+            until_ms_time = int(time() * 1000)
+        else:
+            until_ms_time = self.__datetime_to_ms(until_datetime)
+        until_ms_time = until_ms_time // timeframe_in_ms * timeframe_in_ms
+
+        if since_datetime is None:
+            since_ms_time = until_ms_time - candles_to_dl * timeframe_in_ms
+        else:
+            since_ms_time = -(-self.__datetime_to_ms(since_datetime) // timeframe_in_ms) * timeframe_in_ms
+
+        if since_ms_time >= until_ms_time:
+            return np.empty((0, 6))
+
+        if self.exchange is not None:
+            self.__fill_missing(
+                symbol=symbol,
+                timeframe=timeframe,
+                timeframe_in_ms=timeframe_in_ms,
+                since_ms_time=since_ms_time,
+                until_ms_time=until_ms_time,
+            )
+
+        candles_list = []
+        for month_ms_time, first_slot, last_slot in self.__month_slots(
+            timeframe_in_ms=timeframe_in_ms,
+            since_ms_time=since_ms_time,
+            until_ms_time=until_ms_time,
+        ):
+            path = self.__month_path(symbol=symbol, timeframe=timeframe, month_ms_time=month_ms_time)
+            if not os.path.exists(path):
+                continue
+            month_candles = np.load(path, mmap_mode="r")[first_slot:last_slot]
+            have_candle = ~np.isnan(month_candles[:, CandleBodyType.Timestamp])
+            candles_list.append(month_candles if have_candle.all() else month_candles[have_candle])
+
+        if not candles_list:
+            return np.empty((0, 6))
+        if len(candles_list) == 1:
+            return candles_list[0]
+        return np.concatenate(candles_list)
+
+    def __fill_missing(
+        self,
+        symbol: str,
+        timeframe: str,
+        timeframe_in_ms: int,
+        since_ms_time: int,
+        until_ms_time: int,
+    ):
+        # don't mark the candle that is still open as fetched
+        last_closed_ms_time = (int(time() * 1000) // timeframe_in_ms - 1) * timeframe_in_ms
+        until_ms_time = min(until_ms_time, last_closed_ms_time + timeframe_in_ms)
+
+        missing_ranges = []
+        for month_ms_time, first_slot, last_slot in self.__month_slots(
+            timeframe_in_ms=timeframe_in_ms,
+            since_ms_time=since_ms_time,
+            until_ms_time=until_ms_time,
+        ):
+            fetched_path = self.__month_path(symbol=symbol, timeframe=timeframe, month_ms_time=month_ms_time, fetched=True)
+            if os.path.exists(fetched_path):
+                fetched = np.load(fetched_path, mmap_mode="r")[first_slot:last_slot]
+            else:
+                fetched = np.zeros(last_slot - first_slot, dtype=np.bool_)
+
+            # start and end of every run of slots that were never fetched
+            edges = np.diff(np.concatenate(([0], (~fetched).astype(np.int8), [0])))
+            for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+                start_ms_time = month_ms_time + (first_slot + start) * timeframe_in_ms
+                end_ms_time = month_ms_time + (first_slot + end) * timeframe_in_ms
+                if missing_ranges and missing_ranges[-1][1] == start_ms_time:
+                    missing_ranges[-1][1] = end_ms_time
+                else:
+                    missing_ranges.append([start_ms_time, end_ms_time])
+
+        for start_ms_time, end_ms_time in missing_ranges:
+            logger.info(
+                f"Downloading missing {symbol} {timeframe} candles {ms_to_datetime(start_ms_time)} -> {ms_to_datetime(end_ms_time)}"
+            )
+            try:
+                # ask for one extra candle, get_candles needs more than one candle between since and until
+                candles = self.exchange.get_candles(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    since_datetime=ms_to_datetime(start_ms_time),
+                    until_datetime=ms_to_datetime(end_ms_time + timeframe_in_ms),
+                )
+            except Exception as e:
+                logger.warning(f"CandleStore couldn't download {symbol} {timeframe} -> {e}")
+                continue
+
+            candles = candles[
+                (candles[:, CandleBodyType.Timestamp] >= start_ms_time)
+                & (candles[:, CandleBodyType.Timestamp] < end_ms_time)
+            ]
+            self.__write_candles(
+                symbol=symbol,
+                timeframe=timeframe,
+                timeframe_in_ms=timeframe_in_ms,
+                candles=candles,
+                start_ms_time=start_ms_time,
+                end_ms_time=end_ms_time,
+            )
+
+    def __write_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        timeframe_in_ms: int,
+        candles: np.array,
+        start_ms_time: int,
+        end_ms_time: int,
+    ):
+        timestamps = candles[:, CandleBodyType.Timestamp].astype(np.int64)
+        for month_ms_time, first_slot, last_slot in self.__month_slots(
+            timeframe_in_ms=timeframe_in_ms,
+            since_ms_time=start_ms_time,
+            until_ms_time=end_ms_time,
+        ):
+            month_data, month_fetched = self.__open_month(
+                symbol=symbol,
+                timeframe=timeframe,
+                timeframe_in_ms=timeframe_in_ms,
+                month_ms_time=month_ms_time,
+            )
+            in_month = (timestamps >= month_ms_time) & (timestamps < next_month_start_ms(month_ms_time))
+            slots = (timestamps[in_month] - month_ms_time) // timeframe_in_ms
+            month_data[slots] = candles[in_month]
+            month_fetched[first_slot:last_slot] = True
+            month_data.flush()
+            month_fetched.flush()
+
+    def __open_month(
+        self,
+        symbol: str,
+        timeframe: str,
+        timeframe_in_ms: int,
+        month_ms_time: int,
+    ):
+        path = self.__month_path(symbol=symbol, timeframe=timeframe, month_ms_time=month_ms_time)
+        fetched_path = self.__month_path(symbol=symbol, timeframe=timeframe, month_ms_time=month_ms_time, fetched=True)
+
+        if os.path.exists(path) and os.path.exists(fetched_path):
+            return np.load(path, mmap_mode="r+"), np.load(fetched_path, mmap_mode="r+")
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        num_slots = (next_month_start_ms(month_ms_time) - month_ms_time) // timeframe_in_ms
+        month_data = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(num_slots, 6))
+        month_data[:] = np.nan
+        month_fetched = np.lib.format.open_memmap(fetched_path, mode="w+", dtype=np.bool_, shape=(num_slots,))
+        month_fetched[:] = False
+        return month_data, month_fetched
+
+    def __month_slots(
+        self,
+        timeframe_in_ms: int,
+        since_ms_time: int,
+        until_ms_time: int,
+    ):
+        """
+        yields (month start ms, first slot, last slot) for every month the range touches, last slot not included
+        """
+        month_ms_time = month_start_ms(since_ms_time)
+        while month_ms_time < until_ms_time:
+            next_month_ms_time = next_month_start_ms(month_ms_time)
+            first_slot = (max(since_ms_time, month_ms_time) - month_ms_time) // timeframe_in_ms
+            last_slot = -(-(min(until_ms_time, next_month_ms_time) - month_ms_time) // timeframe_in_ms)
+            yield month_ms_time, first_slot, last_slot
+            month_ms_time = next_month_ms_time
+
+    def __month_path(
+        self,
+        symbol: str,
+        timeframe: str,
+        month_ms_time: int,
+        fetched: bool = False,
+    ):
+        file_name = ms_to_datetime(month_ms_time).strftime("%Y-%m") + (".fetched.npy" if fetched else ".npy")
+        return os.path.join(self.store_folder, self.exchange_name, symbol, timeframe, file_name)
+
+    def __get_timeframe_in_ms(
+        self,
+        timeframe: str,
+    ):
+        try:
+            return TIMEFRAME_IN_MS[timeframe]
+        except Exception as e:
+            raise Exception(f"CandleStore use one of these timeframes - {list(TIMEFRAME_IN_MS)} -> {e}")
+
+    def __datetime_to_ms(
+        self,
+        dt: datetime,
+    ):
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp() * 1000)
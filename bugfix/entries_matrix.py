@@ -0,0 +1,113 @@
+import numpy as np
+
+from logging import getLogger
+from typing import NamedTuple
+
+from quantfreedom.enums import CandleBodyType
+from quantfreedom.strategies.strategy import Strategy
+
+logger = getLogger("info")
+
+
+class EntriesExitsMatrix(NamedTuple):
+    """
+    Entries and exits of every indicator setting, row ind_set_index is that setting's bars packed 8 to a byte
+    with np.packbits, so a grid costs n_ind_sets * n_bars / 8 bytes per matrix
+    """
+
+    entries: np.array
+    exits: np.array
+    n_bars: int
+
+
+def empty_entries_exits_matrix(
+    n_ind_sets: int,
+    n_bars: int,
+) -> EntriesExitsMatrix:
+    n_bytes = (n_bars + 7) // 8
+    return EntriesExitsMatrix(
+        entries=np.zeros((n_ind_sets, n_bytes), dtype=np.uint8),
+        exits=np.zeros((n_ind_sets, n_bytes), dtype=np.uint8),
+        n_bars=n_bars,
+    )
+
+
+def set_entries_exits_rows(
+    matrix: EntriesExitsMatrix,
+    first_ind_set_index: int,
+    entries: np.array,
+    exits: np.array,
+):
+    """
+    Packs (rows, n_bars) bool entries and exits into the matrix starting at first_ind_set_index
+    """
+    rows = slice(first_ind_set_index, first_ind_set_index + entries.shape[0])
+    matrix.entries[rows] = np.packbits(entries, axis=-1)
+    matrix.exits[rows] = np.packbits(exits, axis=-1)
+
+
+def get_entries_exits_row(
+    matrix: EntriesExitsMatrix,
+    ind_set_index: int,
+) -> tuple[np.array, np.array]:
+    """
+    Returns
+    -------
+    tuple
+        (entries, exits) bool arrays of one indicator setting
+    """
+    entries = np.unpackbits(matrix.entries[ind_set_index], count=matrix.n_bars).astype(np.bool_)
+    exits = np.unpackbits(matrix.exits[ind_set_index], count=matrix.n_bars).astype(np.bool_)
+    return entries, exits
+
+
+class EntriesExitsMatrixStrategy:
+    def __init__(
+        self,
+        strategy: Strategy,
+        matrix: EntriesExitsMatrix,
+    ):
+        """
+        Lets run_df_backtest use a strategy's entries_exits_matrix instead of calling its set_entries_exits_array
+
+        set_entries_exits_array just unpacks row ind_set_offset + ind_set_index of the matrix, exits are at the close
+        of the exit bar. The wrapped strategy isn't touched so it can be shared, each worker makes its own wrapper.
+        """
+        self.strategy = strategy
+        self.matrix = matrix
+        self.long_short = strategy.long_short
+        self.log_folder = strategy.log_folder
+        self.indicator_settings_arrays = strategy.indicator_settings_arrays
+        self.ind_set_offset = 0
+        self.entries = None
+        self.exit_prices = None
+
+    def set_entries_exits_array(
+        self,
+        candles: np.array,
+        ind_set_index: int,
+    ):
+        self.ind_set_index = self.ind_set_offset + ind_set_index
+        if candles.shape[0] != self.matrix.n_bars:
+            raise Exception(
+                f"EntriesExitsMatrixStrategy matrix has {self.matrix.n_bars} bars but got {candles.shape[0]} candles"
+            )
+        self.entries, exits = get_entries_exits_row(matrix=self.matrix, ind_set_index=self.ind_set_index)
+        self.exit_prices = np.where(exits, candles[:, CandleBodyType.Close], np.nan)
+
+    def log_indicator_settings(
+        self,
+        ind_set_index: int,
+    ):
+        settings = "".join(
+            f"\n{name}= {values[ind_set_index]}"
+            for name, values in zip(self.indicator_settings_arrays._fields, self.indicator_settings_arrays)
+        )
+        logger.info(f"Indicator Settings\nIndicator Settings Index= {self.ind_set_offset + ind_set_index}{settings}")
+
+    def entry_message(
+        self,
+        bar_index: int,
+    ):
+        logger.info("\n\n")
+        logger.info(f"Entry time!!! ind_set_index {self.ind_set_index} bar_index {bar_index}")
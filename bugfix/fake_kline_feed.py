@@ -0,0 +1,291 @@
+import asyncio
+import json
+import numpy as np
+
+from aiohttp import WSMsgType, web
+from logging import getLogger
+from threading import Event, Lock, Thread
+from time import time
+
+from quantfreedom.exchanges.mufex_exchange.mufex_stand_in_server import INTERVAL_IN_MS, make_candles
+
+logger = getLogger("info")
+
+MUFEX_INTERVALS = {
+    "1m": "1",
+    "5m": "5",
+    "15m": "15",
+    "30m": "30",
+    "1h": "60",
+    "2h": "120",
+    "4h": "240",
+    "6h": "360",
+    "12h": "720",
+    "d": "D",
+    "w": "W",
+}
+
+
+class FakeKlineFeedServer:
+    def __init__(
+        self,
+        symbol: str = "BTCUSDT",
+        timeframe: str = "1m",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        price: float = 30000.0,
+        history_bars: int = 1000,
+        seconds_per_bar: float = 1.0,
+        ticks_per_bar: int = 4,
+        drop_every_bars: int = 0,
+    ):
+        """
+        Local stand in for the Mufex public kline websocket so KlineStream can be run without a network connection.
+
+        The feed has its own clock that starts history_bars bars after the first candle and moves one bar every
+        seconds_per_bar real seconds, so a 1m feed can close a bar every 0.2 seconds. Every bar goes out as
+        ticks_per_bar updates with "confirm": false and then one with "confirm": true, in the same format as
+        the exchange:
+
+            {"op": "subscribe", "args": ["kline.1.BTCUSDT"]}
+            {"topic": "kline.1.BTCUSDT", "type": "snapshot", "ts": ..., "data": [{"start": ..., "confirm": true ...}]}
+
+        With drop_every_bars every client is disconnected after that many bars, the bars that close while it is
+        reconnecting never get pushed to it.
+
+        The feed also answers get_candles / get_candles_since / get_timeframe_in_ms / get_exchange_timeframe off its
+        own clock, so it can be the exchange of the CandleCache the stream gap fills from. Candles come from the
+        same make_candles as the MufexStandInServer.
+
+        port=0 picks a free port, start() returns the websocket url
+        """
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.interval = MUFEX_INTERVALS[timeframe]
+        self.timeframe_in_ms = INTERVAL_IN_MS[self.interval]
+        self.topic = f"kline.{self.interval}.{symbol}"
+        self.host = host
+        self.port = port
+        self.price = price
+        self.seconds_per_bar = seconds_per_bar
+        self.ticks_per_bar = ticks_per_bar
+        self.drop_every_bars = drop_every_bars
+
+        # open time of the bar that is forming now on the feed's clock
+        self.first_ms_time = (int(time() * 1000) // self.timeframe_in_ms - 2 * history_bars) * self.timeframe_in_ms
+        self.forming_ms_time = self.first_ms_time + history_bars * self.timeframe_in_ms
+        self.bars_closed = 0
+        self.messages_sent = 0
+        self.connections = 0
+        self.last_fetched_ms_time = None
+        self.clients: dict[web.WebSocketResponse, set] = {}
+        self.lock = Lock()
+        self.loop: asyncio.AbstractEventLoop = None
+        self.thread: Thread = None
+        self.__started = Event()
+        self.__stopping: asyncio.Event = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/realtime_public"
+
+    def start(self):
+        self.thread = Thread(target=self.__run, daemon=True)
+        self.thread.start()
+        if not self.__started.wait(timeout=10):
+            raise Exception("FakeKlineFeedServer didn't start")
+        logger.info(f"Fake kline feed running on {self.url}")
+        return self.url
+
+    def stop(self):
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.__stopping.set)
+            self.thread.join(timeout=10)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    ################################################################
+    ################################################################
+    ####################                       #####################
+    ####################   REST gap fill calls  #####################
+    ####################                       #####################
+    ################################################################
+    ################################################################
+
+    def get_timeframe_in_ms(
+        self,
+        timeframe: str,
+    ):
+        return INTERVAL_IN_MS[MUFEX_INTERVALS[timeframe]]
+
+    def get_exchange_timeframe(
+        self,
+        timeframe: str,
+    ):
+        return MUFEX_INTERVALS[timeframe]
+
+    def get_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles_to_dl: int = 1500,
+        **kwargs,
+    ) -> np.array:
+        with self.lock:
+            last_ms_time = self.forming_ms_time - self.timeframe_in_ms
+        first_ms_time = max(last_ms_time - (candles_to_dl - 1) * self.timeframe_in_ms, self.first_ms_time)
+        return self.__candles_between(first_ms_time=first_ms_time, last_ms_time=last_ms_time)
+
+    def get_candles_since(
+        self,
+        symbol: str,
+        timeframe: str,
+        since_ms_time: int,
+        **kwargs,
+    ) -> np.array:
+        with self.lock:
+            last_ms_time = self.forming_ms_time - self.timeframe_in_ms
+        return self.__candles_between(first_ms_time=since_ms_time + self.timeframe_in_ms, last_ms_time=last_ms_time)
+
+    def __candles_between(
+        self,
+        first_ms_time: int,
+        last_ms_time: int,
+    ):
+        timestamps = np.arange(first_ms_time, last_ms_time + 1, self.timeframe_in_ms)
+        candles = make_candles(timestamps=timestamps, timeframe_in_ms=self.timeframe_in_ms, price=self.price)
+        if candles.shape[0] > 0:
+            self.last_fetched_ms_time = int(candles[-1, 0])
+        return candles
+
+    ################################################################
+    ################################################################
+    ####################                       #####################
+    ####################       Websocket        #####################
+    ####################                       #####################
+    ################################################################
+    ################################################################
+
+    def __run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.__serve())
+        self.loop.close()
+
+    async def __serve(self):
+        self.__stopping = asyncio.Event()
+        app = web.Application()
+        app.router.add_get("/realtime_public", self.__handle_client)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, self.host, self.port)
+        await site.start()
+        self.port = runner.addresses[0][1]
+        self.__started.set()
+
+        feed = asyncio.create_task(self.__push_bars())
+        await self.__stopping.wait()
+        feed.cancel()
+        for ws in list(self.clients):
+            await ws.close()
+        await runner.cleanup()
+
+    async def __handle_client(
+        self,
+        request: web.Request,
+    ):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.clients[ws] = set()
+        self.connections += 1
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                message = json.loads(msg.data)
+                if message.get("op") == "subscribe":
+                    self.clients[ws].update(message.get("args", []))
+                    await ws.send_json({"success": True, "ret_msg": "", "op": "subscribe"})
+                elif message.get("op") == "ping":
+                    await ws.send_json({"success": True, "ret_msg": "pong", "op": "ping"})
+        finally:
+            self.clients.pop(ws, None)
+        return ws
+
+    async def __push_bars(self):
+        tick_seconds = self.seconds_per_bar / (self.ticks_per_bar + 1)
+        while True:
+            candle = make_candles(
+                timestamps=[self.forming_ms_time],
+                timeframe_in_ms=self.timeframe_in_ms,
+                price=self.price,
+            )[0]
+            for tick in range(1, self.ticks_per_bar + 1):
+                await asyncio.sleep(tick_seconds)
+                # the forming bar walks from the open to the close
+                close = candle[1] + (candle[4] - candle[1]) * tick / (self.ticks_per_bar + 1)
+                await self.__send_kline(candle=candle, close=close, confirm=False)
+
+            await asyncio.sleep(tick_seconds)
+            with self.lock:
+                self.forming_ms_time += self.timeframe_in_ms
+                self.bars_closed += 1
+            await self.__send_kline(candle=candle, close=candle[4], confirm=True)
+
+            if self.drop_every_bars and self.bars_closed % self.drop_every_bars == 0:
+                logger.info(f"Fake kline feed dropping {len(self.clients)} clients after {self.bars_closed} bars")
+                for ws in list(self.clients):
+                    await ws.close()
+
+    async def __send_kline(
+        self,
+        candle: np.array,
+        close: float,
+        confirm: bool,
+    ):
+        now_ms_time = int(time() * 1000)
+        message = {
+            "topic": self.topic,
+            "type": "snapshot",
+            "ts": now_ms_time,
+            "data": [
+                {
+                    "start": int(candle[0]),
+                    "end": int(candle[0]) + self.timeframe_in_ms - 1,
+                    "interval": self.interval,
+                    "open": str(candle[1]),
+                    "close": str(close),
+                    "high": str(max(candle[2], close) if confirm else max(candle[1], close)),
+                    "low": str(min(candle[3], close) if confirm else min(candle[1], close)),
+                    "volume": str(candle[5]),
+                    "turnover": "0",
+                    "confirm": confirm,
+                    "timestamp": now_ms_time,
+                }
+            ],
+        }
+        for ws, topics in list(self.clients.items()):
+            if self.topic in topics and not ws.closed:
+                try:
+                    await ws.send_json(message)
+                    self.messages_sent += 1
+                except ConnectionError:
+                    pass
+
+
+if __name__ == "__main__":
+    from quantfreedom.exchanges.mufex_exchange.kline_stream import KlineStream
+
+    with FakeKlineFeedServer(seconds_per_bar=0.5, drop_every_bars=4) as feed:
+        stream = KlineStream(exchange=feed, symbol=feed.symbol, timeframe=feed.timeframe, candles_to_dl=200, ws_url=feed.url, reconnect_wait=0.1)
+        stream.start()
+        for _ in range(10):
+            candles, close_ms = stream.wait_for_bar()
+            print(f"bar closed {close_ms} last close {candles[-1, 4]:.2f} candles {candles.shape[0]}")
+        stream.stop()
+        print(f"reconnects {stream.reconnects} bars gap filled {stream.bars_gap_filled}")
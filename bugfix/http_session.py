@@ -0,0 +1,187 @@
+from logging import getLogger
+from threading import Lock
+from time import perf_counter, sleep
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+
+from quantfreedom.exchanges.mufex_exchange.rate_limiter import RateLimitScheduler
+
+logger = getLogger("info")
+
+# 429 isn't here, the rate limiter pauses on it and the GET is retried once the pause is over
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class EndpointLatency:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_sec = 0.0
+        self.max_sec = 0.0
+
+    def add(
+        self,
+        seconds: float,
+        error: bool,
+    ):
+        self.count += 1
+        self.errors += error
+        self.total_sec += seconds
+        self.max_sec = max(self.max_sec, seconds)
+
+    @property
+    def avg_ms(self):
+        return self.total_sec / self.count * 1000 if self.count else 0.0
+
+
+class HTTPSession:
+    def __init__(
+        self,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.25,
+        pool_maxsize: int = 20,
+        rate_limiter: RateLimitScheduler = None,
+    ):
+        """
+        One keep-alive connection pool shared by every request an exchange makes, so we stop paying a new TCP + TLS
+        handshake per call
+
+        Retries are done here and not by urllib3, every attempt waits for a rate limiter token and is signed again
+        so a retried private request never goes out with a timestamp outside its recv window. Connect timeouts are
+        retried for every method since the request never reached the exchange, other connection errors, read
+        timeouts and 5xx responses are only retried for GET so an order is never sent twice. Retries back off by
+        backoff_factor * 2 ** retry seconds. A 429 GET is retried after the pause the rate limiter takes for it.
+
+        Every request is timed per end point, use log_latency_stats to see where the time goes.
+
+        Every request also waits for a token from rate_limiter first, a RateLimitScheduler with its defaults if none
+        is passed, so exchanges sharing this session share one rate budget. The wait isn't part of the latency.
+        """
+        self.rate_limiter = RateLimitScheduler() if rate_limiter is None else rate_limiter
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        adapter = HTTPAdapter(
+            pool_connections=pool_maxsize,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+        )
+        self.session = Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.latency: dict[str, EndpointLatency] = {}
+        self.__latency_lock = Lock()
+
+    def request(
+        self,
+        method: str,
+        end_point: str,
+        url: str = None,
+        sign=None,
+        **kwargs,
+    ) -> Response:
+        """
+        sign is called after the rate limiter lets the request go and returns the kwargs of a signed request (url,
+        headers, data), so the time spent waiting for a token never goes against the signature's recv window
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for retry in range(self.max_retries + 1):
+            can_retry = retry < self.max_retries
+            self.rate_limiter.acquire(end_point=end_point)
+            request_kwargs = dict(kwargs)
+            if sign is not None:
+                request_kwargs.update(sign())
+            else:
+                request_kwargs["url"] = url
+
+            try:
+                response = self.__send(method=method, end_point=end_point, **request_kwargs)
+            except (ConnectionError, Timeout) as e:
+                if not can_retry or not (method == "GET" or isinstance(e, ConnectTimeout)):
+                    raise
+                logger.warning(f"HTTPSession {method} {end_point} retry {retry + 1} -> {e}")
+                sleep(self.backoff_factor * 2**retry)
+                continue
+
+            retry_status = response.status_code in RETRY_STATUSES or response.status_code == 429
+            if can_retry and method == "GET" and retry_status:
+                logger.warning(f"HTTPSession {method} {end_point} retry {retry + 1} -> status {response.status_code}")
+                if response.status_code != 429:
+                    sleep(self.backoff_factor * 2**retry)
+                continue
+            return response
+
+    def __send(
+        self,
+        method: str,
+        end_point: str,
+        **kwargs,
+    ) -> Response:
+        error = True
+        start = perf_counter()
+        try:
+            response = self.session.request(method=method, **kwargs)
+            error = not response.ok
+            self.rate_limiter.update_from_response(
+                end_point=end_point,
+                status_code=response.status_code,
+                headers=response.headers,
+            )
+            return response
+        finally:
+            self.__add_latency(end_point=end_point, seconds=perf_counter() - start, error=error)
+
+    def get(
+        self,
+        end_point: str,
+        url: str = None,
+        sign=None,
+        **kwargs,
+    ) -> Response:
+        return self.request(method="GET", end_point=end_point, url=url, sign=sign, **kwargs)
+
+    def post(
+        self,
+        end_point: str,
+        url: str = None,
+        sign=None,
+        **kwargs,
+    ) -> Response:
+        return self.request(method="POST", end_point=end_point, url=url, sign=sign, **kwargs)
+
+    def __add_latency(
+        self,
+        end_point: str,
+        seconds: float,
+        error: bool,
+    ):
+        with self.__latency_lock:
+            if end_point not in self.latency:
+                self.latency[end_point] = EndpointLatency()
+            self.latency[end_point].add(seconds=seconds, error=error)
+
+    def get_latency_stats(self):
+        with self.__latency_lock:
+            return {
+                end_point: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "avg_ms": round(stats.avg_ms, 1),
+                    "max_ms": round(stats.max_sec * 1000, 1),
+                    "total_ms": round(stats.total_sec * 1000, 1),
+                }
+                for end_point, stats in self.latency.items()
+            }
+
+    def log_latency_stats(self):
+        for end_point, stats in sorted(self.get_latency_stats().items(), key=lambda x: -x[1]["total_ms"]):
+            logger.info(
+                f"{end_point} count={stats['count']} errors={stats['errors']} avg_ms={stats['avg_ms']} max_ms={stats['max_ms']}"
+            )
+
+    def close(self):
+        self.session.close()
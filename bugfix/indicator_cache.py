@@ -0,0 +1,114 @@
+import hashlib
+import numpy as np
+
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+
+try:
+    import xxhash
+except ImportError:  # hashlib's sha1 is the fastest of the ones that are always there
+    xxhash = None
+
+logger = getLogger("info")
+
+
+class IndicatorCache:
+    def __init__(
+        self,
+        max_bytes: int = 512 * 1024 * 1024,
+    ):
+        """
+        Keeps indicator results so a parameter grid only computes each distinct indicator once
+
+        An entry is keyed by the indicator function, its parameters and the contents of every array passed to it:
+        the shape and dtype plus a 128 bit xxhash (sha1 when xxhash isn't installed) of all of its bytes, so a candle
+        buffer that is changed in place anywhere (new bar appended, ring buffer shifted, one candle corrected) misses
+        instead of handing back stale values, and the same candles in another buffer still hit.
+
+        Results are marked read only since every caller gets the same arrays. Entries are dropped least recently
+        used first once the cached results are over max_bytes.
+
+            ema = indicator_cache.get(ema_tv, source=candles[:, CandleBodyType.Close], length=200)
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get(
+        self,
+        func,
+        **kwargs,
+    ):
+        key = (func, tuple(sorted((k, self.__arg_key(v)) for k, v in kwargs.items())))
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        result = func(**kwargs)
+        result_bytes = self.__freeze(result)
+
+        with self.lock:
+            if key not in self.entries and result_bytes <= self.max_bytes:
+                self.entries[key] = (result, result_bytes)
+                self.total_bytes += result_bytes
+                while self.total_bytes > self.max_bytes:
+                    _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                    self.total_bytes -= evicted_bytes
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self):
+        return {
+            "entries": len(self.entries),
+            "mb": round(self.total_bytes / 1024 / 1024, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def log_stats(self):
+        stats = self.get_stats()
+        logger.info(
+            f"Indicator cache entries={stats['entries']} mb={stats['mb']} hits={stats['hits']} misses={stats['misses']}"
+        )
+
+    def __arg_key(
+        self,
+        value,
+    ):
+        if isinstance(value, np.ndarray):
+            # the bytes so NaNs still compare equal, a strided column is copied to be hashed
+            buffer = np.ascontiguousarray(value).data
+            digest = xxhash.xxh3_128_digest(buffer) if xxhash is not None else hashlib.sha1(buffer).digest()
+            return ("array", value.shape, value.dtype.str, digest)
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def __freeze(
+        self,
+        result,
+    ):
+        arrays = result if isinstance(result, tuple) else (result,)
+        result_bytes = 0
+        for array in arrays:
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+                result_bytes += array.nbytes
+        return result_bytes
+
+
+# one cache for every strategy in the process so all of a sweep's indicator settings share it
+indicator_cache = IndicatorCache()
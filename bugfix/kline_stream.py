@@ -0,0 +1,261 @@
+import asyncio
+import json
+import aiohttp
+import numpy as np
+
+from logging import getLogger
+from queue import Empty, Queue
+from threading import Event, RLock, Thread
+from time import time
+
+from quantfreedom.exchanges.exchange import Exchange
+from quantfreedom.exchanges.mufex_exchange.bar_scheduler import LatencyHistogram
+from quantfreedom.exchanges.mufex_exchange.candle_cache import CandleCache
+
+logger = getLogger("info")
+
+MUFEX_PUBLIC_WS_URL = "wss://ws.mufex.finance/realtime_public"
+
+
+class KlineStream:
+    def __init__(
+        self,
+        exchange: Exchange,
+        symbol: str,
+        timeframe: str,
+        candles_to_dl: int,
+        ws_url: str = MUFEX_PUBLIC_WS_URL,
+        candle_cache: CandleCache = None,
+        ping_interval: float = 20.0,
+        reconnect_wait: float = 1.0,
+        max_reconnect_wait: float = 30.0,
+    ):
+        """
+        Keeps the candles of one symbol and timeframe up to date from the exchange's kline websocket and hands out
+        a "bar closed" event the moment the exchange pushes a kline with "confirm": true, instead of sleeping until
+        the expected close and downloading.
+
+        The websocket runs on its own thread. Every time it (re)connects it subscribes to kline.{interval}.{symbol}
+        and tops up the candle cache over REST (exchange.get_candles_since), and a confirmed bar that doesn't follow
+        the last cached one is gap filled over REST before it is added, so missed pushes never leave holes. After a
+        reconnect that filled new bars the latest one is handed out as a bar closed event.
+
+        wait_for_bar blocks until the next bar closed event and returns (candles, close_ms) like
+        BarCloseScheduler.wait_for_bar, the candles are a copy so they stay good while the stream keeps going. Events
+        that piled up while the caller was busy are skipped down to the newest one (bars_skipped), so a slow bar never
+        makes the next ones run on old candles.
+        close_to_data is the time from the bar close to the candles being in hand, on the exchange's clock.
+        """
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.candles_to_dl = candles_to_dl
+        self.ws_url = ws_url
+        self.candle_cache = CandleCache(exchange=exchange) if candle_cache is None else candle_cache
+        self.ping_interval = ping_interval
+        self.reconnect_wait = reconnect_wait
+        self.max_reconnect_wait = max_reconnect_wait
+
+        self.timeframe_in_ms = exchange.get_timeframe_in_ms(timeframe=timeframe)
+        self.topic = f"kline.{exchange.get_exchange_timeframe(timeframe=timeframe)}.{symbol}"
+        self.forming_candle: dict = None
+        self.bars_closed = 0
+        self.bars_gap_filled = 0
+        self.bars_skipped = 0
+        self.reconnects = 0
+        self.close_to_data = LatencyHistogram(name="close_to_data")
+        self.bar_events: Queue = Queue()
+        self.lock = RLock()
+        self.loop: asyncio.AbstractEventLoop = None
+        self.thread: Thread = None
+        self.__subscribed = Event()
+        self.__stopping: asyncio.Event = None
+        self.__ws: aiohttp.ClientWebSocketResponse = None
+
+    def start(
+        self,
+        timeout: float = 30.0,
+    ):
+        """
+        Fills the candle cache, starts the websocket thread and waits until it is subscribed
+        """
+        with self.lock:
+            self.candle_cache.get_candles(
+                symbol=self.symbol,
+                timeframe=self.timeframe,
+                candles_to_dl=self.candles_to_dl,
+            )
+        self.thread = Thread(target=self.__run, daemon=True)
+        self.thread.start()
+        if not self.__subscribed.wait(timeout=timeout):
+            logger.warning(f"KlineStream not subscribed to {self.topic} after {timeout} seconds, still trying")
+
+    def stop(self):
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.__stop_soon)
+            self.thread.join(timeout=10)
+
+    def __stop_soon(self):
+        self.__stopping.set()
+        if self.__ws is not None:
+            asyncio.ensure_future(self.__ws.close())
+
+    def wait_for_bar(
+        self,
+        timeout: float = None,
+    ):
+        """
+        Returns
+        -------
+        tuple
+            (candles, bar close time in ms on the exchange's clock), None if nothing closed within timeout
+        """
+        try:
+            event = self.bar_events.get(timeout=timeout)
+        except Empty:
+            return None
+        # bars that closed while the caller was busy are skipped, only the newest one is handed out
+        skipped = 0
+        while True:
+            try:
+                event = self.bar_events.get_nowait()
+            except Empty:
+                break
+            skipped += 1
+        if skipped:
+            self.bars_skipped += skipped
+            logger.warning(f"KlineStream {self.topic} skipped {skipped} stale bars, running on the newest")
+        return event
+
+    ################################################################
+    ################################################################
+    ###################                          ###################
+    ###################        Websocket          ###################
+    ###################                          ###################
+    ################################################################
+    ################################################################
+
+    def __run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.__async_consume())
+        self.loop.close()
+
+    async def __async_consume(self):
+        self.__stopping = asyncio.Event()
+        wait = self.reconnect_wait
+        async with aiohttp.ClientSession() as session:
+            while not self.__stopping.is_set():
+                try:
+                    async with session.ws_connect(self.ws_url) as ws:
+                        self.__ws = ws
+                        await ws.send_json({"op": "subscribe", "args": [self.topic]})
+                        await asyncio.to_thread(self.__gap_fill, on_reconnect=self.__subscribed.is_set())
+                        self.__subscribed.set()
+                        wait = self.reconnect_wait
+                        await self.__read_messages(ws=ws)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    logger.warning(f"KlineStream {self.topic} connection error -> {e}")
+                except Exception as e:
+                    logger.error(f"KlineStream {self.topic} Exception -> {e}")
+
+                if self.__stopping.is_set():
+                    break
+                self.reconnects += 1
+                logger.warning(f"KlineStream {self.topic} disconnected, reconnecting in {wait} seconds")
+                try:
+                    await asyncio.wait_for(self.__stopping.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                wait = min(wait * 2, self.max_reconnect_wait)
+
+    async def __read_messages(
+        self,
+        ws: aiohttp.ClientWebSocketResponse,
+    ):
+        while not self.__stopping.is_set():
+            try:
+                msg = await ws.receive(timeout=self.ping_interval)
+            except asyncio.TimeoutError:
+                # nothing for ping_interval, the exchange drops quiet connections
+                await ws.send_json({"op": "ping"})
+                continue
+
+            if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                return
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                await self.__on_message(message=json.loads(msg.data))
+
+    async def __on_message(
+        self,
+        message: dict,
+    ):
+        if message.get("topic") != self.topic:
+            if message.get("op") == "subscribe" and not message.get("success", True):
+                logger.error(f"KlineStream couldn't subscribe to {self.topic} -> {message}")
+            return
+
+        for kline in message.get("data", []):
+            if not kline.get("confirm"):
+                self.forming_candle = kline
+                continue
+
+            candle = np.array(
+                [[
+                    float(kline["start"]),
+                    float(kline["open"]),
+                    float(kline["high"]),
+                    float(kline["low"]),
+                    float(kline["close"]),
+                    float(kline["volume"]),
+                ]]
+            )
+            with self.lock:
+                last_timestamp = self.candle_cache.get_last_timestamp(symbol=self.symbol, timeframe=self.timeframe)
+            if candle[0, 0] <= last_timestamp:
+                continue
+            if candle[0, 0] > last_timestamp + self.timeframe_in_ms:
+                logger.warning(f"KlineStream {self.topic} missed bars after {last_timestamp}, gap filling")
+                # REST off the websocket loop so pings and pushes keep going while it downloads
+                await asyncio.to_thread(self.__gap_fill, on_reconnect=False, emit=False)
+            with self.lock:
+                # the gap fill can already have brought this bar in, it is still the one that closed
+                self.candle_cache.append_candles(symbol=self.symbol, timeframe=self.timeframe, candles=candle)
+                self.__emit_bar()
+
+    def __gap_fill(
+        self,
+        on_reconnect: bool,
+        emit: bool = True,
+    ):
+        """
+        Tops up the candle cache over REST, after a reconnect the latest filled bar is handed out
+        """
+        try:
+            with self.lock:
+                before = self.candle_cache.get_last_timestamp(symbol=self.symbol, timeframe=self.timeframe)
+                self.candle_cache.get_candles(
+                    symbol=self.symbol,
+                    timeframe=self.timeframe,
+                    candles_to_dl=self.candles_to_dl,
+                )
+                filled = (self.candle_cache.get_last_timestamp(symbol=self.symbol, timeframe=self.timeframe) - before)
+                filled //= self.timeframe_in_ms
+                if filled > 0:
+                    self.bars_gap_filled += filled
+                    logger.info(f"KlineStream {self.topic} gap filled {filled} bars over REST")
+                    if on_reconnect and emit:
+                        self.__emit_bar()
+        except Exception as e:
+            logger.error(f"KlineStream {self.topic} gap fill Exception -> {e}")
+
+    def __emit_bar(self):
+        candles = self.candle_cache.get_cached_candles(
+            symbol=self.symbol,
+            timeframe=self.timeframe,
+            candles_to_dl=self.candles_to_dl,
+        ).copy()
+        close_ms = int(candles[-1, 0]) + self.timeframe_in_ms
+        self.bars_closed += 1
+        self.close_to_data.add(time() * 1000 + getattr(self.exchange, "clock_offset_ms", 0) - close_ms)
+        self.bar_events.put((candles, close_ms))
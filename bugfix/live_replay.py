@@ -0,0 +1,197 @@
+import io
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from logging import getLogger
+from multiprocessing import shared_memory
+from os import cpu_count
+from time import perf_counter
+from typing import NamedTuple
+
+from quantfreedom.enums import CandleBodyType
+from quantfreedom.strategies.strategy import Strategy
+
+logger = getLogger("info")
+
+# set in every worker by _init_worker
+_worker = {}
+
+
+class LiveReplayResult(NamedTuple):
+    """
+    live_entries and backtest_entries have one value per candle, bars before window_size - 1 are never replayed and
+    are False in both. divergences has a row for every replayed bar where they disagree.
+    """
+
+    backtest_entries: np.array
+    live_entries: np.array
+    divergences: pd.DataFrame
+    evaluations: int
+    seconds: float
+    evals_per_sec: float
+
+
+class _NullEmailSender:
+    """
+    Stands in for the strategy's EmailSender so a replay doesn't send an email for every entry it finds
+    """
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def _init_worker(
+    shm_name: str,
+    candles_shape: tuple,
+    candles_dtype: str,
+    strategy: Strategy,
+    ind_set_index: int,
+    window_size: int,
+):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker["shm"] = shm  # keep the handle alive as long as the worker
+    _worker["candles"] = np.ndarray(candles_shape, dtype=candles_dtype, buffer=shm.buf)
+    if hasattr(strategy, "email_sender"):
+        strategy.email_sender = _NullEmailSender()
+    _worker["strategy"] = strategy
+    _worker["ind_set_index"] = ind_set_index
+    _worker["window_size"] = window_size
+    # live_evaluate logs every bar, nobody reads a replay's logs and they would cost more than the evaluations
+    logger.disabled = True
+
+
+def _replay_bars(
+    first_bar: int,
+    last_bar: int,
+) -> tuple[int, np.array, float]:
+    """
+    live_evaluate on the window ending at every bar from first_bar to last_bar, the strategy's live indicators start
+    over on the first window like they do when live mode starts
+    """
+    candles = _worker["candles"]
+    strategy: Strategy = _worker["strategy"]
+    window_size = _worker["window_size"]
+    strategy.live_set_indicator(ind_set_index=_worker["ind_set_index"])
+
+    live_entries = np.zeros(last_bar - first_bar + 1, dtype=np.bool_)
+    start = perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for bar_index in range(first_bar, last_bar + 1):
+            window = candles[bar_index + 1 - window_size : bar_index + 1]
+            live_entries[bar_index - first_bar] = bool(strategy.live_evaluate(candles=window))
+    return first_bar, live_entries, perf_counter() - start
+
+
+def run_live_replay(
+    strategy: Strategy,
+    candles: np.array,
+    ind_set_index: int,
+    window_size: int = 1000,
+    max_workers: int = None,
+    bars_per_job: int = None,
+) -> LiveReplayResult:
+    """
+    Checks a strategy's live_evaluate against its backtest entries by sliding a window_size candle window over the
+    history one bar at a time, the way live mode hands candles to live_evaluate, and comparing what it says on every
+    bar with set_entries_exits_array's entries for the same bar.
+
+    The bars are split into jobs of bars_per_job contiguous bars on a process pool, each job calls
+    live_set_indicator so its live indicators warm up on its first window like a bot that was just started. The
+    candles are put in shared memory once. The backtest entries are worked out once on the whole history.
+
+    Parameters
+    ----------
+    strategy : Strategy
+        a live strategy, it needs live_set_indicator, live_evaluate and set_entries_exits_array
+    candles : np.array
+        2-dim np.array with columns in the following order [timestamp, open, high, low, close, volume]
+    ind_set_index : int
+        indicator setting to check
+    window_size : int
+        candles handed to live_evaluate, the candles_to_dl of live mode
+    max_workers : int
+        number of processes, defaults to every core
+    bars_per_job : int
+        defaults to splitting the bars into 4 jobs per worker
+
+    Returns
+    -------
+    LiveReplayResult
+        the entries of both code paths, every divergence and the throughput of the live evaluations
+    """
+    candles = np.ascontiguousarray(candles)
+    total_bars = candles.shape[0]
+    if total_bars < window_size:
+        raise Exception(f"run_live_replay needs at least window_size {window_size} candles, got {total_bars}")
+
+    first_bar = window_size - 1
+    evaluations = total_bars - first_bar
+    if bars_per_job is None:
+        bars_per_job = max(-(-evaluations // ((max_workers or cpu_count() or 1) * 4)), 1)
+    jobs = [(first, min(first + bars_per_job, total_bars) - 1) for first in range(first_bar, total_bars, bars_per_job)]
+    print(f"Replaying live_evaluate on {evaluations:,} bars in {len(jobs):,} jobs")
+
+    live_entries = np.zeros(total_bars, dtype=np.bool_)
+    job_seconds = 0.0
+    start = perf_counter()
+    shm = shared_memory.SharedMemory(create=True, size=candles.nbytes)
+    try:
+        np.ndarray(candles.shape, dtype=candles.dtype, buffer=shm.buf)[:] = candles
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(
+                shm.name,
+                candles.shape,
+                candles.dtype.str,
+                strategy,
+                ind_set_index,
+                window_size,
+            ),
+        ) as pool:
+            futures = [pool.submit(_replay_bars, first, last) for first, last in jobs]
+            for finished, future in enumerate(as_completed(futures), start=1):
+                job_first_bar, job_entries, seconds = future.result()
+                live_entries[job_first_bar : job_first_bar + job_entries.size] = job_entries
+                job_seconds += seconds
+                if finished % 10 == 0 or finished == len(futures):
+                    print(f"Finished {finished:,} of {len(futures):,} jobs")
+    finally:
+        shm.close()
+        shm.unlink()
+    seconds = perf_counter() - start
+
+    with redirect_stdout(io.StringIO()):
+        strategy.set_entries_exits_array(candles=candles, ind_set_index=ind_set_index)
+    backtest_entries = np.asarray(strategy.entries, dtype=np.bool_).copy()
+    backtest_entries[:first_bar] = False
+
+    bar_indexes = np.flatnonzero(live_entries != backtest_entries)
+    divergences = pd.DataFrame(
+        {
+            "bar_index": bar_indexes,
+            "timestamp": pd.to_datetime(candles[bar_indexes, CandleBodyType.Timestamp], unit="ms"),
+            "live": live_entries[bar_indexes],
+            "backtest": backtest_entries[bar_indexes],
+        }
+    )
+
+    evals_per_sec = evaluations / seconds if seconds else 0.0
+    print(
+        f"{evaluations:,} live evaluations in {seconds:.2f} seconds ({evals_per_sec:,.0f} evals/sec, "
+        f"{evaluations / job_seconds if job_seconds else 0.0:,.0f} per process) "
+        f"{live_entries.sum():,} live entries {backtest_entries.sum():,} backtest entries "
+        f"{bar_indexes.size:,} divergences"
+    )
+    logger.info(f"run_live_replay ind_set_index {ind_set_index} {bar_indexes.size} divergences")
+    return LiveReplayResult(
+        backtest_entries=backtest_entries,
+        live_entries=live_entries,
+        divergences=divergences,
+        evaluations=evaluations,
+        seconds=seconds,
+        evals_per_sec=evals_per_sec,
+    )
@@ -1,8 +1,7 @@
-import hmac
-import hashlib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from time import sleep, time
-from requests import get, post
 from datetime import datetime, timezone
 
 from quantfreedom.enums import (
@@ -12,6 +11,8 @@ from quantfreedom.enums import (
     TriggerDirectionType,
 )
 from quantfreedom.exchanges.exchange import UNIVERSAL_TIMEFRAMES, Exchange
+from quantfreedom.exchanges.mufex_exchange.http_session import HTTPSession
+from quantfreedom.exchanges.mufex_exchange.request_signer import MufexRequestSigner
 
 MUFEX_TIMEFRAMES = [1, 5, 15, 30, 60, 120, 240, 360, 720, "D", "W"]
 
@@ -23,15 +24,26 @@ class Mufex(Exchange):
         use_test_net: bool,
         api_key: str = None,
         secret_key: str = None,
+        http_session: HTTPSession = None,
     ):
         """
         main docs page https://www.mufex.finance/apidocs/derivatives/contract/index.html
 
         Make sure you have your position mode set to hedge or else a lot of functions will not work.
         https://www.mufex.finance/apidocs/derivatives/contract/index.html?console#t-dv_switchpositionmode
+
+        http_session is the pooled connection every request goes through, pass the same one to share it between exchanges
         """
+        self.http_session = HTTPSession() if http_session is None else http_session
+        # create_orders sends the orders of one trade at the same time on these, made on the first batch
+        self.order_pool: ThreadPoolExecutor = None
+        self.__order_pool_lock = Lock()
+        # exchange time - local time, set by BarCloseScheduler.sync_clock
+        self.clock_offset_ms = 0
         self.api_key = api_key
         self.secret_key = secret_key
+        # keyed once, every private request is signed from a copy
+        self.request_signer = MufexRequestSigner(api_key=api_key, secret_key=secret_key)
         if use_test_net:
             self.url_start = "https://api.testnet.mufex.finance"
         else:
@@ -52,25 +64,13 @@ class Mufex(Exchange):
         end_point: str,
         params: dict,
     ):
-        timestamp = str(int(time() * 1000))
-        params_as_dict_string = self.get_params_as_dict_string(params=params)
-        signature = self.__gen_signature(timestamp=timestamp, params_as_string=params_as_dict_string)
-        headers = {
-            "MF-ACCESS-API-KEY": self.api_key,
-            "MF-ACCESS-SIGN": signature,
-            "MF-ACCESS-SIGN-TYPE": "2",
-            "MF-ACCESS-TIMESTAMP": timestamp,
-            "MF-ACCESS-RECV-WINDOW": "5000",
-            "X-Referer": "A6JVVHCXZ",
-            "Content-Type": "application/json",
-        }
+        def sign():
+            params_as_dict_string, headers = self.request_signer.sign_post(params=params)
+            return {"url": self.url_start + end_point, "headers": headers, "data": params_as_dict_string}
 
         try:
-            response = post(
-                url=self.url_start + end_point,
-                headers=headers,
-                data=params_as_dict_string,
-            )
+            # signed once the rate limiter lets it go
+            response = self.http_session.post(end_point=end_point, sign=sign)
             response_json = response.json()
             return response_json
         except Exception as e:
@@ -81,36 +81,27 @@ class Mufex(Exchange):
         end_point: str,
         params: dict,
     ):
-        timestamp = str(int(time() * 1000))
-        params_as_path = self.get_params_as_path(params=params)
-        signature = self.__gen_signature(timestamp=timestamp, params_as_string=params_as_path)
-        headers = {
-            "MF-ACCESS-API-KEY": self.api_key,
-            "MF-ACCESS-SIGN": signature,
-            "MF-ACCESS-SIGN-TYPE": "2",
-            "MF-ACCESS-TIMESTAMP": timestamp,
-            "MF-ACCESS-RECV-WINDOW": "5000",
-            "Content-Type": "application/json",
-        }
+        def sign():
+            params_as_path, headers = self.request_signer.sign_get(params=params)
+            return {"url": self.url_start + end_point + "?" + params_as_path, "headers": headers}
 
         try:
-            response = get(
-                url=self.url_start + end_point + "?" + params_as_path,
-                headers=headers,
-            )
+            # signed once the rate limiter lets it go
+            response = self.http_session.get(end_point=end_point, sign=sign)
             response_json = response.json()
             return response_json
         except Exception as e:
             raise Exception(f"Mufex __HTTP_get_request - > {e}")
 
-    def __gen_signature(
-        self,
-        timestamp: str,
-        params_as_string: str,
-    ):
-        param_str = timestamp + self.api_key + "5000" + params_as_string
-        hash = hmac.new(bytes(self.secret_key, "utf-8"), param_str.encode("utf-8"), hashlib.sha256)
-        return hash.hexdigest()
+    def close(self):
+        """
+        Stops the create_orders threads and closes the http session's connections
+        """
+        with self.__order_pool_lock:
+            if self.order_pool is not None:
+                self.order_pool.shutdown(wait=False)
+                self.order_pool = None
+        self.http_session.close()
 
     ###################################################################
     ###################################################################
@@ -178,7 +169,7 @@ class Mufex(Exchange):
         # start_time = self.get_current_time_sec()
         while params["start"] + self.timeframe_in_ms < until_timestamp:
             try:
-                response: dict = get(url=self.url_start + end_point, params=params).json()
+                response: dict = self.http_session.get(end_point=end_point, url=self.url_start + end_point, params=params).json()
                 new_candles = response["data"]["list"]
                 last_candle_timestamp = int(new_candles[-1][0])
                 if last_candle_timestamp == params["start"]:
@@ -197,6 +188,80 @@ class Mufex(Exchange):
 
         return candles
 
+    def get_candles_since(
+        self,
+        symbol: str,
+        timeframe: str,
+        since_ms_time: int,
+        category: str = "linear",
+    ) -> np.array:
+        """
+        Downloads only the closed candles that opened after since_ms_time, used to top up a local candle cache
+
+        Parameters
+        ----------
+        symbol : str
+            [Mufex Symbol List](https://www.mufex.finance/apidocs/derivatives/contract/index.html?console#symbol-symbol)
+        timeframe : str
+            "1m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "12h", "d", "w"
+        since_ms_time : int
+            open time in ms of the last candle you already have
+        category : str
+            [mufex categories link](https://www.mufex.finance/apidocs/derivatives/contract/index.html?console#contract-type-contracttype)
+
+        Returns
+        -------
+        np.array
+            a 2 dim array with the following columns "timestamp", "open", "high", "low", "close", "volume", can have 0 rows
+        """
+        ex_timeframe = self.get_exchange_timeframe(timeframe=timeframe)
+        self.timeframe_in_ms = self.get_timeframe_in_ms(timeframe=timeframe)
+        # open time of the last candle that has closed
+        now_ms_time = self.get_current_time_ms() + self.clock_offset_ms
+        last_closed_ms_time = (now_ms_time // self.timeframe_in_ms - 1) * self.timeframe_in_ms
+
+        candles_list = []
+        end_point = "/public/v1/market/kline"
+        params = {
+            "category": category,
+            "symbol": symbol,
+            "interval": ex_timeframe,
+            "start": since_ms_time + self.timeframe_in_ms,
+            "end": last_closed_ms_time,
+            "limit": 1500,
+        }
+        while params["start"] <= last_closed_ms_time:
+            try:
+                response: dict = self.http_session.get(end_point=end_point, url=self.url_start + end_point, params=params).json()
+                new_candles = response["data"]["list"]
+                if not new_candles:
+                    break
+                candles_list.extend(new_candles)
+                params["start"] = int(new_candles[-1][0]) + self.timeframe_in_ms
+            except Exception as e:
+                raise Exception(f"Mufex get_candles_since {response.get('message')} - > {e}")
+
+        if not candles_list:
+            return np.empty((0, 6))
+
+        candles = np.array(candles_list, dtype=np.float_)[:, :-1]
+        candles = candles[(candles[:, 0] > since_ms_time) & (candles[:, 0] <= last_closed_ms_time)]
+        if candles.shape[0] > 0:
+            self.last_fetched_ms_time = int(candles[-1, 0])
+
+        return candles
+
+    def get_server_time_ms(self) -> int:
+        """
+        [mufex server time docs](https://www.mufex.finance/apidocs/derivatives/contract/index.html#t-servertime)
+        """
+        end_point = "/public/v1/market/time"
+        try:
+            response: dict = self.http_session.get(end_point=end_point, url=self.url_start + end_point).json()
+            return int(response["data"]["serverTime"])
+        except Exception as e:
+            raise Exception(f"Mufex get_server_time_ms -> {e}")
+
     def get_closed_pnl(
         self,
         symbol: str,
@@ -283,14 +348,14 @@ class Mufex(Exchange):
         params["symbol"] = symbol
         try:
             new_params = self.remove_none_from_dict(params=params)
-            response: dict = get(url=self.url_start + end_point, params=new_params).json()
+            response: dict = self.http_session.get(end_point=end_point, url=self.url_start + end_point, params=new_params).json()
             response["data"]["list"][0]
             data_list = response["data"]["list"]
             return data_list
         except Exception as e:
             if response.get("error_msg") == "404 Route Not Found":
                 print("404 Route Not Found")
-                sleep(0.5)
+                self.http_session.rate_limiter.pause(end_point=end_point, seconds=0.5)
             else:
                 raise Exception(f"Mufex get_all_symbols_info = Data or List is empty {response['message']} -> {e}")
 
@@ -320,14 +385,14 @@ class Mufex(Exchange):
         params["symbol"] = symbol
         try:
             new_params = self.remove_none_from_dict(params=params)
-            response: dict = get(url=self.url_start + end_point, params=new_params).json()
+            response: dict = self.http_session.get(end_point=end_point, url=self.url_start + end_point, params=new_params).json()
             data_list = response["data"]["list"][0]
 
             return data_list
         except Exception as e:
             if response.get("error_msg") == "404 Route Not Found":
                 print("404 Route Not Found")
-                sleep(0.5)
+                self.http_session.rate_limiter.pause(end_point=end_point, seconds=0.5)
             else:
                 raise Exception(f"Mufex get_risk_limit_info = Data or List is empty {response['message']} -> {e}")
 
@@ -393,6 +458,35 @@ class Mufex(Exchange):
         except Exception as e:
             raise Exception(f"Mufex create_order {response['message']} -> {e}")
 
+    def create_orders(
+        self,
+        orders: list[dict],
+    ) -> list:
+        """
+        Sends every order in orders, each one is the kwargs of create_order
+
+        Mufex has no batch create end point so the orders go out at the same time, one signed POST each over the
+        pooled http_session, and the whole batch takes about one round trip instead of one per order.
+
+        Returns
+        -------
+        list
+            the order id of every order in the same order as orders, or the Exception it raised so one order that
+            failed doesn't hide the ones that were placed
+        """
+        with self.__order_pool_lock:
+            if self.order_pool is None:
+                self.order_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mufex_orders")
+            order_pool = self.order_pool
+        futures = [order_pool.submit(self.create_order, **order) for order in orders]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
     def get_trading_fee_rates(
         self,
         symbol: str = None,
@@ -498,6 +592,34 @@ class Mufex(Exchange):
     def get_open_order_by_order_id(self, symbol: str, order_id: str):
         return dict(sorted(self.get_open_orders(symbol=symbol, order_id=order_id)[0].items()))
 
+    def get_all_open_orders(
+        self,
+        symbol: str,
+        limit: int = 50,
+    ) -> list:
+        """
+        Every open order of symbol from one request, unlike get_open_orders an empty list when nothing is open
+        """
+        end_point = "/private/v1/trade/activity-orders"
+        params = {}
+        params["symbol"] = symbol
+        params["limit"] = limit
+        response: dict = self.__HTTP_get_request(end_point=end_point, params=params)
+        try:
+            return list(response["data"]["list"])
+        except Exception as e:
+            raise Exception(f"Mufex get_all_open_orders {response['message']} -> {e}")
+
+    def get_open_order_ids(
+        self,
+        symbol: str,
+        limit: int = 50,
+    ) -> set:
+        """
+        The order id of every open order of symbol from one request, empty when nothing is open
+        """
+        return {order["orderId"] for order in self.get_all_open_orders(symbol=symbol, limit=limit)}
+
     def get_filled_orders(
         self,
         symbol: str,
@@ -544,6 +666,24 @@ class Mufex(Exchange):
     ):
         return dict(sorted(self.get_filled_orders(symbol=symbol, order_id=order_id)[0].items()))
 
+    def get_all_filled_orders(
+        self,
+        symbol: str,
+        limit: int = 200,
+    ) -> list:
+        """
+        The latest fills of symbol from one request, unlike get_filled_orders an empty list when there are none
+        """
+        end_point = "/private/v1/trade/fills"
+        params = {}
+        params["symbol"] = symbol
+        params["limit"] = limit
+        response: dict = self.__HTTP_get_request(end_point=end_point, params=params)
+        try:
+            return list(response["data"]["list"])
+        except Exception as e:
+            raise Exception(f"Mufex get_all_filled_orders {response['message']} -> {e}")
+
     def get_position_info(
         self,
         symbol: str = None,
@@ -1020,16 +1160,30 @@ class Mufex(Exchange):
         tp_price: float,
     ):
         return self.create_order(
-            symbol=symbol,
-            position_mode=1,
-            buy_sell="Sell",
-            order_type="Limit",
-            asset_size=asset_size,
-            price=tp_price,
-            reduce_only=True,
-            time_in_force="PostOnly",
+            **self.get_long_hedge_mode_tp_limit_order_params(
+                asset_size=asset_size,
+                symbol=symbol,
+                tp_price=tp_price,
+            )
         )
 
+    def get_long_hedge_mode_tp_limit_order_params(
+        self,
+        asset_size: float,
+        symbol: str,
+        tp_price: float,
+    ) -> dict:
+        return {
+            "symbol": symbol,
+            "position_mode": 1,
+            "buy_sell": "Sell",
+            "order_type": "Limit",
+            "asset_size": asset_size,
+            "price": tp_price,
+            "reduce_only": True,
+            "time_in_force": "PostOnly",
+        }
+
     def create_long_hedge_mode_sl_order(
         self,
         asset_size: float,
@@ -1037,17 +1191,31 @@ class Mufex(Exchange):
         trigger_price: float,
     ):
         return self.create_order(
-            symbol=symbol,
-            position_mode=1,
-            buy_sell="Sell",
-            order_type="Market",
-            asset_size=asset_size,
-            triggerPrice=trigger_price,
-            reduce_only=True,
-            triggerDirection=TriggerDirectionType.Fall,
-            time_in_force="GoodTillCancel",
+            **self.get_long_hedge_mode_sl_order_params(
+                asset_size=asset_size,
+                symbol=symbol,
+                trigger_price=trigger_price,
+            )
         )
 
+    def get_long_hedge_mode_sl_order_params(
+        self,
+        asset_size: float,
+        symbol: str,
+        trigger_price: float,
+    ) -> dict:
+        return {
+            "symbol": symbol,
+            "position_mode": 1,
+            "buy_sell": "Sell",
+            "order_type": "Market",
+            "asset_size": asset_size,
+            "triggerPrice": trigger_price,
+            "reduce_only": True,
+            "triggerDirection": TriggerDirectionType.Fall,
+            "time_in_force": "GoodTillCancel",
+        }
+
     def get_long_hedge_mode_position_info(
         self,
         symbol: str,
@@ -3,12 +3,18 @@ import numpy as np
 import plotly.graph_objects as go
 import pandas as pd
 
-from time import sleep
-from datetime import datetime, timedelta
+from time import sleep, time
+from datetime import datetime
 from logging import getLogger
 
 from quantfreedom.email_sender import EmailSender
 from quantfreedom.exchanges.exchange import Exchange
+from quantfreedom.exchanges.mufex_exchange.bar_scheduler import BarCloseScheduler
+from quantfreedom.exchanges.mufex_exchange.candle_cache import CandleCache
+from quantfreedom.exchanges.mufex_exchange.kline_stream import KlineStream
+from quantfreedom.exchanges.mufex_exchange.order_lifecycle import OrderLifecycle, OrderLifecycleState, TrackedOrder
+from quantfreedom.exchanges.mufex_exchange.position_cache import PositionCache
+from quantfreedom.exchanges.mufex_exchange.position_monitor import PositionMonitor
 from quantfreedom.order_handler.order import OrderHandler
 from quantfreedom.strategies.strategy import Strategy
 from quantfreedom.enums import (
@@ -33,25 +39,54 @@ class MufexLiveMode:
         symbol: str,
         trading_with: str,
         tp_order_type: str,
+        candle_cache: CandleCache = None,
+        bar_scheduler: BarCloseScheduler = None,
+        kline_stream: KlineStream = None,
+        position_monitor: PositionMonitor = None,
     ):
+        """
+        With kline_stream every bar runs off the websocket's bar closed event, build it with the same symbol,
+        timeframe and candles_to_dl you pass to run. Without one bar_scheduler sleeps until the bar close and polls
+        the candles over REST.
+
+        position_monitor moves the stop loss to break even and trails it, at every bar close and with a kline_stream
+        also on the forming candle inside the bar.
+        """
         self.order = order
+        self.candle_cache = CandleCache(exchange=exchange) if candle_cache is None else candle_cache
+        self.bar_scheduler = BarCloseScheduler(exchange=exchange) if bar_scheduler is None else bar_scheduler
+        self.kline_stream = kline_stream
+        if position_monitor is None:
+            position_monitor = PositionMonitor(exchange=exchange, order=order, symbol=symbol, kline_stream=kline_stream)
+        self.position_monitor = position_monitor
+        self.signal_ms_time = None
+        self.entry_ms_time = None
+        self.sl_order_id = 0
+        self.last_pnl = 0
         self.exchange = exchange
         self.email_sender = email_sender
         self.symbol = symbol
         self.strategy = strategy
         self.trading_with = trading_with
+        # SimulatedMufex has a sleep that doesn't wait so replays don't either
+        self.sleep = getattr(exchange, "sleep", sleep)
+        self.order_lifecycle = OrderLifecycle(exchange=exchange, symbol=symbol, sleep=self.sleep)
 
         if self.exchange.position_mode == PositionModeType.HedgeMode:
             if strategy.long_short == "long":
                 self.place_sl_order = exchange.create_long_hedge_mode_sl_order
+                self.sl_order_params = exchange.get_long_hedge_mode_sl_order_params
                 self.get_position_info = exchange.get_long_hedge_mode_position_info
                 if entry_order_type == "market":
                     self.entry_order = exchange.create_long_hedge_mode_entry_market_order
 
                 if tp_order_type == "limit":
                     self.place_tp_order = exchange.create_long_hedge_mode_tp_limit_order
+                    self.tp_order_params = exchange.get_long_hedge_mode_tp_limit_order_params
 
-        self.ex_position_size_asset = float(self.get_position_info(symbol=symbol).get("size"))
+        # every position read on a bar goes through here, order actions that change the position invalidate it
+        self.position_cache = PositionCache(get_position_info=self.get_position_info)
+        self.ex_position_size_asset = float(self.position_cache.get(symbol=symbol).get("size"))
         self.order.equity = exchange.get_equity_of_asset(trading_with=trading_with)
 
     def run(
@@ -59,365 +94,406 @@ class MufexLiveMode:
         candles_to_dl: int,
         timeframe: str,
     ):
-        latest_pnl = 0
-
         logger.info(f"Starting live trading")
         print(f"Starting live trading")
-        try:
-            self.last_pnl = self.exchange.get_latest_pnl_result(symbol=self.symbol)
-        except Exception as e:
-            logger.error(f"get_latest_pnl_result {e}")
-            pass
-        entry_order_id = 0
-        tp_order_id = 0
-        sl_order_id = 0
-
-        self.exchange.last_fetched_ms_time = int(
-            self.exchange.get_candles(
+        self.set_last_pnl()
+
+        if self.kline_stream is not None:
+            # fills the stream's candle cache and subscribes
+            self.kline_stream.start()
+            self.position_monitor.start()
+        else:
+            # fills the candle cache and sets exchange.last_fetched_ms_time
+            self.candle_cache.get_candles(
                 symbol=self.symbol,
                 timeframe=timeframe,
-            )[-1, CandleBodyType.Timestamp]
-        )
+                candles_to_dl=candles_to_dl,
+            )
         logger.info(f"Last Candle time {self.exchange.last_fetched_time_to_pd_datetime()}")
 
-        sleep(self.get_sleep_time_to_next_bar())
-
         while True:
             try:
-                logger.info("Getting Candles")
-                print("Getting Candles")
-                self.candles = self.exchange.get_candles(
-                    symbol=self.symbol,
-                    timeframe=timeframe,
-                    candles_to_dl=candles_to_dl,
-                )
-                num_candles = self.candles.shape[0]
-                print("got candles")
-
-                # bar_index bar index is always the last bar ... so if we have 200 candles we are at index 199
-                bar_index = num_candles - 1
-                msg = "Couldn't verify that the following orders were placed "
-
-                logger.debug("Setting indicator")
-                try:
-                    latest_pnl = self.exchange.get_latest_pnl_result(symbol=self.symbol)
-                except Exception as e:
-                    logger.error(f"get_latest_pnl_result {e}")
-                logger.info("Evaluating Strat")
-                if self.strategy.live_evaluate(candles=self.candles):
-                    try:
-                        logger.debug("Setting ex postion size usd")
-                        self.__set_ex_position_size_usd()
-                        if self.ex_position_size_usd > 0:
-                            logger.debug("We are in a position updating order info")
-                            self.order.position_size_usd = self.ex_position_size_usd
-                            self.__set_order_average_entry()
-                        else:
-                            logger.debug("we are not in a position updating order info")
-                            self.order.position_size_usd = 0.0
-                            self.order.position_size_asset = 0.0
-                            self.order.average_entry = 0.0
-                            self.order.equity = self.exchange.get_equity_of_asset(trading_with=self.trading_with)
-                            self.order.available_balance = self.order.equity
-                            self.order.possible_loss = 0.0
-                            self.order.cash_used = 0.0
-                            self.order.cach_borrowed = 0.0
-
-                        logger.debug("calculate_stop_loss")
-                        sl_price = self.order.calculate_stop_loss(
-                            bar_index=bar_index,
-                            candles=self.candles,
-                        )
-
-                        logger.debug("calculate_increase_position")
-                        (
-                            average_entry,
-                            entry_price,
-                            entry_size_asset,
-                            entry_size_usd,
-                            position_size_asset,
-                            position_size_usd,
-                            possible_loss,
-                            total_trades,
-                            sl_pct,
-                        ) = self.order.calculate_increase_position(
-                            average_entry=self.order.average_entry,
-                            entry_price=self.candles[bar_index, CandleBodyType.Close],
-                            equity=self.order.equity,
-                            position_size_asset=self.order.position_size_asset,
-                            position_size_usd=self.order.position_size_usd,
-                            possible_loss=self.order.possible_loss,
-                            sl_price=sl_price,
-                            total_trades=self.order.total_trades,
-                        )
-
-                        logger.debug("calculate_leverage")
-                        (
-                            available_balance,
-                            cash_borrowed,
-                            cash_used,
-                            leverage,
-                            liq_price,
-                        ) = self.order.calculate_leverage(
-                            available_balance=self.order.available_balance,
-                            average_entry=average_entry,
-                            cash_borrowed=self.order.cash_borrowed,
-                            cash_used=self.order.cash_used,
-                            position_size_usd=position_size_usd,
-                            position_size_asset=position_size_asset,
-                            sl_price=sl_price,
-                        )
-
-                        logger.debug("calculate_take_profit")
-                        (
-                            can_move_sl_to_be,
-                            tp_price,
-                            tp_pct,
-                        ) = self.order.calculate_take_profit(
-                            average_entry=average_entry,
-                            position_size_usd=position_size_usd,
-                            possible_loss=possible_loss,
-                        )
-                        logger.debug("filling order result")
-                        self.order.fill_order_result(
-                            available_balance=available_balance,
-                            average_entry=average_entry,
-                            can_move_sl_to_be=can_move_sl_to_be,
-                            cash_borrowed=cash_borrowed,
-                            cash_used=cash_used,
-                            entry_price=entry_price,
-                            entry_size_asset=entry_size_asset,
-                            entry_size_usd=entry_size_usd,
-                            equity=self.order.equity,
-                            exit_price=np.nan,
-                            fees_paid=np.nan,
-                            leverage=leverage,
-                            liq_price=liq_price,
-                            order_status=OrderStatus.EntryFilled,
-                            position_size_asset=position_size_asset,
-                            position_size_usd=position_size_usd,
-                            possible_loss=possible_loss,
-                            realized_pnl=np.nan,
-                            sl_pct=sl_pct,
-                            sl_price=sl_price,
-                            total_trades=total_trades,
-                            tp_pct=tp_pct,
-                            tp_price=tp_price,
-                        )
-                        logger.info("We are in a position and filled the result")
-
-                        # place the order
-                        send_verify_error = False
-                        logger.info("Placing Entry Order")
-                        entry_order_id = self.entry_order(
-                            asset_size=self.order.entry_size_asset,
-                            symbol=self.symbol,
-                        )
-
-                        logger.info(f"Submitted entry order -> [order_id={entry_order_id}]")
-                        sleep(1.5)
-
-                        # check if order fileld
-                        logger.debug(f"Checking if entry order was filled")
-                        if self.exchange.check_if_order_filled(
-                            order_id=entry_order_id,
-                            symbol=self.symbol,
-                        ):
-                            logger.info("Entry was filled")
-                        else:
-                            msg += f"entry_order_id {entry_order_id} "
-                            send_verify_error = True
-                            logger.warning(f"Couldn't verify entry order was filled {entry_order_id}")
-
-                        # cancel other orders if in position
-                        logger.info(f"checking if in position to cancel tp and sl")
-                        self.__set_ex_position_size_asset()
-                        if self.ex_position_size_asset > 0:
-                            logger.info(f"We are in a pos and trying to cancel tp and sl")
-                            if self.exchange.cancel_all_open_orders_per_symbol(symbol=self.symbol):
-                                logger.info(f"Canceled the orders")
-                            else:
-                                logger.warning("Wasn't able to verify that the tp and sl were canceled")
-
-                        sleep(1)
-
-                        # set the levergae
-                        logger.info("Setting leverage")
-                        if self.exchange.set_leverage(
-                            symbol=self.symbol,
-                            leverage=self.order.leverage,
-                        ):
-                            logger.info(f"Leverage Changed")
-                        else:
-                            logger.warning("Couldn't verify that leverage was set")
-                            msg += f"leverage was set "
-                            send_verify_error = True
-
-                        logger.info(f"Submitting stop loss order")
-                        sl_order_id = self.place_sl_order(
-                            asset_size=self.ex_position_size_asset,
-                            symbol=self.symbol,
-                            trigger_price=self.order.sl_price,
-                        )
-                        logger.info(f"Submitted SL order -> [order_id={sl_order_id}]")
-
-                        sleep(1)
-                        logger.info(f"Submitting take profit order")
-                        tp_order_id = self.place_tp_order(
-                            asset_size=self.ex_position_size_asset,
-                            symbol=self.symbol,
-                            tp_price=self.order.tp_price,
-                        )
-                        logger.info(f"Submitted TP order -> [order_id={tp_order_id}]")
-                        # sleep 1 second before checking to see if orders were placed
-                        sleep(1)
-                        logger.info(f"Checking if stop loss was placed")
-                        if self.exchange.check_if_order_open(
-                            order_id=sl_order_id,
-                            symbol=self.symbol,
-                        ):
-                            logger.info(f"Stop loss was placed")
-                        else:
-                            logger.warning(f"Couldn't verify sl order was placed {sl_order_id} ")
-                            msg += f"sl_order_id {sl_order_id} "
-                            send_verify_error = True
-
-                        logger.debug(f"Checking if tp was placed")
-                        if self.exchange.check_if_order_open(
-                            order_id=tp_order_id,
-                            symbol=self.symbol,
-                        ):
-                            logger.info(f"take profit placed")
-                        else:
-                            logger.info(f"Couldn't verify tp order was filled {tp_order_id}")
-                            msg += f"tp_order_id {tp_order_id}"
-                            send_verify_error = True
-
-                        if send_verify_error:
-                            logger.info("Something wan't verified so rechecking all")
-                            entry_placed = self.exchange.check_if_order_filled(
-                                symbol=self.symbol,
-                                order_id=entry_order_id,
-                            )
-                            leverage_changed = self.exchange.set_leverage(
-                                leverage=self.order.leverage,
-                                symbol=self.symbol,
-                            )
-                            sl_placed = self.exchange.check_if_order_open(
-                                order_id=sl_order_id,
-                                symbol=self.symbol,
-                            )
-                            tp_placed = self.exchange.check_if_order_open(
-                                order_id=tp_order_id,
-                                symbol=self.symbol,
-                            )
-                            verify_list = [entry_placed, leverage_changed, sl_placed, tp_placed]
-                            if not all(v == True for v in verify_list):
-                                logger.error(msg)
-                                raise Exception(msg)
-                            logger.info("All verified")
-
-                        else:
-                            self.__set_exchange_variables(
-                                entry_order_id=entry_order_id,
-                                sl_order_id=sl_order_id,
-                                tp_order_id=tp_order_id,
-                            )
-                            message = self.__create_entry_successful_message()
-                            print('Placed a new Trade')
-                            # entry_filename = self.__get_entry_plot_filename()
-                            # strategy_filename = self.strategy.get_strategy_plot_filename(candles=self.candles)
-                            # self.email_sender.email_new_order(
-                            #     message=message,
-                            #     entry_filename=entry_filename,
-                            #     strategy_filename=strategy_filename,
-                            # )
-                            logger.info("Entry placed on exchange")
-                            trade_logger.info(f"{message}")
-
-                    except RejectedOrder as e:
-                        pass
-                    except Exception as e:
-                        logger.error(f"Exception Entry -> {e}")
-                        raise Exception(f"Exception Entry -> {e}")
-                    self.__set_ex_position_size_asset()
-                    if self.ex_position_size_asset > 0:
-                        logger.info(f"We are in a position ... checking to move stop loss")
-                        try:
-                            current_candle = self.candles[bar_index, :]
-                            logger.debug("Checking to move stop to break even")
-                            sl_to_be_price, sl_to_be_pct = self.order.check_move_sl_to_be(current_candle=current_candle)
-                            if sl_to_be_price:
-                                if self.exchange.move_stop_order(
-                                    symbol=self.symbol,
-                                    order_id=sl_order_id,
-                                    asset_size=self.ex_position_size_asset,
-                                    new_price=sl_to_be_price,
-                                ):
-                                    logger.info(f"Moved stop loss from {self.order.sl_price} to {sl_to_be_price}")
-                                    self.order.sl_price = sl_to_be_price
-                                    self.order.sl_pct = sl_to_be_pct
-                                else:
-                                    logger.warning(f"Couldn't verify sl to be was moved {sl_order_id}")
-                                    raise Exception(f"Exception Move sl to be -> {e}")
-
-                            logger.debug("Checking to move trailing stop loss")
-                            tsl_price, tsl_pct = self.order.check_move_tsl(current_candle=current_candle)
-                            if tsl_price:
-                                if self.exchange.move_stop_order(
-                                    symbol=self.symbol,
-                                    order_id=sl_order_id,
-                                    asset_size=self.ex_position_size_asset,
-                                    new_price=tsl_price,
-                                ):
-                                    logger.info(f"Moved stop loss from {self.order.sl_price} to {tsl_price}")
-                                    self.order.sl_price = tsl_price
-                                    self.order.sl_price = tsl_pct
-                                else:
-                                    logger.warning(f"Couldn't verify tsl was moved {sl_order_id}")
-                                    raise Exception(f"Exception Move TSL -> {e}")
-
-                        except Exception as e:
-                            logger.error(f"Exception checking MoveStopLoss -> {e}")
-                            raise Exception(f"Exception checking MoveStopLoss -> {e}")
-                elif latest_pnl != self.last_pnl:
-                    print(f"Got a new pnl {latest_pnl}")
-                    logger.info(f"Got a new pnl {latest_pnl}")
-                    # self.email_sender.email_pnl(pnl=latest_pnl)
-                    self.last_pnl = latest_pnl
+                if self.kline_stream is not None:
+                    candles, close_ms = self.kline_stream.wait_for_bar()
                 else:
-                    pass
+                    candles, close_ms = self.bar_scheduler.wait_for_bar(
+                        candle_cache=self.candle_cache,
+                        symbol=self.symbol,
+                        timeframe=timeframe,
+                        candles_to_dl=candles_to_dl,
+                    )
+                if candles is None:
+                    logger.warning("Skipping this bar, its candle never showed up")
+                    continue
+                print("got candles")
+                self.run_bar(candles=candles)
+                self.bar_scheduler.record_bar(
+                    close_ms=close_ms,
+                    signal_ms_time=self.signal_ms_time,
+                    order_ms_time=self.entry_ms_time,
+                )
             except Exception as e:
                 logger.error(f"Exception -> {e}")
                 self.last_pnl = 0 #joe edit
                 # self.email_sender.email_error_msg(msg=f"Exception -> {e}")
                 # raise Exception(f"Exception -> {e}")
-            sleep(self.get_sleep_time_to_next_bar())
 
-    def get_sleep_time_to_next_bar(self):
-        ms_to_next_candle = max(
-            0,
-            (self.exchange.last_fetched_ms_time + self.exchange.timeframe_in_ms * 2)
-            - self.exchange.get_current_time_ms(),
+    def set_last_pnl(self):
+        try:
+            self.last_pnl = self.exchange.get_latest_pnl_result(symbol=self.symbol)
+        except Exception as e:
+            logger.error(f"get_latest_pnl_result {e}")
+            self.last_pnl = 0
+
+    def run_bar(
+        self,
+        candles: np.array,
+    ):
+        """
+        Everything live mode does once a bar has closed: evaluate the strategy on candles, place and verify an entry,
+        move the stop loss and check for a new pnl. Raises when something couldn't be verified
+        """
+        bar_index = self.set_bar(candles=candles)
+
+        latest_pnl = self.last_pnl
+        try:
+            latest_pnl = self.exchange.get_latest_pnl_result(symbol=self.symbol)
+        except Exception as e:
+            logger.error(f"get_latest_pnl_result {e}")
+        if self.evaluate():
+            self.place_entry(bar_index=bar_index)
+        else:
+            self.check_new_pnl(latest_pnl=latest_pnl)
+
+        self.check_move_stop_loss(bar_index=bar_index)
+
+    def set_bar(
+        self,
+        candles: np.array,
+    ) -> int:
+        """
+        Starts a new bar on candles
+
+        Returns
+        -------
+        int
+            the bar index of the bar that just closed
+        """
+        self.candles = candles
+        self.signal_ms_time = None
+        self.entry_ms_time = None
+        self.position_cache.invalidate(symbol=self.symbol)
+        # bar_index bar index is always the last bar ... so if we have 200 candles we are at index 199
+        return self.candles.shape[0] - 1
+
+    def evaluate(self) -> bool:
+        """
+        Evaluates the strategy on the bar's candles, signal_ms_time is when it gave an entry signal
+        """
+        logger.info("Evaluating Strat")
+        entry_signal = self.strategy.live_evaluate(candles=self.candles)
+        if entry_signal:
+            self.signal_ms_time = time() * 1000
+        return entry_signal
+
+    def place_entry(
+        self,
+        bar_index: int,
+    ):
+        """
+        Places the entry for bar_index with leverage set and the old orders canceled first, then the sl and tp, and
+        raises when any of it couldn't be verified
+        """
+        msg = "Couldn't verify that the following orders were placed "
+        # nothing moves the stop while the orders are being replaced
+        self.position_monitor.clear_position()
+        try:
+            self.set_order_position()
+            self.calculate_entry_order(bar_index=bar_index)
+            logger.info("We are in a position and filled the result")
+
+            # leverage and the old tp and sl are taken care of first so the new sl and tp go out right after the fill
+            logger.info("Setting leverage")
+            leverage_set = self.exchange.set_leverage(
+                symbol=self.symbol,
+                leverage=self.order.leverage,
+            )
+            self.position_cache.invalidate(symbol=self.symbol)
+            if leverage_set:
+                logger.info(f"Leverage Changed")
+            else:
+                logger.warning("Couldn't verify that leverage was set")
+                msg += f"leverage was set "
+
+            # always, a tp or sl left over from a position that was closed would still be open when flat
+            logger.info(f"Canceling the open orders before the entry")
+            if self.exchange.cancel_all_open_orders_per_symbol(symbol=self.symbol):
+                logger.info(f"Canceled the orders")
+            else:
+                logger.warning("Wasn't able to verify that the tp and sl were canceled")
+
+            logger.info("Placing Entry Order")
+            entry = self.order_lifecycle.submit(
+                role="entry",
+                place=self.entry_order,
+                asset_size=self.order.entry_size_asset,
+                symbol=self.symbol,
+            )
+            self.entry_ms_time = time() * 1000
+            self.position_cache.invalidate(symbol=self.symbol)
+
+            logger.debug(f"Checking if entry order was filled")
+            if self.order_lifecycle.wait_until_filled(tracked=entry):
+                logger.info("Entry was filled")
+            else:
+                msg += f"entry_order_id {entry.order_id} "
+                logger.warning(f"Couldn't verify entry order was filled {entry.order_id}")
+
+            sl = tp = None
+            self.__set_ex_position_size_asset()
+            if self.ex_position_size_asset > 0:
+                logger.info(f"Submitting stop loss and take profit orders")
+                sl, tp = self.order_lifecycle.submit_batch(
+                    roles=["sl", "tp"],
+                    orders=self.get_sl_tp_orders_params(),
+                    retry=True,
+                )
+                self.sl_order_id = sl.order_id
+
+                if self.order_lifecycle.wait_until_all_open(tracked_orders=[sl, tp]):
+                    logger.info(f"sl and tp orders were placed")
+
+            self.verify_protected(entry=entry, sl=sl, tp=tp, leverage_set=leverage_set, msg=msg)
+            self.__set_exchange_variables(
+                entry_order_id=entry.order_id,
+                sl_order_id=sl.order_id,
+                tp_order_id=tp.order_id,
+            )
+            self.report_entry()
+
+        except RejectedOrder as e:
+            pass
+        except Exception as e:
+            logger.error(f"Exception Entry -> {e}")
+            raise Exception(f"Exception Entry -> {e}")
+
+    def set_order_position(
+        self,
+        equity: float = None,
+    ):
+        """
+        Fills self.order with the exchange position from the position cache, when there is no position equity is
+        fetched unless it is passed in
+        """
+        logger.debug("Setting ex postion size usd")
+        self.__set_ex_position_size_usd()
+        if self.ex_position_size_usd > 0:
+            logger.debug("We are in a position updating order info")
+            self.order.position_size_usd = self.ex_position_size_usd
+            self.__set_order_average_entry()
+        else:
+            logger.debug("we are not in a position updating order info")
+            self.order.position_size_usd = 0.0
+            self.order.position_size_asset = 0.0
+            self.order.average_entry = 0.0
+            if equity is None:
+                equity = self.exchange.get_equity_of_asset(trading_with=self.trading_with)
+            self.order.equity = equity
+            self.order.available_balance = self.order.equity
+            self.order.possible_loss = 0.0
+            self.order.cash_used = 0.0
+            self.order.cach_borrowed = 0.0
+
+    def get_sl_tp_orders_params(self) -> list[dict]:
+        """
+        Returns
+        -------
+        list[dict]
+            the create_order kwargs of the sl and the tp for the exchange position size
+        """
+        return [
+            self.sl_order_params(
+                asset_size=self.ex_position_size_asset,
+                symbol=self.symbol,
+                trigger_price=self.order.sl_price,
+            ),
+            self.tp_order_params(
+                asset_size=self.ex_position_size_asset,
+                symbol=self.symbol,
+                tp_price=self.order.tp_price,
+            ),
+        ]
+
+    def verify_protected(
+        self,
+        entry: TrackedOrder,
+        sl: TrackedOrder,
+        tp: TrackedOrder,
+        leverage_set: bool,
+        msg: str,
+    ):
+        """
+        Raises with msg and every order that didn't get there unless the entry is filled with the sl and tp open and
+        leverage set
+        """
+        for tracked in [sl, tp]:
+            if tracked is not None and tracked.state != OrderLifecycleState.Open:
+                logger.warning(f"Couldn't verify {tracked.role} order was placed {tracked.order_id}")
+                msg += f"{tracked.role}_order_id {tracked.order_id} "
+
+        if not self.order_lifecycle.protect(entry=entry, protective_orders=[sl, tp]) or not leverage_set:
+            logger.error(msg)
+            raise Exception(msg)
+        unprotected_ms = self.order_lifecycle.get_unprotected_ms(entry=entry, protective_orders=[sl, tp])
+        logger.info(f"Position protected {unprotected_ms} ms after the entry was filled")
+
+    def report_entry(self):
+        """
+        Logs the entry once the exchange variables are set
+        """
+        message = self.create_entry_successful_message()
+        print('Placed a new Trade')
+        # entry_filename = self.__get_entry_plot_filename()
+        # strategy_filename = self.strategy.get_strategy_plot_filename(candles=self.candles)
+        # self.email_sender.email_new_order(
+        #     message=message,
+        #     entry_filename=entry_filename,
+        #     strategy_filename=strategy_filename,
+        # )
+        logger.info("Entry placed on exchange")
+        trade_logger.info(f"{message}")
+
+    def check_new_pnl(
+        self,
+        latest_pnl: float,
+    ):
+        if latest_pnl != self.last_pnl:
+            print(f"Got a new pnl {latest_pnl}")
+            logger.info(f"Got a new pnl {latest_pnl}")
+            # self.email_sender.email_pnl(pnl=latest_pnl)
+            self.last_pnl = latest_pnl
+
+    def check_move_stop_loss(
+        self,
+        bar_index: int,
+    ):
+        """
+        Hands the position to the position monitor, which moves the stop loss to break even and trails it
+        """
+        self.__set_ex_position_size_asset()
+        if self.ex_position_size_asset > 0:
+            logger.info(f"We are in a position ... checking to move stop loss")
+            self.position_monitor.set_position(
+                position_size_asset=self.ex_position_size_asset,
+                sl_order_id=self.sl_order_id or None,
+            )
+            self.position_monitor.check(current_candle=self.candles[bar_index, :])
+        else:
+            self.position_monitor.clear_position()
+        self.position_cache.log_stats()
+
+    def calculate_entry_order(
+        self,
+        bar_index: int,
+    ):
+        """
+        Works out the sl, entry size, leverage and tp for an entry on bar_index of self.candles and fills the order
+        result, self.order has to already have the position info from the exchange
+        """
+        logger.debug("calculate_stop_loss")
+        sl_price = self.order.calculate_stop_loss(
+            bar_index=bar_index,
+            candles=self.candles,
+        )
+
+        logger.debug("calculate_increase_position")
+        (
+            average_entry,
+            entry_price,
+            entry_size_asset,
+            entry_size_usd,
+            position_size_asset,
+            position_size_usd,
+            possible_loss,
+            total_trades,
+            sl_pct,
+        ) = self.order.calculate_increase_position(
+            average_entry=self.order.average_entry,
+            entry_price=self.candles[bar_index, CandleBodyType.Close],
+            equity=self.order.equity,
+            position_size_asset=self.order.position_size_asset,
+            position_size_usd=self.order.position_size_usd,
+            possible_loss=self.order.possible_loss,
+            sl_price=sl_price,
+            total_trades=self.order.total_trades,
+        )
+
+        logger.debug("calculate_leverage")
+        (
+            available_balance,
+            cash_borrowed,
+            cash_used,
+            leverage,
+            liq_price,
+        ) = self.order.calculate_leverage(
+            available_balance=self.order.available_balance,
+            average_entry=average_entry,
+            cash_borrowed=self.order.cash_borrowed,
+            cash_used=self.order.cash_used,
+            position_size_usd=position_size_usd,
+            position_size_asset=position_size_asset,
+            sl_price=sl_price,
         )
-        td = str(timedelta(seconds=ms_to_next_candle / 1000)).split(":")
-        logger.info(f"Will sleep for {td[0]} hrs {td[1]} mins and {td[2]} seconds till next bar\n")
-        print(f"Will sleep for {td[0]} hrs {td[1]} mins and {td[2]} seconds till next bar\n")
 
-        return int(ms_to_next_candle / 1000)
+        logger.debug("calculate_take_profit")
+        (
+            can_move_sl_to_be,
+            tp_price,
+            tp_pct,
+        ) = self.order.calculate_take_profit(
+            average_entry=average_entry,
+            position_size_usd=position_size_usd,
+            possible_loss=possible_loss,
+        )
+        logger.debug("filling order result")
+        self.order.fill_order_result(
+            available_balance=available_balance,
+            average_entry=average_entry,
+            can_move_sl_to_be=can_move_sl_to_be,
+            cash_borrowed=cash_borrowed,
+            cash_used=cash_used,
+            entry_price=entry_price,
+            entry_size_asset=entry_size_asset,
+            entry_size_usd=entry_size_usd,
+            equity=self.order.equity,
+            exit_price=np.nan,
+            fees_paid=np.nan,
+            leverage=leverage,
+            liq_price=liq_price,
+            order_status=OrderStatus.EntryFilled,
+            position_size_asset=position_size_asset,
+            position_size_usd=position_size_usd,
+            possible_loss=possible_loss,
+            realized_pnl=np.nan,
+            sl_pct=sl_pct,
+            sl_price=sl_price,
+            total_trades=total_trades,
+            tp_pct=tp_pct,
+            tp_price=tp_price,
+        )
 
     def __set_ex_position_size_asset(self):
         logger.debug(f"Setting position size asset")
-        self.ex_position_size_asset = float(self.get_position_info(symbol=self.symbol)["size"])
+        self.ex_position_size_asset = float(self.position_cache.get(symbol=self.symbol)["size"])
 
     def __set_ex_position_size_usd(self):
         logger.debug(f"Setting position size usd")
-        pos_val = self.get_position_info(symbol=self.symbol)["positionValue"]
+        pos_val = self.position_cache.get(symbol=self.symbol)["positionValue"]
         self.ex_position_size_usd = 0 if pos_val == "" else float(pos_val)
 
     def __set_order_average_entry(self):
         logger.debug(f"Setting average entry")
-        self.order.average_entry = float(self.get_position_info(symbol=self.symbol)["entryPrice"])
+        self.order.average_entry = float(self.position_cache.get(symbol=self.symbol)["entryPrice"])
 
     def __set_ex_possible_loss(self):
         logger.debug(f"setting all exchange vars")
@@ -439,11 +515,24 @@ class MufexLiveMode:
 
     def __set_exchange_variables(self, entry_order_id, sl_order_id, tp_order_id):
         logger.debug(f"setting all exchange vars")
-        pos_info = self.get_position_info(symbol=self.symbol)
-        entry_info = self.exchange.get_filled_order_by_order_id(symbol=self.symbol, order_id=entry_order_id)
-        tp_info = self.exchange.get_open_order_by_order_id(symbol=self.symbol, order_id=tp_order_id)
-        sl_info = self.exchange.get_open_order_by_order_id(symbol=self.symbol, order_id=sl_order_id)
+        # one request for the open orders and one for the fills instead of one per order
+        order_reconciler = self.order_lifecycle.order_reconciler
+        order_reconciler.refresh()
+        self.set_exchange_variables_from_info(
+            pos_info=self.position_cache.get(symbol=self.symbol),
+            entry_info=order_reconciler.get_filled_order(order_id=entry_order_id),
+            tp_info=order_reconciler.get_open_order(order_id=tp_order_id),
+            sl_info=order_reconciler.get_open_order(order_id=sl_order_id),
+        )
+        order_reconciler.log_stats()
 
+    def set_exchange_variables_from_info(
+        self,
+        pos_info: dict,
+        entry_info: dict,
+        tp_info: dict,
+        sl_info: dict,
+    ):
         self.ex_position_size_asset = float(pos_info.get("size"))
         self.ex_position_size_usd = float(pos_info.get("positionValue"))
         self.ex_average_entry = float(pos_info.get("entryPrice"))
@@ -470,7 +559,7 @@ class MufexLiveMode:
         logger.debug(f"getting pct difference")
         return round(abs((starting_num - diff_num) / starting_num) * 100, 3)
 
-    def __create_entry_successful_message(self):
+    def create_entry_successful_message(self):
         logger.debug(f"Creating message")
         self.__set_ex_possible_loss()
         self.__set_ex_possible_profit()
@@ -0,0 +1,186 @@
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from logging import getLogger
+
+from quantfreedom.exchanges.exchange import Exchange
+from quantfreedom.exchanges.mufex_exchange.bar_scheduler import BarCloseScheduler
+from quantfreedom.exchanges.mufex_exchange.candle_cache import CandleCache
+from quantfreedom.exchanges.mufex_exchange.mufex_live_mode import MufexLiveMode
+
+logger = getLogger("info")
+
+
+class LiveBot:
+    def __init__(
+        self,
+        live_mode: MufexLiveMode,
+        timeframe: str,
+        candles_to_dl: int,
+        name: str = None,
+    ):
+        self.live_mode = live_mode
+        self.timeframe = timeframe
+        self.candles_to_dl = candles_to_dl
+        self.name = f"{live_mode.symbol} {timeframe} {type(live_mode.strategy).__name__}" if name is None else name
+        self.bars_run = 0
+        self.errors = 0
+
+
+class MufexMultiLiveMode:
+    def __init__(
+        self,
+        exchange: Exchange,
+        candle_cache: CandleCache = None,
+        bar_scheduler: BarCloseScheduler = None,
+        max_workers: int = 8,
+    ):
+        """
+        Runs many live bots (symbol, timeframe, strategy, order settings) in one process instead of one process per
+        MufexLiveMode.run
+
+        There is one bar_scheduler for all bots, it wakes right after the next bar close of any timeframe in use,
+        polls the new candles once per (symbol, timeframe) through the shared candle cache and then runs
+        MufexLiveMode.run_bar for every bot on that timeframe on a thread pool of max_workers, so one bot placing
+        orders doesn't hold up the rest. A bot that raises is logged and counted and the other bots carry on.
+
+        Every bot needs its own strategy and OrderHandler, the exchange (or at least its HTTPSession) and the candle
+        cache are shared. Build the live modes with candle_cache=multi_live_mode.candle_cache:
+
+            multi = MufexMultiLiveMode(exchange=mufex)
+            multi.add_bot(MufexLiveMode(..., symbol="BTCUSDT", candle_cache=multi.candle_cache), "5m", 1000)
+            multi.add_bot(MufexLiveMode(..., symbol="ETHUSDT", candle_cache=multi.candle_cache), "5m", 1000)
+            multi.run()
+        """
+        self.exchange = exchange
+        self.candle_cache = CandleCache(exchange=exchange) if candle_cache is None else candle_cache
+        self.bar_scheduler = BarCloseScheduler(exchange=exchange) if bar_scheduler is None else bar_scheduler
+        self.max_workers = max_workers
+        self.bots: list[LiveBot] = []
+
+    def add_bot(
+        self,
+        live_mode: MufexLiveMode,
+        timeframe: str,
+        candles_to_dl: int,
+        name: str = None,
+    ):
+        """
+        Every bot needs a symbol of its own, each entry cancels all the open orders of its symbol (both sides) so two
+        bots on one symbol would cancel each other's sl / tp, and two on the same side would trade one position
+        """
+        for bot in self.bots:
+            if bot.live_mode.symbol == live_mode.symbol:
+                raise Exception(f"MufexMultiLiveMode {bot.name} already trades {live_mode.symbol}, one bot per symbol")
+        bot = LiveBot(
+            live_mode=live_mode,
+            timeframe=timeframe,
+            candles_to_dl=candles_to_dl,
+            name=name,
+        )
+        self.bots.append(bot)
+        logger.info(f"Added live bot {bot.name}")
+        return bot
+
+    def run(self):
+        if not self.bots:
+            raise Exception("MufexMultiLiveMode add at least one bot with add_bot before calling run")
+
+        logger.info(f"Starting live trading for {len(self.bots)} bots")
+        print(f"Starting live trading for {len(self.bots)} bots")
+        timeframes = {bot.timeframe: self.exchange.get_timeframe_in_ms(timeframe=bot.timeframe) for bot in self.bots}
+
+        for bot in self.bots:
+            bot.live_mode.set_last_pnl()
+        # fill the candle cache so every bar after this only downloads the new candles
+        for timeframe in timeframes:
+            self.__get_candles_per_symbol(timeframe=timeframe)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                next_timeframe_in_ms = min(
+                    timeframes.values(),
+                    key=lambda timeframe_in_ms: self.bar_scheduler.next_bar_close_ms(timeframe_in_ms=timeframe_in_ms),
+                )
+                close_ms = self.bar_scheduler.sleep_until_bar_close(timeframe_in_ms=next_timeframe_in_ms)
+
+                for timeframe, timeframe_in_ms in timeframes.items():
+                    if self.bar_scheduler.is_bar_close(close_ms=close_ms, timeframe_in_ms=timeframe_in_ms):
+                        self.run_timeframe(timeframe=timeframe, close_ms=close_ms, pool=pool)
+
+    def run_timeframe(
+        self,
+        timeframe: str,
+        close_ms: int,
+        pool: ThreadPoolExecutor,
+    ):
+        bots = [bot for bot in self.bots if bot.timeframe == timeframe]
+        candles_per_symbol = self.__get_candles_per_symbol(timeframe=timeframe, close_ms=close_ms)
+
+        futures = [
+            pool.submit(self.__run_bot, bot, candles_per_symbol[bot.live_mode.symbol][-bot.candles_to_dl :], close_ms)
+            for bot in bots
+            if bot.live_mode.symbol in candles_per_symbol
+        ]
+        # candle views are only good until the next cache update so wait for every bot on this bar
+        wait(futures)
+
+    def __get_candles_per_symbol(
+        self,
+        timeframe: str,
+        close_ms: int = None,
+    ) -> dict[str, np.array]:
+        """
+        close_ms None just tops up the cache, otherwise every symbol is polled until the bar closing at close_ms is in
+        and a symbol whose bar doesn't show up is left out
+        """
+        candles_to_dl_per_symbol = {}
+        for bot in self.bots:
+            if bot.timeframe == timeframe:
+                symbol = bot.live_mode.symbol
+                candles_to_dl_per_symbol[symbol] = max(candles_to_dl_per_symbol.get(symbol, 0), bot.candles_to_dl)
+
+        candles_per_symbol = {}
+        for symbol, candles_to_dl in candles_to_dl_per_symbol.items():
+            try:
+                if close_ms is None:
+                    candles_per_symbol[symbol] = self.candle_cache.get_candles(
+                        symbol=symbol,
+                        timeframe=timeframe,
+                        candles_to_dl=candles_to_dl,
+                    )
+                else:
+                    candles = self.bar_scheduler.poll_for_bar(
+                        candle_cache=self.candle_cache,
+                        symbol=symbol,
+                        timeframe=timeframe,
+                        candles_to_dl=candles_to_dl,
+                        close_ms=close_ms,
+                        timeframe_in_ms=self.exchange.get_timeframe_in_ms(timeframe=timeframe),
+                    )
+                    if candles is None:
+                        logger.warning(f"{symbol} {timeframe} bar never showed up skipping its bots this bar")
+                    else:
+                        candles_per_symbol[symbol] = candles
+            except Exception as e:
+                logger.error(f"Couldn't get candles for {symbol} {timeframe} skipping its bots this bar -> {e}")
+        return candles_per_symbol
+
+    def __run_bot(
+        self,
+        bot: LiveBot,
+        candles: np.array,
+        close_ms: int,
+    ):
+        try:
+            bot.live_mode.run_bar(candles=candles)
+            self.bar_scheduler.record_bar(
+                close_ms=close_ms,
+                signal_ms_time=bot.live_mode.signal_ms_time,
+                order_ms_time=bot.live_mode.entry_ms_time,
+            )
+        except Exception as e:
+            bot.errors += 1
+            bot.live_mode.last_pnl = 0
+            logger.error(f"{bot.name} Exception -> {e}")
+        bot.bars_run += 1
@@ -0,0 +1,455 @@
+import asyncio
+import json
+import numpy as np
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from logging import getLogger
+from threading import Lock, Thread
+from time import perf_counter, sleep, time
+from urllib.parse import parse_qsl, urlsplit
+
+logger = getLogger("info")
+
+INTERVAL_IN_MS = {
+    "1": 60_000,
+    "5": 300_000,
+    "15": 900_000,
+    "30": 1_800_000,
+    "60": 3_600_000,
+    "120": 7_200_000,
+    "240": 14_400_000,
+    "360": 21_600_000,
+    "720": 43_200_000,
+    "D": 86_400_000,
+    "W": 604_800_000,
+}
+
+
+def make_candles(
+    timestamps: np.array,
+    timeframe_in_ms: int,
+    price: float,
+) -> np.array:
+    """
+    Made up candles for the open times in timestamps, a sine wave around price so the same bar always has the same
+    values no matter which stand in serves it
+
+    Returns
+    -------
+    np.array
+        a 2 dim array with the following columns "timestamp", "open", "high", "low", "close", "volume"
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    opens = price * (1 + 0.01 * np.sin(timestamps / timeframe_in_ms / 20))
+    closes = price * (1 + 0.01 * np.sin((timestamps / timeframe_in_ms + 1) / 20))
+    highs = np.maximum(opens, closes) * 1.001
+    lows = np.minimum(opens, closes) * 0.999
+    return np.column_stack((timestamps, opens, highs, lows, closes, np.full(timestamps.size, 100.0)))
+
+
+class MufexStandInServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        price: float = 30000.0,
+        equity: float = 1000.0,
+        latency: float = 0.0,
+        fill_delay: float = 0.0,
+    ):
+        """
+        Local stand in for the Mufex REST api so live mode can be run start to finish without an account or a
+        network connection.
+
+        Only the end points Mufex / AsyncMufex use are there. Market orders fill at `price`, limit and trigger orders
+        sit in the open orders until canceled, and the position, fills and open orders are kept in memory. Signatures
+        are not checked. latency is added to every request and fill_delay is how long a new order takes to show up
+        in the fills / open orders, use them to see how the client deals with a slow exchange.
+
+        Candles are made up on the fly from a sine wave around price so any symbol and timeframe works.
+
+        port=0 picks a free port, start() returns the url to use as url_start
+        """
+        self.host = host
+        self.port = port
+        self.price = price
+        self.equity = equity
+        self.latency = latency
+        self.fill_delay = fill_delay
+        self.leverage = 1.0
+        self.open_orders: dict[str, dict] = {}
+        self.fills: list[dict] = []
+        self.closed_pnl: list[dict] = [{"closedPnl": "0", "createdAt": "0"}]
+        self.positions: dict[str, dict] = {}
+        self.request_log: list[tuple] = []
+        self.order_ids = count(1)
+        self.lock = Lock()
+        self.httpd: ThreadingHTTPServer = None
+        self.thread: Thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self.__make_handler())
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"Mufex stand in server running on {self.url}")
+        return self.url
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                split_url = urlsplit(self.path)
+                self.__respond(split_url.path, dict(parse_qsl(split_url.query)))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                self.__respond(urlsplit(self.path).path, json.loads(body) if body else {})
+
+            def __respond(self, path: str, params: dict):
+                started = time()
+                if server.latency:
+                    sleep(server.latency)
+                status, response = server.handle(method=self.command, path=path, params=params)
+                with server.lock:
+                    server.request_log.append((self.command, path, started, time()))
+                payload = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    ################################################################
+    ################################################################
+    ###################                          ###################
+    ###################         End Points       ###################
+    ###################                          ###################
+    ################################################################
+    ################################################################
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        params: dict,
+    ):
+        routes = {
+            ("GET", "/public/v1/market/time"): self.server_time,
+            ("GET", "/public/v1/market/kline"): self.kline,
+            ("GET", "/public/v1/instruments"): self.instruments,
+            ("GET", "/public/v1/position-risk"): self.position_risk,
+            ("GET", "/private/v1/account/trade-fee"): self.trade_fee,
+            ("GET", "/private/v1/account/balance"): self.balance,
+            ("GET", "/private/v1/account/closed-pnl"): self.get_closed_pnl,
+            ("GET", "/private/v1/account/positions"): self.get_positions,
+            ("GET", "/private/v1/trade/activity-orders"): self.get_open_orders,
+            ("GET", "/private/v1/trade/orders"): self.get_open_orders,
+            ("GET", "/private/v1/trade/fills"): self.get_fills,
+            ("POST", "/private/v1/trade/create"): self.create_order,
+            ("POST", "/private/v1/trade/cancel"): self.cancel_order,
+            ("POST", "/private/v1/trade/cancel-all"): self.cancel_all,
+            ("POST", "/private/v1/trade/replace"): self.replace_order,
+            ("POST", "/private/v1/account/set-leverage"): self.set_leverage,
+            ("POST", "/private/v1/account/set-position-mode"): self.ok,
+            ("POST", "/private/v1/account/set-isolated"): self.ok,
+        }
+        route = routes.get((method, path))
+        if route is None:
+            return 404, {"error_msg": "404 Route Not Found"}
+        try:
+            with self.lock:
+                return 200, {"code": 0, "message": "OK", "data": route(params)}
+        except Exception as e:
+            return 200, {"code": 10001, "message": str(e), "data": {}}
+
+    def ok(self, params: dict):
+        return {}
+
+    def server_time(self, params: dict):
+        return {"serverTime": str(int(time() * 1000))}
+
+    def kline(self, params: dict):
+        timeframe_in_ms = INTERVAL_IN_MS[str(params["interval"])]
+        now_ms = int(time() * 1000)
+        start = -(-int(params["start"]) // timeframe_in_ms) * timeframe_in_ms
+        end = min(int(params.get("end", now_ms)), now_ms)
+        timestamps = np.arange(start, end + 1, timeframe_in_ms)[: int(params.get("limit", 1500))]
+        candles = make_candles(timestamps=timestamps, timeframe_in_ms=timeframe_in_ms, price=self.price)
+        return {"list": [[str(int(t)), str(o), str(h), str(l), str(c), str(v), "0"] for t, o, h, l, c, v in candles]}
+
+    def instruments(self, params: dict):
+        return {
+            "list": [
+                {
+                    "symbol": params.get("symbol", "BTCUSDT"),
+                    "leverageFilter": {"maxLeverage": "100", "minLeverage": "1", "leverageStep": "0.01"},
+                    "lotSizeFilter": {"maxTradingQty": "100", "minTradingQty": "0.001", "qtyStep": "0.001"},
+                    "priceFilter": {"tickSize": "0.1"},
+                }
+            ]
+        }
+
+    def position_risk(self, params: dict):
+        return {"list": [{"symbol": params.get("symbol"), "maintainMargin": "0.005"}]}
+
+    def trade_fee(self, params: dict):
+        return {"list": [{"symbol": params.get("symbol"), "takerFeeRate": "0.0006", "makerFeeRate": "0.0002"}]}
+
+    def balance(self, params: dict):
+        return {"list": [{"coin": params.get("coin"), "equity": str(self.equity), "walletBalance": str(self.equity)}]}
+
+    def get_closed_pnl(self, params: dict):
+        return {"list": self.closed_pnl}
+
+    def get_positions(self, params: dict):
+        symbol = params.get("symbol")
+        position = self.positions.get(symbol, {"size": 0.0, "entryPrice": 0.0})
+        size = position["size"]
+        entry_price = position["entryPrice"]
+        return {
+            "list": [
+                {
+                    "symbol": symbol,
+                    "positionIdx": 1,
+                    "size": str(size),
+                    "positionValue": str(size * entry_price) if size else "",
+                    "entryPrice": str(entry_price),
+                    "leverage": str(self.leverage),
+                    "liqPrice": str(entry_price * (1 - 1 / self.leverage) if size else 0),
+                }
+            ]
+        }
+
+    def get_open_orders(self, params: dict):
+        now = time()
+        orders = [
+            order
+            for order in self.open_orders.values()
+            if order["symbol"] == params.get("symbol")
+            and order["visible_at"] <= now
+            and params.get("orderId") in (None, order["orderId"])
+        ]
+        return {"list": [self.__public(order) for order in orders]}
+
+    def get_fills(self, params: dict):
+        now = time()
+        fills = [
+            fill
+            for fill in reversed(self.fills)
+            if fill["symbol"] == params.get("symbol")
+            and fill["visible_at"] <= now
+            and params.get("orderId") in (None, fill["orderId"])
+        ]
+        return {"list": [self.__public(fill) for fill in fills]}
+
+    def create_order(self, params: dict):
+        order_id = f"stand-in-{next(self.order_ids)}"
+        symbol = params["symbol"]
+        qty = float(params["qty"])
+        order = {
+            "orderId": order_id,
+            "symbol": symbol,
+            "side": params["side"],
+            "orderType": params["orderType"],
+            "qty": params["qty"],
+            "price": params.get("price") or "0",
+            "triggerPrice": params.get("triggerPrice") or "0",
+            "reduceOnly": params.get("reduceOnly") or False,
+            "orderLinkId": params.get("orderLinkId") or "",
+            "visible_at": time() + self.fill_delay,
+        }
+
+        if params["orderType"] == "Market" and not params.get("triggerPrice"):
+            position = self.positions.setdefault(symbol, {"size": 0.0, "entryPrice": 0.0})
+            signed_qty = qty if params["side"] == "Buy" else -qty
+            new_size = round(position["size"] + signed_qty, 8)
+            if signed_qty > 0 and new_size:
+                position["entryPrice"] = (position["size"] * position["entryPrice"] + qty * self.price) / new_size
+            position["size"] = max(new_size, 0.0)
+            self.fills.append(
+                {
+                    "orderId": order_id,
+                    "symbol": symbol,
+                    "side": params["side"],
+                    "execPrice": str(self.price),
+                    "orderQty": params["qty"],
+                    "execQty": params["qty"],
+                    "execValue": str(qty * self.price),
+                    "visible_at": order["visible_at"],
+                }
+            )
+        else:
+            self.open_orders[order_id] = order
+        return {"orderId": order_id}
+
+    def cancel_order(self, params: dict):
+        if self.open_orders.pop(params.get("orderId"), None) is None:
+            raise Exception("order not exists or too late to cancel")
+        return {"orderId": params.get("orderId")}
+
+    def cancel_all(self, params: dict):
+        symbol = params.get("symbol")
+        self.open_orders = {k: v for k, v in self.open_orders.items() if v["symbol"] != symbol}
+        return {}
+
+    def replace_order(self, params: dict):
+        order = self.open_orders.get(params.get("orderId"))
+        if order is None:
+            raise Exception("order not exists or too late to replace")
+        for key in ["qty", "price", "triggerPrice"]:
+            if params.get(key) is not None:
+                order[key] = params[key]
+        return {"orderId": order["orderId"]}
+
+    def set_leverage(self, params: dict):
+        self.leverage = float(params["buyLeverage"])
+        return {}
+
+    def __public(self, row: dict):
+        return {k: v for k, v in row.items() if k != "visible_at"}
+
+
+class StandInEntryStrategy:
+    def __init__(
+        self,
+        long_short: str = "long",
+    ):
+        """
+        Gives an entry signal on every bar, so a live mode run against the stand in places an entry on its first bar
+        """
+        self.long_short = long_short
+        self.log_folder = None
+
+    def live_evaluate(
+        self,
+        candles: np.array,
+    ):
+        return True
+
+
+async def async_entry_flow(
+    live_mode,
+    timeframe: str = "5m",
+    candles_to_dl: int = 200,
+):
+    """
+    Runs one bar of an AsyncMufexLiveMode (async_run_bar) on the latest candles of its exchange, the strategy has to
+    give an entry signal so the bar places and verifies the entry, sl and tp. Returns the seconds the bar took
+    """
+    candles = await asyncio.to_thread(
+        live_mode.candle_cache.get_candles,
+        symbol=live_mode.symbol,
+        timeframe=timeframe,
+        candles_to_dl=candles_to_dl,
+    )
+    start = perf_counter()
+    try:
+        await live_mode.async_run_bar(candles=candles)
+        if not live_mode.sl_order_id:
+            raise Exception("async_run_bar didn't place an entry")
+        return perf_counter() - start
+    finally:
+        for end_point, stats in live_mode.exchange.get_async_latency_stats().items():
+            print(end_point, stats)
+        await live_mode.exchange.async_close()
+
+
+if __name__ == "__main__":
+    from quantfreedom.exchanges.mufex_exchange.async_mufex import AsyncMufex
+    from quantfreedom.exchanges.mufex_exchange.async_mufex_live_mode import AsyncMufexLiveMode
+    from quantfreedom.order_handler.order import OrderHandler
+    from quantfreedom.enums import (
+        CandleBodyType,
+        DynamicOrderSettings,
+        IncreasePositionType,
+        LeverageModeType,
+        LeverageStrategyType,
+        PositionModeType,
+        StaticOrderSettings,
+        StopLossStrategyType,
+        TakeProfitStrategyType,
+    )
+
+    with MufexStandInServer(latency=0.05, fill_delay=0.2) as server:
+        exchange = AsyncMufex(use_test_net=False, api_key="stand-in", secret_key="stand-in", url_start=server.url)
+        exchange.set_exchange_settings(
+            leverage_mode=LeverageModeType.Isolated,
+            position_mode=PositionModeType.HedgeMode,
+            symbol="BTCUSDT",
+        )
+        equity = exchange.get_equity_of_asset(trading_with="USDT")
+        strategy = StandInEntryStrategy()
+        order = OrderHandler(
+            exchange_settings=exchange.exchange_settings,
+            long_short=strategy.long_short,
+            static_os=StaticOrderSettings(
+                increase_position_type=IncreasePositionType.RiskPctAccountEntrySize,
+                leverage_strategy_type=LeverageStrategyType.Dynamic,
+                pg_min_max_sl_bcb="min",
+                sl_strategy_type=StopLossStrategyType.SLBasedOnCandleBody,
+                sl_to_be_bool=False,
+                starting_bar=50,
+                starting_equity=equity,
+                static_leverage=None,
+                tp_fee_type="limit",
+                tp_strategy_type=TakeProfitStrategyType.RiskReward,
+                trail_sl_bool=True,
+                z_or_e_type=None,
+            ),
+        )
+        order.update_class_dos(
+            dynamic_order_settings=DynamicOrderSettings(
+                max_equity_risk_pct=0.12,
+                max_trades=3,
+                risk_account_pct_size=0.01,
+                risk_reward=2,
+                sl_based_on_add_pct=0.01,
+                sl_based_on_lookback=30,
+                sl_bcb_type=CandleBodyType.Low,
+                sl_to_be_cb_type=CandleBodyType.Nothing,
+                sl_to_be_when_pct=0,
+                trail_sl_bcb_type=CandleBodyType.Low,
+                trail_sl_by_pct=0.01,
+                trail_sl_when_pct=0.01,
+            )
+        )
+        order.set_order_variables(equity=equity)
+        live_mode = AsyncMufexLiveMode(
+            email_sender=None,
+            entry_order_type="market",
+            exchange=exchange,
+            order=order,
+            strategy=strategy,
+            symbol="BTCUSDT",
+            trading_with="USDT",
+            tp_order_type="limit",
+        )
+        seconds = asyncio.run(async_entry_flow(live_mode=live_mode))
+        print(f"async_run_bar placed and verified the entry, sl and tp in {seconds:.2f} seconds")
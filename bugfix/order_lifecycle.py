@@ -0,0 +1,455 @@
+import asyncio
+
+from logging import getLogger
+from time import perf_counter, sleep
+from typing import NamedTuple
+from uuid import uuid4
+
+from quantfreedom.exchanges.exchange import Exchange
+from quantfreedom.exchanges.mufex_exchange.order_reconciler import OrderReconciler
+
+logger = getLogger("info")
+
+
+class OrderLifecycleStateT(NamedTuple):
+    Submitted: int = 0
+    Acknowledged: int = 1
+    Filled: int = 2
+    Open: int = 3
+    Protected: int = 4
+    Failed: int = 5
+
+
+OrderLifecycleState = OrderLifecycleStateT()
+
+
+class TrackedOrder:
+    def __init__(
+        self,
+        role: str,
+    ):
+        """
+        One order going through the lifecycle, history has a (state, perf_counter seconds) pair per transition
+        """
+        self.role = role
+        self.order_id: str = None
+        self.custom_order_id: str = None
+        self.state = None
+        self.history: list[tuple] = []
+        self.error: str = None
+
+    def set_state(
+        self,
+        state: int,
+    ):
+        self.state = state
+        self.history.append((state, perf_counter()))
+
+    def get_state_time(
+        self,
+        state: int,
+    ):
+        for history_state, seconds in self.history:
+            if history_state == state:
+                return seconds
+        return None
+
+    def __repr__(self):
+        return f"{self.role} order {self.order_id} {OrderLifecycleState._fields[self.state]}"
+
+
+class OrderLifecycle:
+    def __init__(
+        self,
+        exchange: Exchange,
+        symbol: str,
+        timeout: float = 5.0,
+        first_wait: float = 0.05,
+        max_wait: float = 0.5,
+        sleep=sleep,
+    ):
+        """
+        Takes an entry from submitted to protected off what the exchange says instead of fixed sleeps
+
+            Submitted -> Acknowledged (the exchange gave back an order id) -> Filled (entry in the fills)
+                                                                           -> Open (sl / tp in the open orders)
+            entry Filled + sl Open + tp Open -> Protected, anything that runs out of time -> Failed
+
+        Every confirmation is polled right away and then with waits that double from first_wait up to max_wait,
+        until timeout seconds have gone by. A failed sl or tp is sent again the same way once the open orders show it
+        didn't get there (submit_batch with retry), the entry is never sent twice.
+
+        sleep is what waits between polls, live mode passes its own so a SimulatedMufex replay doesn't wait. The
+        async_ methods are the same steps with an AsyncMufex, for AsyncMufexLiveMode.
+        """
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeout = timeout
+        self.first_wait = first_wait
+        self.max_wait = max_wait
+        self.sleep = sleep
+        # every confirmation is answered from one snapshot of the open orders or the fills
+        self.order_reconciler = OrderReconciler(exchange=exchange, symbol=symbol)
+
+    def submit(
+        self,
+        role: str,
+        place,
+        **kwargs,
+    ) -> TrackedOrder:
+        """
+        place(**kwargs) is the exchange function that sends the order and returns its order id, it is sent once
+        because a failed send can still have reached the exchange
+        """
+        tracked = self.__new_tracked_order(role=role)
+        try:
+            tracked.order_id = place(**kwargs)
+        except Exception as e:
+            self.__set_submit_error(tracked=tracked, error=e)
+        return self.__acknowledge(tracked=tracked)
+
+    async def async_submit(
+        self,
+        role: str,
+        place,
+        **kwargs,
+    ) -> TrackedOrder:
+        """
+        submit with place a coroutine function, like AsyncMufex's async_create_long_hedge_mode_entry_market_order
+        """
+        tracked = self.__new_tracked_order(role=role)
+        try:
+            tracked.order_id = await place(**kwargs)
+        except Exception as e:
+            self.__set_submit_error(tracked=tracked, error=e)
+        return self.__acknowledge(tracked=tracked)
+
+    def submit_batch(
+        self,
+        roles: list[str],
+        orders: list[dict],
+        retry: bool = False,
+    ) -> list[TrackedOrder]:
+        """
+        Sends orders (the kwargs of create_order, one per role) together with the exchange's create_orders, with retry
+        only the orders that failed are sent again
+
+        Every order gets an orderLinkId (custom_order_id) of its own that stays the same when it is sent again. A send
+        that failed, like a read timeout, can still have reached the exchange, so before sending again the open orders
+        are looked up by orderLinkId and an order that is already there is tracked instead of placed twice. When the
+        open orders can't be fetched nothing is sent that round, and the exchange turns a duplicate orderLinkId down
+        either way.
+        """
+        orders, tracked_orders = self.__new_batch(roles=roles, orders=orders)
+        sent = False
+
+        def acknowledged():
+            nonlocal sent
+            pending = self.__get_pending(tracked_orders=tracked_orders)
+            if sent:
+                try:
+                    self.order_reconciler.refresh(fills=False)
+                except Exception as e:
+                    logger.warning(f"Couldn't check the open orders before sending again -> {e}")
+                    return False
+                pending = self.__adopt_placed(tracked_orders=tracked_orders, pending=pending)
+                if not pending:
+                    return True
+            sent = True
+            try:
+                results = self.exchange.create_orders(orders=[orders[index] for index in pending])
+            except Exception as e:
+                results = [e] * len(pending)
+            self.__set_sent(tracked_orders=tracked_orders, pending=pending, results=results)
+            return not retry or all(tracked.order_id for tracked in tracked_orders)
+
+        self.wait_for(check=acknowledged)
+        return [self.__acknowledge(tracked=tracked) for tracked in tracked_orders]
+
+    async def async_submit_batch(
+        self,
+        roles: list[str],
+        orders: list[dict],
+        retry: bool = False,
+    ) -> list[TrackedOrder]:
+        """
+        submit_batch with an AsyncMufex, the orders are sent with async_create_orders and the open orders are checked
+        with the reconciler's async_refresh
+        """
+        orders, tracked_orders = self.__new_batch(roles=roles, orders=orders)
+        sent = False
+
+        async def acknowledged():
+            nonlocal sent
+            pending = self.__get_pending(tracked_orders=tracked_orders)
+            if sent:
+                try:
+                    await self.order_reconciler.async_refresh(fills=False)
+                except Exception as e:
+                    logger.warning(f"Couldn't check the open orders before sending again -> {e}")
+                    return False
+                pending = self.__adopt_placed(tracked_orders=tracked_orders, pending=pending)
+                if not pending:
+                    return True
+            sent = True
+            try:
+                results = await self.exchange.async_create_orders(orders=[orders[index] for index in pending])
+            except Exception as e:
+                results = [e] * len(pending)
+            self.__set_sent(tracked_orders=tracked_orders, pending=pending, results=results)
+            return not retry or all(tracked.order_id for tracked in tracked_orders)
+
+        await self.async_wait_for(check=acknowledged)
+        return [self.__acknowledge(tracked=tracked) for tracked in tracked_orders]
+
+    def __new_tracked_order(
+        self,
+        role: str,
+    ) -> TrackedOrder:
+        tracked = TrackedOrder(role=role)
+        tracked.set_state(OrderLifecycleState.Submitted)
+        return tracked
+
+    def __set_submit_error(
+        self,
+        tracked: TrackedOrder,
+        error: Exception,
+    ):
+        tracked.error = str(error)
+        logger.warning(f"Submitting {tracked.role} order failed -> {error}")
+
+    def __acknowledge(
+        self,
+        tracked: TrackedOrder,
+    ) -> TrackedOrder:
+        if tracked.order_id:
+            tracked.set_state(OrderLifecycleState.Acknowledged)
+            logger.info(f"Submitted {tracked.role} order -> [order_id={tracked.order_id}]")
+        else:
+            tracked.set_state(OrderLifecycleState.Failed)
+        return tracked
+
+    def __new_batch(
+        self,
+        roles: list[str],
+        orders: list[dict],
+    ) -> tuple[list[dict], list[TrackedOrder]]:
+        orders = [
+            {**order, "custom_order_id": order.get("custom_order_id") or f"qf-{role}-{uuid4().hex[:20]}"}
+            for role, order in zip(roles, orders)
+        ]
+        tracked_orders = [self.__new_tracked_order(role=role) for role in roles]
+        for tracked, order in zip(tracked_orders, orders):
+            tracked.custom_order_id = order["custom_order_id"]
+        return orders, tracked_orders
+
+    def __get_pending(
+        self,
+        tracked_orders: list[TrackedOrder],
+    ) -> list[int]:
+        return [index for index, tracked in enumerate(tracked_orders) if not tracked.order_id]
+
+    def __adopt_placed(
+        self,
+        tracked_orders: list[TrackedOrder],
+        pending: list[int],
+    ) -> list[int]:
+        """
+        Tracks the pending orders the open orders snapshot already has by orderLinkId, returns the ones still pending
+        """
+        for index in pending:
+            tracked = tracked_orders[index]
+            tracked.order_id = self.order_reconciler.get_open_order_id(custom_order_id=tracked.custom_order_id)
+            if tracked.order_id:
+                logger.info(f"{tracked.role} order was placed by the send that failed, not sending it again")
+        return [index for index in pending if not tracked_orders[index].order_id]
+
+    def __set_sent(
+        self,
+        tracked_orders: list[TrackedOrder],
+        pending: list[int],
+        results: list,
+    ):
+        for index, result in zip(pending, results):
+            tracked = tracked_orders[index]
+            if isinstance(result, Exception):
+                self.__set_submit_error(tracked=tracked, error=result)
+            else:
+                tracked.order_id = result
+
+    def wait_until_filled(
+        self,
+        tracked: TrackedOrder,
+    ):
+        return self.__wait_until_all(tracked_orders=[tracked], state=OrderLifecycleState.Filled)
+
+    def wait_until_open(
+        self,
+        tracked: TrackedOrder,
+    ):
+        return self.__wait_until_all(tracked_orders=[tracked], state=OrderLifecycleState.Open)
+
+    def wait_until_all_open(
+        self,
+        tracked_orders: list[TrackedOrder],
+    ):
+        """
+        Like wait_until_open for every order in tracked_orders, but each poll is one open orders request for all of
+        them instead of one request per order
+        """
+        return self.__wait_until_all(tracked_orders=tracked_orders, state=OrderLifecycleState.Open)
+
+    async def async_wait_until_filled(
+        self,
+        tracked: TrackedOrder,
+    ):
+        return await self.__async_wait_until_all(tracked_orders=[tracked], state=OrderLifecycleState.Filled)
+
+    async def async_wait_until_all_open(
+        self,
+        tracked_orders: list[TrackedOrder],
+    ):
+        return await self.__async_wait_until_all(tracked_orders=tracked_orders, state=OrderLifecycleState.Open)
+
+    def __wait_until_all(
+        self,
+        tracked_orders: list[TrackedOrder],
+        state: int,
+    ):
+        waiting = self.__get_waiting(tracked_orders=tracked_orders)
+        is_filled = state == OrderLifecycleState.Filled
+
+        def reconciled():
+            try:
+                self.order_reconciler.refresh(open_orders=not is_filled, fills=is_filled)
+            except Exception as e:
+                logger.debug(f"OrderLifecycle couldn't refresh the orders -> {e}")
+                return False
+            return self.__reconcile(waiting=waiting, state=state)
+
+        if waiting and not self.wait_for(check=reconciled):
+            self.__fail_waiting(waiting=waiting, state=state)
+        return all(tracked.state == state for tracked in tracked_orders)
+
+    async def __async_wait_until_all(
+        self,
+        tracked_orders: list[TrackedOrder],
+        state: int,
+    ):
+        waiting = self.__get_waiting(tracked_orders=tracked_orders)
+        is_filled = state == OrderLifecycleState.Filled
+
+        async def reconciled():
+            try:
+                await self.order_reconciler.async_refresh(open_orders=not is_filled, fills=is_filled)
+            except Exception as e:
+                logger.debug(f"OrderLifecycle couldn't refresh the orders -> {e}")
+                return False
+            return self.__reconcile(waiting=waiting, state=state)
+
+        if waiting and not await self.async_wait_for(check=reconciled):
+            self.__fail_waiting(waiting=waiting, state=state)
+        return all(tracked.state == state for tracked in tracked_orders)
+
+    def __get_waiting(
+        self,
+        tracked_orders: list[TrackedOrder],
+    ) -> list[TrackedOrder]:
+        return [tracked for tracked in tracked_orders if tracked.state == OrderLifecycleState.Acknowledged]
+
+    def __reconcile(
+        self,
+        waiting: list[TrackedOrder],
+        state: int,
+    ):
+        """
+        Moves every order in waiting the reconciler's snapshot shows in state to it, True once none are left
+        """
+        is_filled = state == OrderLifecycleState.Filled
+        for tracked in list(waiting):
+            if (self.order_reconciler.is_filled if is_filled else self.order_reconciler.is_open)(tracked.order_id):
+                tracked.set_state(state)
+                waiting.remove(tracked)
+        return not waiting
+
+    def __fail_waiting(
+        self,
+        waiting: list[TrackedOrder],
+        state: int,
+    ):
+        for tracked in waiting:
+            logger.warning(f"{tracked.role} order {tracked.order_id} not {OrderLifecycleState._fields[state]} in time")
+            tracked.set_state(OrderLifecycleState.Failed)
+
+    def protect(
+        self,
+        entry: TrackedOrder,
+        protective_orders: list,
+    ):
+        """
+        Moves the entry to Protected once it is filled and every protective order is open
+        """
+        if entry.state != OrderLifecycleState.Filled:
+            return entry.state == OrderLifecycleState.Protected
+        if all(tracked is not None and tracked.state == OrderLifecycleState.Open for tracked in protective_orders):
+            entry.set_state(OrderLifecycleState.Protected)
+            return True
+        return False
+
+    def wait_for(
+        self,
+        check,
+    ):
+        """
+        Calls check() until it returns True, the time spent waiting is counted as well as the clock so a sleep that
+        doesn't wait still runs out
+
+        Returns
+        -------
+        bool
+            the last result of check
+        """
+        deadline = perf_counter() + self.timeout
+        waited = 0.0
+        wait = self.first_wait
+        while True:
+            if check():
+                return True
+            if perf_counter() + wait > deadline or waited + wait > self.timeout:
+                return False
+            self.sleep(wait)
+            waited += wait
+            wait = min(wait * 2, self.max_wait)
+
+    async def async_wait_for(
+        self,
+        check,
+    ):
+        """
+        wait_for with check a coroutine function, the waits are asyncio.sleep so other requests keep going
+        """
+        deadline = perf_counter() + self.timeout
+        wait = self.first_wait
+        while True:
+            if await check():
+                return True
+            if perf_counter() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+            wait = min(wait * 2, self.max_wait)
+
+    def get_unprotected_ms(
+        self,
+        entry: TrackedOrder,
+        protective_orders: list,
+    ):
+        """
+        ms from the entry being filled until the last protective order was open, None if any of them didn't get there
+        """
+        filled = entry.get_state_time(OrderLifecycleState.Filled)
+        if filled is None or None in protective_orders:
+            return None
+        opened = [tracked.get_state_time(OrderLifecycleState.Open) for tracked in protective_orders]
+        if None in opened:
+            return None
+        return round((max(opened) - filled) * 1000, 1)
@@ -0,0 +1,164 @@
+import asyncio
+
+from logging import getLogger
+
+from quantfreedom.exchanges.exchange import Exchange
+
+logger = getLogger("info")
+
+
+class OrderReconciler:
+    def __init__(
+        self,
+        exchange: Exchange,
+        symbol: str,
+        open_orders_limit: int = 50,
+        fills_limit: int = 200,
+    ):
+        """
+        A snapshot of the open orders and the latest fills of symbol, each fetched with one request and indexed by
+        orderId, so any number of is_open / is_filled questions are answered without asking the exchange again
+
+        An order can fill in more than one row, get_filled_order adds the rows of an order up instead of looking at
+        the first one. Call refresh whenever the answers have to be newer than the snapshot, or async_refresh with an
+        AsyncMufex to fetch the open orders and the fills at the same time.
+
+            order_reconciler.refresh()
+            entry_filled = order_reconciler.is_filled(order_id=entry_order_id)
+            sl_placed = order_reconciler.is_open(order_id=sl_order_id)
+        """
+        self.exchange = exchange
+        self.symbol = symbol
+        self.open_orders_limit = open_orders_limit
+        self.fills_limit = fills_limit
+        self.open_orders: dict[str, dict] = {}
+        self.open_order_ids_by_link_id: dict[str, str] = {}
+        self.filled_orders: dict[str, list] = {}
+        self.requests = 0
+        self.answers = 0
+
+    def refresh(
+        self,
+        open_orders: bool = True,
+        fills: bool = True,
+    ):
+        self.update(
+            open_orders=(
+                self.exchange.get_all_open_orders(symbol=self.symbol, limit=self.open_orders_limit)
+                if open_orders
+                else None
+            ),
+            filled_orders=(
+                self.exchange.get_all_filled_orders(symbol=self.symbol, limit=self.fills_limit) if fills else None
+            ),
+        )
+        self.requests += open_orders + fills
+
+    async def async_refresh(
+        self,
+        open_orders: bool = True,
+        fills: bool = True,
+    ):
+        """
+        refresh with the AsyncMufex requests, the open orders and the fills are fetched at the same time
+        """
+        fetched_open_orders, fetched_filled_orders = await asyncio.gather(
+            (
+                self.exchange.async_get_all_open_orders(symbol=self.symbol, limit=self.open_orders_limit)
+                if open_orders
+                else asyncio.sleep(0)
+            ),
+            (
+                self.exchange.async_get_all_filled_orders(symbol=self.symbol, limit=self.fills_limit)
+                if fills
+                else asyncio.sleep(0)
+            ),
+        )
+        self.update(open_orders=fetched_open_orders, filled_orders=fetched_filled_orders)
+        self.requests += open_orders + fills
+
+    def update(
+        self,
+        open_orders: list = None,
+        filled_orders: list = None,
+    ):
+        """
+        Replaces the open orders and / or the fills of the snapshot, None keeps the ones it has
+        """
+        if open_orders is not None:
+            self.open_orders = {order["orderId"]: order for order in open_orders}
+            self.open_order_ids_by_link_id = {
+                order["orderLinkId"]: order["orderId"] for order in open_orders if order.get("orderLinkId")
+            }
+        if filled_orders is not None:
+            self.filled_orders = {}
+            for fill in filled_orders:
+                self.filled_orders.setdefault(fill["orderId"], []).append(fill)
+
+    def is_open(
+        self,
+        order_id: str,
+    ) -> bool:
+        self.answers += 1
+        return order_id in self.open_orders
+
+    def is_filled(
+        self,
+        order_id: str,
+    ) -> bool:
+        self.answers += 1
+        return order_id in self.filled_orders
+
+    def get_open_order_id(
+        self,
+        custom_order_id: str,
+    ) -> str:
+        """
+        Returns
+        -------
+        str
+            the orderId of the open order that was sent with custom_order_id as its orderLinkId or None
+        """
+        self.answers += 1
+        return self.open_order_ids_by_link_id.get(custom_order_id)
+
+    def get_open_order(
+        self,
+        order_id: str,
+    ) -> dict:
+        try:
+            return dict(sorted(self.open_orders[order_id].items()))
+        except Exception as e:
+            raise Exception(f"OrderReconciler get_open_order {order_id} is not open -> {e}")
+
+    def get_filled_order(
+        self,
+        order_id: str,
+    ) -> dict:
+        """
+        The fills of order_id as one row, execQty, execValue and execFee are added up and execPrice is the average
+        price of all of them
+        """
+        try:
+            fills = self.filled_orders[order_id]
+            filled_order = dict(fills[0])
+            if len(fills) > 1:
+                exec_qty = sum(float(fill["execQty"]) for fill in fills)
+                exec_value = sum(float(fill["execValue"]) for fill in fills)
+                filled_order["execQty"] = str(exec_qty)
+                filled_order["execValue"] = str(exec_value)
+                filled_order["execFee"] = str(sum(float(fill.get("execFee", 0)) for fill in fills))
+                filled_order["execPrice"] = str(exec_value / exec_qty)
+            return dict(sorted(filled_order.items()))
+        except Exception as e:
+            raise Exception(f"OrderReconciler get_filled_order {order_id} has no fills -> {e}")
+
+    def get_stats(self):
+        return {
+            "requests": self.requests,
+            "answers": self.answers,
+        }
+
+    def log_stats(self):
+        stats = self.get_stats()
+        logger.info(f"Order reconciler requests={stats['requests']} answers={stats['answers']}")
@@ -0,0 +1,174 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from logging import getLogger
+from multiprocessing import shared_memory
+
+from quantfreedom.entries_matrix import EntriesExitsMatrix, EntriesExitsMatrixStrategy
+from quantfreedom.helper_funcs import dos_cart_product
+from quantfreedom.simulate import run_df_backtest
+from quantfreedom.strategies.strategy import Strategy
+from quantfreedom.enums import (
+    BacktestSettings,
+    DynamicOrderSettingsArrays,
+    ExchangeSettings,
+    StaticOrderSettings,
+)
+
+logger = getLogger("info")
+
+# set in every worker by _init_worker
+_worker = {}
+
+
+def _init_worker(
+    shm_name: str,
+    candles_shape: tuple,
+    candles_dtype: str,
+    backtest_settings: BacktestSettings,
+    dos_arrays: DynamicOrderSettingsArrays,
+    exchange_settings: ExchangeSettings,
+    static_os: StaticOrderSettings,
+    strategy: Strategy,
+    entries_exits_matrix: EntriesExitsMatrix,
+):
+    if entries_exits_matrix is not None:
+        strategy = EntriesExitsMatrixStrategy(strategy=strategy, matrix=entries_exits_matrix)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker["shm"] = shm  # keep the handle alive as long as the worker
+    _worker["candles"] = np.ndarray(candles_shape, dtype=candles_dtype, buffer=shm.buf)
+    _worker["backtest_settings"] = backtest_settings
+    _worker["dos_arrays"] = dos_arrays
+    _worker["exchange_settings"] = exchange_settings
+    _worker["static_os"] = static_os
+    _worker["strategy"] = strategy
+    _worker["all_indicator_settings"] = strategy.indicator_settings_arrays
+
+
+def _backtest_ind_set(ind_set_index: int) -> pd.DataFrame:
+    """
+    Runs every dos combination for one indicator setting, the entries are only worked out once
+    """
+    strategy: Strategy = _worker["strategy"]
+    all_settings = _worker["all_indicator_settings"]
+    # a one row copy of the settings so run_df_backtest only loops this indicator setting
+    strategy.indicator_settings_arrays = type(all_settings)(
+        *[settings[ind_set_index : ind_set_index + 1] for settings in all_settings]
+    )
+    if isinstance(strategy, EntriesExitsMatrixStrategy):
+        strategy.ind_set_offset = ind_set_index
+
+    with redirect_stdout(io.StringIO()):
+        results = run_df_backtest(
+            backtest_settings=_worker["backtest_settings"],
+            candles=_worker["candles"],
+            dos_arrays=_worker["dos_arrays"],
+            exchange_settings=_worker["exchange_settings"],
+            static_os=_worker["static_os"],
+            strategy=strategy,
+        )
+    results["ind_set_idx"] = ind_set_index
+    return results
+
+
+def run_parallel_df_backtest(
+    backtest_settings: BacktestSettings,
+    candles: np.array,
+    dos_arrays: DynamicOrderSettingsArrays,
+    exchange_settings: ExchangeSettings,
+    static_os: StaticOrderSettings,
+    strategy: Strategy,
+    results_path: str,
+    max_workers: int = None,
+    resume: bool = True,
+    entries_exits_matrix: EntriesExitsMatrix = None,
+) -> pd.DataFrame:
+    """
+    Same results as run_df_backtest but every indicator setting is its own job on a process pool
+
+    The candles are put in shared memory once and every worker reads them from there instead of getting a pickled
+    copy per job. Each job works out the entries of one indicator setting once and runs all the dos combinations on
+    them, and as each job finishes its rows are appended to the csv at results_path, so a sweep that dies halfway
+    keeps what it already did. With resume=True the indicator settings listed in results_path + ".done" are skipped.
+
+    Parameters
+    ----------
+    results_path : str
+        csv file the result rows are streamed to
+    max_workers : int
+        number of processes, defaults to every core
+    entries_exits_matrix : EntriesExitsMatrix
+        strategy.entries_exits_matrix(candles) of the whole grid, workers then unpack their row instead of calling
+        set_entries_exits_array
+
+    Returns
+    -------
+    pd.DataFrame
+        every row in results_path sorted by ind_set_idx and dos_index
+    """
+    total_indicator_settings = strategy.indicator_settings_arrays[0].size
+    total_order_settings = dos_cart_product(dos_arrays=dos_arrays)[0].size
+    done_path = results_path + ".done"
+
+    done = set()
+    if resume and os.path.exists(done_path):
+        with open(done_path) as done_file:
+            done = {int(line) for line in done_file if line.strip()}
+    elif os.path.exists(results_path):
+        os.remove(results_path)
+    if not resume and os.path.exists(done_path):
+        os.remove(done_path)
+
+    ind_set_indexes = [idx for idx in range(total_indicator_settings) if idx not in done]
+    print(f"Total indicator settings to test: {total_indicator_settings:,} ({len(done):,} already done)")
+    print(f"Total order settings to test: {total_order_settings:,}")
+    print(f"Total combinations of settings to test: {len(ind_set_indexes) * total_order_settings:,}")
+
+    candles = np.ascontiguousarray(candles)
+    shm = shared_memory.SharedMemory(create=True, size=candles.nbytes)
+    try:
+        np.ndarray(candles.shape, dtype=candles.dtype, buffer=shm.buf)[:] = candles
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(
+                shm.name,
+                candles.shape,
+                candles.dtype.str,
+                backtest_settings,
+                dos_arrays,
+                exchange_settings,
+                static_os,
+                strategy,
+                entries_exits_matrix,
+            ),
+        ) as pool:
+            futures = {pool.submit(_backtest_ind_set, idx): idx for idx in ind_set_indexes}
+            for finished, future in enumerate(as_completed(futures), start=1):
+                ind_set_index = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.error(f"Backtest of ind_set_index {ind_set_index} failed -> {e}")
+                    print(f"Backtest of ind_set_index {ind_set_index} failed -> {e}")
+                    continue
+
+                if not results.empty:
+                    results.to_csv(results_path, mode="a", index=False, header=not os.path.exists(results_path))
+                with open(done_path, "a") as done_file:
+                    done_file.write(f"{ind_set_index}\n")
+
+                if finished % 10 == 0 or finished == len(futures):
+                    print(f"Finished {finished:,} of {len(futures):,} indicator settings")
+    finally:
+        shm.close()
+        shm.unlink()
+
+    if not os.path.exists(results_path):
+        return pd.DataFrame()
+    return pd.read_csv(results_path).sort_values(by=["ind_set_idx", "dos_index"]).reset_index(drop=True)
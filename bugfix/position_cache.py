@@ -0,0 +1,79 @@
+from logging import getLogger
+from threading import Lock
+from time import perf_counter
+
+logger = getLogger("info")
+
+
+class PositionCache:
+    def __init__(
+        self,
+        get_position_info,
+        ttl: float = 3.0,
+    ):
+        """
+        Keeps the latest position info per symbol so the reads live mode does on one bar share one request
+
+        get_position_info is the exchange function that fetches it, like exchange.get_long_hedge_mode_position_info.
+        A cached position is handed back until it is ttl seconds old or invalidate is called for its symbol, call
+        invalidate after every order action that changes the position or its leverage and at the start of every bar.
+
+            position_cache = PositionCache(get_position_info=exchange.get_long_hedge_mode_position_info)
+            size = float(position_cache.get(symbol="BTCUSDT")["size"])
+        """
+        self.get_position_info = get_position_info
+        self.ttl = ttl
+        self.entries: dict[str, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get(
+        self,
+        symbol: str,
+    ) -> dict:
+        with self.lock:
+            entry = self.entries.get(symbol)
+            if entry is not None and perf_counter() - entry[1] < self.ttl:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        position_info = self.get_position_info(symbol=symbol)
+        with self.lock:
+            self.entries[symbol] = (position_info, perf_counter())
+        return position_info
+
+    def update(
+        self,
+        symbol: str,
+        position_info: dict,
+    ):
+        """
+        Caches position info that was fetched some other way, like AsyncMufex's async_get_long_hedge_mode_position_info
+        """
+        with self.lock:
+            self.entries[symbol] = (position_info, perf_counter())
+
+    def invalidate(
+        self,
+        symbol: str = None,
+    ):
+        """
+        Drops symbol or every symbol when it is None
+        """
+        with self.lock:
+            if symbol is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(symbol, None)
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def log_stats(self):
+        stats = self.get_stats()
+        logger.info(f"Position cache hits={stats['hits']} misses={stats['misses']}")
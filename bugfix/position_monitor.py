@@ -0,0 +1,177 @@
+import numpy as np
+
+from logging import getLogger
+from threading import Event, RLock, Thread
+
+from quantfreedom.enums import CandleBodyType
+from quantfreedom.exchanges.exchange import Exchange
+from quantfreedom.exchanges.mufex_exchange.kline_stream import KlineStream
+from quantfreedom.order_handler.order import OrderHandler
+
+logger = getLogger("info")
+
+
+class PositionMonitor:
+    def __init__(
+        self,
+        exchange: Exchange,
+        order: OrderHandler,
+        symbol: str,
+        kline_stream: KlineStream = None,
+        poll_interval: float = 0.25,
+    ):
+        """
+        Moves the stop loss of the open position to break even and trails it off a position snapshot instead of
+        asking the exchange for the position every time.
+
+        Live mode sets the snapshot (position size and stop loss order id) with set_position whenever it has fresh
+        position info and clears it while it is placing orders. check runs the order's check_move_sl_to_be and
+        check_move_tsl on a candle and sends one move_stop_order for the final stop, only when it is at least one
+        price tick away from the current one.
+
+        With a kline_stream, start() runs check on the stream's forming candle every poll_interval seconds, so the
+        stop follows the price inside the bar instead of once per bar close. Nothing is downloaded for that, the
+        forming candle is already kept by the stream.
+        """
+        self.exchange = exchange
+        self.order = order
+        self.symbol = symbol
+        self.kline_stream = kline_stream
+        self.poll_interval = poll_interval
+        self.price_tick = 10.0 ** -exchange.exchange_settings.price_tick_step
+
+        self.position_size_asset = 0.0
+        self.sl_order_id = None
+        self.checks = 0
+        self.stop_moves = 0
+        self.sub_tick_skips = 0
+        self.lock = RLock()
+        self.thread: Thread = None
+        self.__stopping = Event()
+        self.__last_forming_candle: dict = None
+
+    def set_position(
+        self,
+        position_size_asset: float,
+        sl_order_id: str,
+    ):
+        with self.lock:
+            self.position_size_asset = position_size_asset
+            self.sl_order_id = sl_order_id
+
+    def clear_position(self):
+        self.set_position(position_size_asset=0.0, sl_order_id=None)
+
+    def check(
+        self,
+        current_candle: np.array,
+    ):
+        """
+        Returns
+        -------
+        bool
+            True if the stop loss was moved
+        """
+        with self.lock:
+            if self.position_size_asset <= 0 or self.sl_order_id is None:
+                return False
+            self.checks += 1
+
+            old_sl_price = self.order.sl_price
+            new_sl_price = None
+            new_sl_pct = None
+
+            logger.debug("Checking to move stop to break even")
+            sl_to_be_price, sl_to_be_pct = self.order.check_move_sl_to_be(current_candle=current_candle)
+            if sl_to_be_price and abs(sl_to_be_price - old_sl_price) >= self.price_tick:
+                new_sl_price, new_sl_pct = sl_to_be_price, sl_to_be_pct
+                self.order.sl_price = new_sl_price
+
+            logger.debug("Checking to move trailing stop loss")
+            try:
+                tsl_price, tsl_pct = self.order.check_move_tsl(current_candle=current_candle)
+            finally:
+                self.order.sl_price = old_sl_price
+            if tsl_price and abs(tsl_price - (new_sl_price or old_sl_price)) >= self.price_tick:
+                new_sl_price, new_sl_pct = tsl_price, tsl_pct
+
+            if new_sl_price is None:
+                if sl_to_be_price or tsl_price:
+                    self.sub_tick_skips += 1
+                return False
+
+            try:
+                moved = self.exchange.move_stop_order(
+                    symbol=self.symbol,
+                    order_id=self.sl_order_id,
+                    asset_size=self.position_size_asset,
+                    new_price=new_sl_price,
+                )
+            except Exception as e:
+                # most likely the stop or the tp filled since the last snapshot, live mode sets a new one next bar
+                logger.warning(f"PositionMonitor couldn't move sl {self.sl_order_id} -> {e}")
+                self.clear_position()
+                return False
+
+            if not moved:
+                logger.warning(f"Couldn't verify sl was moved {self.sl_order_id}")
+                return False
+            logger.info(f"Moved stop loss from {old_sl_price} to {new_sl_price}")
+            self.order.sl_price = new_sl_price
+            self.order.sl_pct = new_sl_pct
+            self.stop_moves += 1
+            return True
+
+    ################################################################
+    ################################################################
+    ###################                          ###################
+    ###################     Inside the bar       ###################
+    ###################                          ###################
+    ################################################################
+    ################################################################
+
+    def start(self):
+        if self.kline_stream is None:
+            raise Exception("PositionMonitor needs a kline_stream to check inside the bar")
+        self.__stopping.clear()
+        self.thread = Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.__stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout=10)
+
+    def __run(self):
+        while not self.__stopping.wait(timeout=self.poll_interval):
+            forming_candle = self.kline_stream.forming_candle
+            if forming_candle is None or forming_candle is self.__last_forming_candle:
+                continue
+            self.__last_forming_candle = forming_candle
+            try:
+                self.check(current_candle=self.__kline_to_candle(kline=forming_candle))
+            except Exception as e:
+                logger.error(f"PositionMonitor Exception -> {e}")
+
+    def __kline_to_candle(
+        self,
+        kline: dict,
+    ) -> np.array:
+        candle = np.full(CandleBodyType.Nothing + 1, np.nan)
+        candle[CandleBodyType.Timestamp] = float(kline["start"])
+        candle[CandleBodyType.Open] = float(kline["open"])
+        candle[CandleBodyType.High] = float(kline["high"])
+        candle[CandleBodyType.Low] = float(kline["low"])
+        candle[CandleBodyType.Close] = float(kline["close"])
+        candle[CandleBodyType.Volume] = float(kline["volume"])
+        return candle
+
+    def get_stats(self):
+        return {
+            "checks": self.checks,
+            "stop_moves": self.stop_moves,
+            "sub_tick_skips": self.sub_tick_skips,
+        }
+
+    def log_stats(self):
+        logger.info(f"PositionMonitor {self.get_stats()}")
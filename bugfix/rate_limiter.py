@@ -0,0 +1,247 @@
+import asyncio
+
+from logging import getLogger
+from threading import Lock
+from time import perf_counter, sleep, time
+from typing import NamedTuple
+
+logger = getLogger("info")
+
+
+class RequestPriorityT(NamedTuple):
+    Critical: int = 0
+    Normal: int = 1
+    Background: int = 2
+
+
+RequestPriority = RequestPriorityT()
+
+# placing, moving and canceling orders, the calls that open and protect a position
+CRITICAL_END_POINTS = {
+    "/private/v1/trade/create",
+    "/private/v1/trade/replace",
+    "/private/v1/trade/cancel",
+    "/private/v1/trade/cancel-all",
+}
+# downloads that can wait a bit without hurting a trade
+BACKGROUND_END_POINTS = {
+    "/public/v1/market/kline",
+    "/public/v1/instruments",
+    "/public/v1/position-risk",
+}
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+    ):
+        """
+        rate tokens per second up to capacity, a request takes one
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = perf_counter()
+        self.paused_until = 0.0
+
+    def try_take(
+        self,
+        reserve: float,
+        now: float,
+    ) -> float:
+        """
+        Takes a token if more than reserve are left
+
+        Returns
+        -------
+        float
+            0.0 if a token was taken or else the seconds until one can be
+        """
+        if now < self.paused_until:
+            return self.paused_until - now
+        # nothing refills while paused so the pause doesn't end in a burst
+        self.tokens = min(self.capacity, self.tokens + (now - max(self.updated, self.paused_until)) * self.rate)
+        self.updated = now
+        if self.tokens >= reserve + 1:
+            self.tokens -= 1
+            return 0.0
+        return (reserve + 1 - self.tokens) / self.rate
+
+
+class RateLimitScheduler:
+    def __init__(
+        self,
+        public_rate: float = 20.0,
+        public_capacity: float = 40.0,
+        private_rate: float = 10.0,
+        private_capacity: float = 20.0,
+        normal_reserve: float = 2.0,
+        background_reserve: float = 5.0,
+    ):
+        """
+        Spaces requests out with one token bucket for the public market data end points and one for the private
+        account and trading end points, so bots sharing an api key and an HTTPSession stay under the exchange's limits
+        at a bar close instead of getting throttled all at once
+
+        Order calls (CRITICAL_END_POINTS) can take any token, everything else has to leave normal_reserve tokens and
+        candle and symbol downloads (BACKGROUND_END_POINTS) background_reserve tokens, so an entry, sl or tp never
+        waits behind a candle download. The defaults are a guess on the safe side, set the rates to the account's
+        limits. Rate limit headers (X-...-Limit-Status, X-...-Limit-Reset-Timestamp, Retry-After) pull a bucket down
+        to what the exchange says is left and a 429 pauses the bucket until the exchange says to try again.
+
+        The buckets live in one process, bots in different processes each need their share of the rates.
+        """
+        self.buckets = {
+            "public": TokenBucket(rate=public_rate, capacity=public_capacity),
+            "private": TokenBucket(rate=private_rate, capacity=private_capacity),
+        }
+        self.reserves = {
+            RequestPriority.Critical: 0.0,
+            RequestPriority.Normal: normal_reserve,
+            RequestPriority.Background: background_reserve,
+        }
+        self.requests = {end_point_class: 0 for end_point_class in self.buckets}
+        self.waits = {end_point_class: 0 for end_point_class in self.buckets}
+        self.wait_seconds = {end_point_class: 0.0 for end_point_class in self.buckets}
+        self.throttled = 0
+        self.lock = Lock()
+
+    def get_end_point_class(
+        self,
+        end_point: str,
+    ) -> str:
+        return "private" if end_point.startswith("/private/") else "public"
+
+    def get_priority(
+        self,
+        end_point: str,
+    ) -> int:
+        if end_point in CRITICAL_END_POINTS:
+            return RequestPriority.Critical
+        if end_point in BACKGROUND_END_POINTS:
+            return RequestPriority.Background
+        return RequestPriority.Normal
+
+    def try_acquire(
+        self,
+        end_point: str,
+        priority: int = None,
+    ) -> float:
+        """
+        Returns
+        -------
+        float
+            0.0 if the request can go now or else the seconds to wait before trying again
+        """
+        if priority is None:
+            priority = self.get_priority(end_point=end_point)
+        end_point_class = self.get_end_point_class(end_point=end_point)
+        with self.lock:
+            return self.buckets[end_point_class].try_take(reserve=self.reserves[priority], now=perf_counter())
+
+    def acquire(
+        self,
+        end_point: str,
+        priority: int = None,
+    ):
+        """
+        Blocks until end_point can be requested
+        """
+        start = perf_counter()
+        while True:
+            wait = self.try_acquire(end_point=end_point, priority=priority)
+            if wait == 0.0:
+                break
+            sleep(wait)
+        self.__add_wait(end_point=end_point, seconds=perf_counter() - start)
+
+    async def async_acquire(
+        self,
+        end_point: str,
+        priority: int = None,
+    ):
+        start = perf_counter()
+        while True:
+            wait = self.try_acquire(end_point=end_point, priority=priority)
+            if wait == 0.0:
+                break
+            await asyncio.sleep(wait)
+        self.__add_wait(end_point=end_point, seconds=perf_counter() - start)
+
+    def __add_wait(
+        self,
+        end_point: str,
+        seconds: float,
+    ):
+        end_point_class = self.get_end_point_class(end_point=end_point)
+        with self.lock:
+            self.requests[end_point_class] += 1
+            if seconds > 0.001:
+                self.waits[end_point_class] += 1
+                self.wait_seconds[end_point_class] += seconds
+
+    def update_from_response(
+        self,
+        end_point: str,
+        status_code: int,
+        headers: dict,
+    ):
+        remaining = reset_ms_time = retry_after = None
+        try:
+            for name, value in headers.items():
+                name = name.lower()
+                if name.endswith("limit-status"):
+                    remaining = float(value)
+                elif name.endswith("limit-reset-timestamp"):
+                    reset_ms_time = float(value)
+                elif name == "retry-after":
+                    retry_after = float(value)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"RateLimitScheduler couldn't read the rate limit headers -> {e}")
+
+        if status_code == 429 or (remaining is not None and remaining <= 0):
+            if retry_after is None and reset_ms_time is not None:
+                retry_after = (reset_ms_time - time() * 1000) / 1000
+            if status_code == 429:
+                with self.lock:
+                    self.throttled += 1
+            self.pause(end_point=end_point, seconds=1.0 if retry_after is None else retry_after)
+        elif remaining is not None:
+            bucket = self.buckets[self.get_end_point_class(end_point=end_point)]
+            with self.lock:
+                bucket.tokens = min(bucket.tokens, remaining)
+
+    def pause(
+        self,
+        end_point: str,
+        seconds: float,
+    ):
+        """
+        No request of end_point's class goes out for the next seconds
+        """
+        end_point_class = self.get_end_point_class(end_point=end_point)
+        seconds = min(max(seconds, 0.0), 60.0)
+        logger.warning(f"RateLimitScheduler pausing {end_point_class} requests for {round(seconds, 3)} seconds")
+        with self.lock:
+            bucket = self.buckets[end_point_class]
+            bucket.tokens = 0.0
+            bucket.paused_until = max(bucket.paused_until, perf_counter() + seconds)
+
+    def get_stats(self):
+        with self.lock:
+            stats = {
+                end_point_class: {
+                    "requests": self.requests[end_point_class],
+                    "waits": self.waits[end_point_class],
+                    "wait_ms": round(self.wait_seconds[end_point_class] * 1000, 1),
+                    "tokens": round(self.buckets[end_point_class].tokens, 2),
+                }
+                for end_point_class in self.buckets
+            }
+            stats["throttled"] = self.throttled
+            return stats
+
+    def log_stats(self):
+        logger.info(f"RateLimitScheduler {self.get_stats()}")
@@ -0,0 +1,195 @@
+import hashlib
+import hmac
+import json
+
+from time import perf_counter, time
+
+try:
+    import orjson
+except ImportError:  # fall back to the json encoder made once below
+    orjson = None
+
+
+class _JSONEncoder(json.JSONEncoder):
+    def default(self, o):
+        # numpy scalars like np.float64 qtys and prices
+        if hasattr(o, "item"):
+            return o.item()
+        return super().default(o)
+
+
+_json_encoder = _JSONEncoder(separators=(",", ":"), check_circular=False)
+
+
+class MufexRequestSigner:
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        recv_window: str = "5000",
+        referer: str = "A6JVVHCXZ",
+    ):
+        """
+        Builds the body or query string and the headers of a signed Mufex request without redoing the parts that are
+        the same for every request
+
+        The HMAC is keyed with secret_key once and every signature starts from a copy of it, the header dicts are made
+        once and only get the timestamp and the signature filled in, and the params are serialized with orjson when
+        it is installed or else with one json encoder made up front, numpy scalars come out as plain numbers either
+        way and anything orjson can't serialize goes through the json encoder.
+
+            body, headers = request_signer.sign_post(params=params)
+            query, headers = request_signer.sign_get(params=params)
+        """
+        self.api_key = api_key
+        self.recv_window = recv_window
+        if api_key is None or secret_key is None:
+            self.__keyed_hmac = None
+        else:
+            self.__keyed_hmac = hmac.new(secret_key.encode("utf-8"), digestmod=hashlib.sha256)
+        self.__sign_prefix = f"{api_key}{recv_window}"
+        self.__get_headers = {
+            "MF-ACCESS-API-KEY": api_key,
+            "MF-ACCESS-SIGN-TYPE": "2",
+            "MF-ACCESS-RECV-WINDOW": recv_window,
+            "Content-Type": "application/json",
+        }
+        self.__post_headers = {**self.__get_headers, "X-Referer": referer}
+
+    def sign(
+        self,
+        timestamp: str,
+        params_as_string: str,
+    ) -> str:
+        if self.__keyed_hmac is None:
+            raise Exception("MufexRequestSigner needs an api_key and a secret_key to sign requests")
+        signature = self.__keyed_hmac.copy()
+        signature.update(f"{timestamp}{self.__sign_prefix}{params_as_string}".encode("utf-8"))
+        return signature.hexdigest()
+
+    def sign_post(
+        self,
+        params: dict,
+    ) -> tuple[str, dict]:
+        """
+        Returns
+        -------
+        tuple[str, dict]
+            the json body and the headers
+        """
+        timestamp = str(int(time() * 1000))
+        params_as_dict_string = self.get_params_as_json(params=params)
+        headers = self.__post_headers.copy()
+        headers["MF-ACCESS-SIGN"] = self.sign(timestamp=timestamp, params_as_string=params_as_dict_string)
+        headers["MF-ACCESS-TIMESTAMP"] = timestamp
+        return params_as_dict_string, headers
+
+    def sign_get(
+        self,
+        params: dict,
+    ) -> tuple[str, dict]:
+        """
+        Returns
+        -------
+        tuple[str, dict]
+            the query string without the ? and the headers
+        """
+        timestamp = str(int(time() * 1000))
+        params_as_path = self.get_params_as_path(params=params)
+        headers = self.__get_headers.copy()
+        headers["MF-ACCESS-SIGN"] = self.sign(timestamp=timestamp, params_as_string=params_as_path)
+        headers["MF-ACCESS-TIMESTAMP"] = timestamp
+        return params_as_path, headers
+
+    def get_params_as_json(
+        self,
+        params: dict,
+    ) -> str:
+        new_params = {key: value for key, value in params.items() if value is not None}
+        if orjson is not None:
+            try:
+                return orjson.dumps(new_params, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+            except TypeError:
+                pass
+        return _json_encoder.encode(new_params)
+
+    def get_params_as_path(
+        self,
+        params: dict,
+    ) -> str:
+        return "&".join(f"{key}={value}" for key, value in params.items() if value is not None)
+
+
+def benchmark_signer(
+    iterations: int = 100_000,
+) -> dict:
+    """
+    Times building a signed create order POST and open orders GET the way Mufex used to (a new hmac from the secret
+    bytes, json.dumps and a new header dict per request) against MufexRequestSigner
+
+    Returns
+    -------
+    dict
+        microseconds per request of both ways and how many times faster the signer is
+    """
+    api_key = "benchmark-api-key"
+    secret_key = "benchmark-secret-key-0123456789abcdef"
+    post_params = {
+        "symbol": "BTCUSDT",
+        "side": "Sell",
+        "positionIdx": 1,
+        "orderType": "Market",
+        "qty": "0.012",
+        "price": None,
+        "triggerDirection": 2,
+        "triggerPrice": "29123.5",
+        "timeInForce": "GoodTillCancel",
+        "orderLinkId": None,
+        "reduceOnly": True,
+        "closeOnTrigger": None,
+    }
+    get_params = {"symbol": "BTCUSDT", "limit": 50, "orderId": None}
+
+    def per_request():
+        for params, is_post in ((post_params, True), (get_params, False)):
+            timestamp = str(int(time() * 1000))
+            if is_post:
+                params_as_string = str(json.dumps({k: v for k, v in params.items() if v is not None}))
+            else:
+                params_as_string = "&".join(
+                    "{key}={value}".format(key=k, value=v) for k, v in params.items() if v is not None
+                )
+            param_str = timestamp + api_key + "5000" + params_as_string
+            signature = hmac.new(bytes(secret_key, "utf-8"), param_str.encode("utf-8"), hashlib.sha256).hexdigest()
+            headers = {
+                "MF-ACCESS-API-KEY": api_key,
+                "MF-ACCESS-SIGN": signature,
+                "MF-ACCESS-SIGN-TYPE": "2",
+                "MF-ACCESS-TIMESTAMP": timestamp,
+                "MF-ACCESS-RECV-WINDOW": "5000",
+                "Content-Type": "application/json",
+            }
+            if is_post:
+                headers["X-Referer"] = "A6JVVHCXZ"
+
+    request_signer = MufexRequestSigner(api_key=api_key, secret_key=secret_key)
+
+    def signer():
+        request_signer.sign_post(params=post_params)
+        request_signer.sign_get(params=get_params)
+
+    results = {}
+    for name, build in (("per_request_us", per_request), ("signer_us", signer)):
+        build()
+        start = perf_counter()
+        for _ in range(iterations):
+            build()
+        # two requests per iteration
+        results[name] = round((perf_counter() - start) / iterations / 2 * 1e6, 2)
+    results["speedup"] = round(results["per_request_us"] / results["signer_us"], 2)
+    results["json_encoder"] = "orjson" if orjson is not None else "json"
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark_signer())
@@ -0,0 +1,216 @@
+import numpy as np
+
+
+def cooldown_filter(
+    signals: np.array,
+    cooldown: int,
+    exits: np.array = None,
+    exit_cooldown: int = 0,
+):
+    """
+    Drops signals that come too soon after the last accepted signal or the last exit
+
+    A signal on bar i is kept when no signal was kept on bars i - cooldown to i - 1 and, with exits given, no exit
+    happened on bars i - exit_cooldown to i. Signals that get dropped don't start a cooldown of their own, same as
+    the signal_history loop this replaces.
+
+    Only the signal bars are walked, jumping from a kept signal straight to the first signal after its cooldown with
+    searchsorted, so it costs O(n) for the masks plus O(kept * log signals) instead of a slice per bar.
+
+    Parameters
+    ----------
+    signals : np.array
+        bool array, True where the strategy wants to enter
+    cooldown : int
+        bars after a kept signal where new signals are dropped, 0 keeps every signal
+    exits : np.array
+        bool array, True on bars where a trade was exited
+    exit_cooldown : int
+        bars from an exit, counting the exit bar, where new signals are dropped
+
+    Returns
+    -------
+    np.array
+        bool array of the kept signals
+    """
+    signals = np.asarray(signals, dtype=np.bool_)
+
+    if exits is not None and exit_cooldown > 0:
+        bar_index = np.arange(signals.size)
+        last_exit = np.maximum.accumulate(np.where(exits, bar_index, -exit_cooldown - 1))
+        signals = signals & (bar_index - last_exit > exit_cooldown)
+
+    signal_index = np.flatnonzero(signals)
+    if cooldown <= 0 or signal_index.size == 0:
+        return signals.copy()
+
+    kept = np.zeros(signals.size, dtype=np.bool_)
+    position = 0
+    while position < signal_index.size:
+        bar = signal_index[position]
+        kept[bar] = True
+        position = np.searchsorted(signal_index, bar + cooldown, side="right")
+    return kept
+
+
+def _lagged_windows(
+    size: int,
+    window,
+    lag: int,
+):
+    windows = np.atleast_1d(np.asarray(window, dtype=np.int_))
+    if np.any(windows < 1):
+        raise ValueError(f"Rolling windows have to be at least 1 bar, got {windows}")
+    # first bar where the whole window (bars i - lag - window + 1 to i - lag) is there
+    first_full = np.minimum(windows + lag - 1, size)
+    return windows, first_full, np.ndim(window) == 0
+
+
+def rolling_count(
+    condition: np.array,
+    window,
+    lag: int = 0,
+):
+    """
+    Number of True bars from i - lag - window + 1 to i - lag, worked out from one cumulative sum for every window
+
+    lag=1 leaves out the current bar, same as condition[i - window: i]. Bars without a full window are -1.
+
+    Parameters
+    ----------
+    condition : np.array
+        bool array
+    window : int or np.array
+        look back in bars, an array gives one row per window
+    lag : int
+        bars between the end of the window and the current bar
+
+    Returns
+    -------
+    np.array
+        int array, 2-D with one row per window when window is an array
+    """
+    condition = np.asarray(condition, dtype=np.bool_)
+    windows, first_full, single = _lagged_windows(size=condition.size, window=window, lag=lag)
+
+    cum_sum = np.zeros(condition.size + 1, dtype=np.int_)
+    np.cumsum(condition, out=cum_sum[1:])
+
+    counts = np.full((windows.size, condition.size), -1, dtype=np.int_)
+    for row, (bars, start) in enumerate(zip(windows, first_full)):
+        end = np.arange(start, condition.size) - lag + 1
+        counts[row, start:] = cum_sum[end] - cum_sum[end - bars]
+
+    return counts[0] if single else counts
+
+
+def rolling_any(
+    condition: np.array,
+    window,
+    lag: int = 0,
+):
+    """
+    True where condition was True on any bar of the window, False where the window isn't full, see rolling_count
+    """
+    return rolling_count(condition=condition, window=window, lag=lag) > 0
+
+
+def rolling_all(
+    condition: np.array,
+    window,
+    lag: int = 0,
+):
+    """
+    True where condition was True on every bar of the window, False where the window isn't full, see rolling_count
+    """
+    windows = np.asarray(window, dtype=np.int_)
+    counts = rolling_count(condition=condition, window=window, lag=lag)
+    return counts == (windows if windows.ndim == 0 else windows[:, None])
+
+
+def _rolling_extremum(
+    values: np.array,
+    window,
+    lag: int,
+    func: np.ufunc,
+):
+    """
+    Sparse table where level k holds func over the last 2 ** k bars, every window is answered from two overlapping
+    power of two blocks, O(n log(max window)) for the table and O(n) per window instead of O(n * window)
+
+    func is np.fmax / np.fmin to leave nan bars out of the window or np.maximum / np.minimum to make any window with
+    a nan in it nan
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows, first_full, single = _lagged_windows(size=values.size, window=window, lag=lag)
+    lagged = values[: values.size - lag] if lag else values
+    size = lagged.size
+
+    result = np.full((windows.size, values.size), np.nan)
+    max_window = int(windows[first_full < values.size].max(initial=0))
+    table = [lagged]
+    span = 1
+    while span * 2 <= max_window:
+        level = np.full(size, np.nan)
+        level[span * 2 - 1 :] = func(table[-1][span * 2 - 1 :], table[-1][span - 1 : size - span])
+        table.append(level)
+        span *= 2
+
+    for row, (bars, start) in enumerate(zip(windows, first_full)):
+        if start < values.size:
+            k = int(bars).bit_length() - 1
+            span = 1 << k
+            result[row, start:] = func(table[k][bars - 1 :], table[k][span - 1 : size - bars + span])
+
+    return result[0] if single else result
+
+
+def rolling_max(
+    values: np.array,
+    window,
+    lag: int = 0,
+    skip_nan: bool = True,
+):
+    """
+    Highest value from bar i - lag - window + 1 to i - lag, nan where the window isn't full, see rolling_count
+
+    skip_nan leaves nan bars out like the np.any(window > x) loops did, without it a window with a nan in it is nan
+    like np.max(window)
+    """
+    return _rolling_extremum(values=values, window=window, lag=lag, func=np.fmax if skip_nan else np.maximum)
+
+
+def rolling_min(
+    values: np.array,
+    window,
+    lag: int = 0,
+    skip_nan: bool = True,
+):
+    """
+    Lowest value from bar i - lag - window + 1 to i - lag, nan where the window isn't full, see rolling_max
+    """
+    return _rolling_extremum(values=values, window=window, lag=lag, func=np.fmin if skip_nan else np.minimum)
+
+
+def any_above(
+    values: np.array,
+    threshold,
+    window,
+    lag: int = 0,
+):
+    """
+    True where any value in the window is above threshold, threshold can be one number or one per bar
+    """
+    return rolling_max(values=values, window=window, lag=lag) > threshold
+
+
+def any_below(
+    values: np.array,
+    threshold,
+    window,
+    lag: int = 0,
+):
+    """
+    True where any value in the window is below threshold, threshold can be one number or one per bar
+    """
+    return rolling_min(values=values, window=window, lag=lag) < threshold
@@ -0,0 +1,749 @@
+import numpy as np
+
+from datetime import datetime
+from itertools import count
+from logging import getLogger
+from time import perf_counter
+
+from quantfreedom.enums import (
+    CandleBodyType,
+    ExchangeSettings,
+    LeverageModeType,
+    PositionModeType,
+    TriggerDirectionType,
+)
+from quantfreedom.exchanges.exchange import Exchange
+from quantfreedom.exchanges.mufex_exchange.mufex import MUFEX_TIMEFRAMES, UNIVERSAL_TIMEFRAMES
+
+logger = getLogger("info")
+
+
+class SimulatedMufex(Exchange):
+    def __init__(
+        self,
+        candles: np.array,
+        timeframe: str,
+        symbol: str = "BTCUSDT",
+        equity: float = 1000.0,
+        warmup_bars: int = 1000,
+        market_fee_pct: float = 0.0006,
+        limit_fee_pct: float = 0.0002,
+        mmr_pct: float = 0.005,
+        max_leverage: float = 100.0,
+        min_leverage: float = 1.0,
+        max_asset_size: float = 100.0,
+        min_asset_size: float = 0.001,
+        asset_tick_step: int = 3,
+        price_tick_step: int = 1,
+        leverage_tick_step: int = 2,
+    ):
+        """
+        In process paper trading stand in for Mufex that replays historical candles, so live mode can run through
+        months of bars in seconds without an account, a network connection or any waiting.
+
+        The exchange only knows the candles up to bar_index, it starts with warmup_bars candles closed and advance()
+        closes the next one. Market orders fill at the close of the last closed bar. Stop (trigger) and limit orders
+        rest until a bar closes through them, stops are checked before limits on the same bar like the backtester
+        does and a bar that opens past the price fills at the open. Once a position is flat its reduce only orders are
+        canceled. Fees come out of the wallet as orders fill and every closed position goes into the closed pnl with
+        both fees in it. There are no liquidations, liqPrice is only reported.
+
+        Only hedge mode positions are kept, the methods live mode uses have the same names, arguments, return values
+        and exceptions as Mufex. sleep doesn't wait, it only adds up the seconds that were skipped.
+        """
+        if timeframe not in UNIVERSAL_TIMEFRAMES:
+            raise Exception(f"Use one of these timeframes - {UNIVERSAL_TIMEFRAMES}")
+        if not 0 < warmup_bars <= candles.shape[0]:
+            raise Exception(f"SimulatedMufex warmup_bars has to be between 1 and {candles.shape[0]}")
+
+        self.candles = np.asarray(candles, dtype=np.float64)
+        self.timeframe = timeframe
+        self.timeframe_in_ms = self.get_timeframe_in_ms(timeframe=timeframe)
+        self.symbol = symbol
+        self.wallet_balance = equity
+        self.bar_index = warmup_bars - 1
+        self.position_mode = PositionModeType.HedgeMode
+        self.exchange_settings = ExchangeSettings(
+            asset_tick_step=asset_tick_step,
+            market_fee_pct=market_fee_pct,
+            limit_fee_pct=limit_fee_pct,
+            mmr_pct=mmr_pct,
+            max_leverage=max_leverage,
+            min_leverage=min_leverage,
+            max_asset_size=max_asset_size,
+            min_asset_size=min_asset_size,
+            position_mode=PositionModeType.HedgeMode,
+            leverage_mode=LeverageModeType.Isolated,
+            price_tick_step=price_tick_step,
+            leverage_tick_step=leverage_tick_step,
+        )
+
+        self.leverage = 1.0
+        self.positions = {
+            PositionModeType.BuySide: {"size": 0.0, "entryPrice": 0.0, "fees": 0.0},
+            PositionModeType.SellSide: {"size": 0.0, "entryPrice": 0.0, "fees": 0.0},
+        }
+        self.open_orders: dict[str, dict] = {}
+        self.fills: list[dict] = []
+        self.canceled_orders: list[dict] = []
+        self.closed_pnl: list[dict] = []
+        self.order_ids = count(1)
+        self.order_link_ids: set[str] = set()
+        self.slept_seconds = 0.0
+        self.last_fetched_ms_time = int(self.candles[self.bar_index, CandleBodyType.Timestamp])
+
+    ################################################################
+    ################################################################
+    ###################                          ###################
+    ###################          Replay          ###################
+    ###################                          ###################
+    ################################################################
+    ################################################################
+
+    def advance(self):
+        """
+        Closes the next bar and fills every resting order it went through
+
+        Returns
+        -------
+        bool
+            False once there are no bars left
+        """
+        if self.bar_index + 1 >= self.candles.shape[0]:
+            return False
+        self.bar_index += 1
+        candle = self.candles[self.bar_index]
+
+        stops = [order for order in self.open_orders.values() if order["triggerPrice"] != "0"]
+        limits = [order for order in self.open_orders.values() if order["triggerPrice"] == "0"]
+        for order in stops + limits:
+            if order["orderId"] not in self.open_orders:
+                continue
+            fill_price = self.__get_touched_price(order=order, candle=candle)
+            if fill_price is not None:
+                del self.open_orders[order["orderId"]]
+                fee_pct = self.exchange_settings.limit_fee_pct
+                if order["orderType"] == "Market":
+                    fee_pct = self.exchange_settings.market_fee_pct
+                self.__fill(order=order, price=fill_price, fee_pct=fee_pct)
+        return True
+
+    def sleep(
+        self,
+        seconds: float,
+    ):
+        self.slept_seconds += seconds
+
+    def get_current_price(self):
+        return self.candles[self.bar_index, CandleBodyType.Close]
+
+    def get_current_time_ms(self):
+        return int(self.candles[self.bar_index, CandleBodyType.Timestamp]) + self.timeframe_in_ms
+
+    def get_server_time_ms(self) -> int:
+        return self.get_current_time_ms()
+
+    def __get_touched_price(
+        self,
+        order: dict,
+        candle: np.array,
+    ):
+        open_price = candle[CandleBodyType.Open]
+        high = candle[CandleBodyType.High]
+        low = candle[CandleBodyType.Low]
+
+        if order["triggerPrice"] != "0":
+            trigger_price = float(order["triggerPrice"])
+            if order["triggerDirection"] == TriggerDirectionType.Fall and low <= trigger_price:
+                return min(open_price, trigger_price)
+            if order["triggerDirection"] == TriggerDirectionType.Rise and high >= trigger_price:
+                return max(open_price, trigger_price)
+            return None
+
+        price = float(order["price"])
+        if order["side"] == "Sell" and high >= price:
+            return max(open_price, price)
+        if order["side"] == "Buy" and low <= price:
+            return min(open_price, price)
+        return None
+
+    def __fill(
+        self,
+        order: dict,
+        price: float,
+        fee_pct: float,
+    ):
+        position = self.positions[order["positionIdx"]]
+        # buy side positions grow with buys, sell side positions with sells
+        direction = 1 if order["positionIdx"] == PositionModeType.BuySide else -1
+        increase = (order["side"] == "Buy") == (direction == 1)
+        qty = float(order["qty"])
+        if not increase:
+            qty = min(qty, position["size"])
+            if qty <= 0:
+                self.canceled_orders.append(order)
+                return
+        fee = qty * price * fee_pct
+        self.wallet_balance -= fee
+        ms_time = self.get_current_time_ms()
+
+        if increase:
+            new_size = position["size"] + qty
+            position["entryPrice"] = (position["size"] * position["entryPrice"] + qty * price) / new_size
+            position["size"] = new_size
+            position["fees"] += fee
+        else:
+            open_fees = position["fees"] * qty / position["size"]
+            pnl = direction * qty * (price - position["entryPrice"])
+            self.wallet_balance += pnl
+            self.closed_pnl.insert(
+                0,
+                {
+                    "symbol": order["symbol"],
+                    "orderId": order["orderId"],
+                    "side": order["side"],
+                    "qty": str(qty),
+                    "avgEntryPrice": str(position["entryPrice"]),
+                    "avgExitPrice": str(price),
+                    "closedPnl": str(pnl - open_fees - fee),
+                    "createdAt": str(ms_time),
+                },
+            )
+            position["fees"] -= open_fees
+            position["size"] = round(position["size"] - qty, 8)
+            if position["size"] == 0:
+                position["entryPrice"] = 0.0
+                position["fees"] = 0.0
+                self.__cancel_reduce_only_orders(position_idx=order["positionIdx"])
+
+        self.fills.insert(
+            0,
+            {
+                "orderId": order["orderId"],
+                "symbol": order["symbol"],
+                "side": order["side"],
+                "orderType": order["orderType"],
+                "execPrice": str(price),
+                "orderQty": order["qty"],
+                "execQty": str(qty),
+                "execValue": str(qty * price),
+                "execFee": str(fee),
+                "execTime": str(ms_time),
+            },
+        )
+
+    def __cancel_reduce_only_orders(
+        self,
+        position_idx: int,
+    ):
+        for order_id, order in list(self.open_orders.items()):
+            if order["reduceOnly"] and order["positionIdx"] == position_idx:
+                self.canceled_orders.append(self.open_orders.pop(order_id))
+
+    def __check_symbol(
+        self,
+        symbol: str,
+    ):
+        if symbol != self.symbol:
+            raise Exception(f"SimulatedMufex only has candles for {self.symbol} not {symbol}")
+
+    ################################################################
+    ################################################################
+    ###################                          ###################
+    ###################      Mufex interface     ###################
+    ###################                          ###################
+    ################################################################
+    ################################################################
+
+    def set_exchange_settings(
+        self,
+        leverage_mode: LeverageModeType,  # type: ignore
+        position_mode: PositionModeType,  # type: ignore
+        symbol: str,
+    ):
+        self.__check_symbol(symbol=symbol)
+        if position_mode != PositionModeType.HedgeMode:
+            raise Exception("SimulatedMufex only has hedge mode")
+        self.exchange_settings = self.exchange_settings._replace(leverage_mode=leverage_mode)
+
+    def get_exchange_timeframe(
+        self,
+        timeframe: str,
+    ):
+        try:
+            return MUFEX_TIMEFRAMES[UNIVERSAL_TIMEFRAMES.index(timeframe)]
+        except Exception as e:
+            raise Exception(f"Use one of these timeframes - {UNIVERSAL_TIMEFRAMES} -> {e}")
+
+    def get_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        since_datetime: datetime = None,
+        until_datetime: datetime = None,
+        candles_to_dl: int = 1500,
+        category: str = "linear",
+    ) -> np.array:
+        """
+        The last candles_to_dl closed candles, since_datetime and until_datetime are ignored
+        """
+        self.__check_symbol(symbol=symbol)
+        if timeframe != self.timeframe:
+            raise Exception(f"SimulatedMufex only has {self.timeframe} candles not {timeframe}")
+        first = max(self.bar_index + 1 - candles_to_dl, 0)
+        candles = self.candles[first : self.bar_index + 1]
+        self.last_fetched_ms_time = int(candles[-1, CandleBodyType.Timestamp])
+        return candles
+
+    def get_candles_since(
+        self,
+        symbol: str,
+        timeframe: str,
+        since_ms_time: int,
+        category: str = "linear",
+    ) -> np.array:
+        candles = self.get_candles(symbol=symbol, timeframe=timeframe, candles_to_dl=self.bar_index + 1)
+        return candles[candles[:, CandleBodyType.Timestamp] > since_ms_time]
+
+    def create_order(
+        self,
+        symbol: str,
+        buy_sell: str,
+        position_mode: PositionModeType,  # type: ignore
+        order_type: str,
+        asset_size: float,
+        time_in_force: str = "GoodTillCancel",
+        price: float = None,
+        triggerDirection: TriggerDirectionType = None,  # type: ignore
+        triggerPrice: str = None,
+        reduce_only: bool = None,
+        custom_order_id: str = None,
+        **kwargs,
+    ):
+        self.__check_symbol(symbol=symbol)
+        if custom_order_id and custom_order_id in self.order_link_ids:
+            raise Exception(f"SimulatedMufex create_order orderLinkId {custom_order_id} is a duplicate")
+        if position_mode not in self.positions:
+            raise Exception(f"SimulatedMufex create_order position_mode has to be 1 or 2 not {position_mode}")
+        if not self.exchange_settings.min_asset_size <= asset_size <= self.exchange_settings.max_asset_size:
+            raise Exception(f"SimulatedMufex create_order qty {asset_size} is outside the min and max asset size")
+        order = {
+            "orderId": f"sim-{next(self.order_ids)}",
+            "symbol": symbol,
+            "side": buy_sell.capitalize(),
+            "orderType": order_type.capitalize(),
+            "qty": str(asset_size),
+            "price": str(price) if price else "0",
+            "triggerPrice": str(triggerPrice) if triggerPrice else "0",
+            "triggerDirection": triggerDirection,
+            "reduceOnly": bool(reduce_only),
+            "positionIdx": position_mode,
+            "timeInForce": time_in_force,
+            "orderLinkId": custom_order_id or "",
+            "createdTime": str(self.get_current_time_ms()),
+        }
+        if custom_order_id:
+            self.order_link_ids.add(custom_order_id)
+
+        if order["orderType"] == "Market" and not triggerPrice:
+            self.__fill(order=order, price=self.get_current_price(), fee_pct=self.exchange_settings.market_fee_pct)
+        elif time_in_force == "PostOnly" and (
+            self.__get_touched_price(order=order, candle=np.full(4, self.get_current_price())) is not None
+        ):
+            # would have crossed the book so it never rests
+            self.canceled_orders.append(order)
+        else:
+            self.open_orders[order["orderId"]] = order
+        return order["orderId"]
+
+    def create_orders(
+        self,
+        orders: list[dict],
+    ) -> list:
+        results = []
+        for order in orders:
+            try:
+                results.append(self.create_order(**order))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def get_open_orders(
+        self,
+        symbol: str,
+        limit: int = 50,
+        order_id: str = None,
+        **kwargs,
+    ):
+        self.__check_symbol(symbol=symbol)
+        data_list = [
+            dict(order, orderStatus="Untriggered" if order["triggerPrice"] != "0" else "New")
+            for order in self.open_orders.values()
+            if order_id in (None, order["orderId"])
+        ][:limit]
+        try:
+            data_list[0]
+            return data_list
+        except Exception as e:
+            raise Exception(f"SimulatedMufex get_open_orders = Data or List is empty -> {e}")
+
+    def get_open_order_by_order_id(self, symbol: str, order_id: str):
+        return dict(sorted(self.get_open_orders(symbol=symbol, order_id=order_id)[0].items()))
+
+    def get_all_open_orders(
+        self,
+        symbol: str,
+        limit: int = 50,
+    ) -> list:
+        self.__check_symbol(symbol=symbol)
+        return [
+            dict(order, orderStatus="Untriggered" if order["triggerPrice"] != "0" else "New")
+            for order in self.open_orders.values()
+        ][:limit]
+
+    def get_open_order_ids(
+        self,
+        symbol: str,
+        limit: int = 50,
+    ) -> set:
+        return {order["orderId"] for order in self.get_all_open_orders(symbol=symbol, limit=limit)}
+
+    def get_filled_orders(
+        self,
+        symbol: str,
+        limit: int = 200,
+        order_id: str = None,
+        **kwargs,
+    ):
+        self.__check_symbol(symbol=symbol)
+        data_list = [fill for fill in self.fills if order_id in (None, fill["orderId"])][:limit]
+        try:
+            data_list[0]
+            return data_list
+        except Exception as e:
+            raise Exception(f"SimulatedMufex get_filled_orders = Data or List is empty -> {e}")
+
+    def get_filled_order_by_order_id(
+        self,
+        symbol: str,
+        order_id: str,
+    ):
+        return dict(sorted(self.get_filled_orders(symbol=symbol, order_id=order_id)[0].items()))
+
+    def get_all_filled_orders(
+        self,
+        symbol: str,
+        limit: int = 200,
+    ) -> list:
+        self.__check_symbol(symbol=symbol)
+        return self.fills[:limit]
+
+    def check_if_order_filled(
+        self,
+        symbol: str,
+        order_id: str,
+    ):
+        try:
+            if self.get_filled_orders(symbol=symbol, order_id=order_id)[0]["orderId"] == order_id:
+                return True
+            else:
+                raise Exception
+        except Exception as e:
+            raise Exception(f"SimulatedMufex check_if_order_filled -> {e}")
+
+    def check_if_order_open(
+        self,
+        symbol: str,
+        order_id: str,
+    ):
+        try:
+            if self.get_open_orders(symbol=symbol, order_id=order_id)[0]["orderId"] == order_id:
+                return True
+            else:
+                raise Exception
+        except Exception as e:
+            raise Exception(f"SimulatedMufex check_if_order_open -> {e}")
+
+    def check_if_order_canceled(
+        self,
+        symbol: str,
+        order_id: str,
+    ):
+        if any(order["orderId"] == order_id for order in self.canceled_orders):
+            return True
+        raise Exception(f"SimulatedMufex check_if_order_canceled -> {order_id} wasn't canceled")
+
+    def cancel_open_order(
+        self,
+        symbol: str,
+        order_id: str = None,
+        **kwargs,
+    ):
+        self.__check_symbol(symbol=symbol)
+        order = self.open_orders.pop(order_id, None)
+        if order is None:
+            raise Exception(f"SimulatedMufex cancel_open_order message= order not exists or too late to cancel")
+        self.canceled_orders.append(order)
+        return True
+
+    def cancel_all_open_orders_per_symbol(
+        self,
+        symbol: str,
+    ):
+        self.__check_symbol(symbol=symbol)
+        self.canceled_orders.extend(self.open_orders.values())
+        self.open_orders = {}
+        return True
+
+    def adjust_order(
+        self,
+        params: dict = {},
+    ):
+        order = self.open_orders.get(params.get("orderId"))
+        if order is None:
+            raise Exception(f"SimulatedMufex adjust_order message = order not exists or too late to replace")
+        for key in ["qty", "price", "triggerPrice"]:
+            if params.get(key) is not None:
+                order[key] = params[key]
+        return True
+
+    def move_limit_order(
+        self,
+        symbol: str,
+        order_id: str,
+        new_price: float,
+        asset_size: float,
+    ):
+        params = {}
+        params["symbol"] = symbol
+        params["orderId"] = order_id
+        params["qty"] = str(asset_size)
+        params["price"] = str(new_price)
+        return self.adjust_order(params=params)
+
+    def move_stop_order(
+        self,
+        symbol: str,
+        order_id: str,
+        new_price: float,
+        asset_size: float,
+    ):
+        params = {}
+        params["symbol"] = symbol
+        params["orderId"] = order_id
+        params["qty"] = str(asset_size)
+        params["triggerPrice"] = str(new_price)
+        return self.adjust_order(params=params)
+
+    def set_leverage(
+        self,
+        symbol: str,
+        leverage: float,
+    ):
+        self.__check_symbol(symbol=symbol)
+        self.leverage = float(leverage)
+        return True
+
+    def get_position_info(
+        self,
+        symbol: str = None,
+        **kwargs,
+    ):
+        self.__check_symbol(symbol=symbol)
+        data_list = []
+        for position_idx, position in self.positions.items():
+            size = position["size"]
+            entry_price = position["entryPrice"]
+            if not size:
+                liq_price = 0
+            elif position_idx == PositionModeType.BuySide:
+                liq_price = entry_price * (1 - 1 / self.leverage + self.exchange_settings.mmr_pct)
+            else:
+                liq_price = entry_price * (1 + 1 / self.leverage - self.exchange_settings.mmr_pct)
+            data_list.append(
+                {
+                    "symbol": symbol,
+                    "positionIdx": position_idx,
+                    "side": ("Buy" if position_idx == PositionModeType.BuySide else "Sell") if size else "None",
+                    "size": str(size),
+                    "positionValue": str(size * entry_price) if size else "",
+                    "entryPrice": str(entry_price),
+                    "leverage": str(self.leverage),
+                    "liqPrice": str(liq_price),
+                    "unrealisedPnl": str(self.__get_unrealized_pnl(position_idx=position_idx)),
+                }
+            )
+        return data_list
+
+    def get_long_hedge_mode_position_info(
+        self,
+        symbol: str,
+    ):
+        return dict(sorted(self.get_position_info(symbol=symbol)[0].items()))
+
+    def __get_unrealized_pnl(
+        self,
+        position_idx: int,
+    ):
+        position = self.positions[position_idx]
+        direction = 1 if position_idx == PositionModeType.BuySide else -1
+        return direction * position["size"] * (self.get_current_price() - position["entryPrice"])
+
+    def get_wallet_info(
+        self,
+        trading_with: str = None,
+    ):
+        equity = self.wallet_balance + sum(self.__get_unrealized_pnl(position_idx=idx) for idx in self.positions)
+        return [{"coin": trading_with, "equity": str(equity), "walletBalance": str(self.wallet_balance)}]
+
+    def get_equity_of_asset(
+        self,
+        trading_with: str,
+    ):
+        return float(self.get_wallet_info(trading_with=trading_with)[0]["equity"])
+
+    def get_closed_pnl(
+        self,
+        symbol: str,
+        limit: int = 200,
+        **kwargs,
+    ):
+        self.__check_symbol(symbol=symbol)
+        data_list = self.closed_pnl[:limit]
+        try:
+            data_list[0]
+            return data_list
+        except Exception as e:
+            raise Exception(f"SimulatedMufex get_closed_pnl = Data or List is empty -> {e}")
+
+    def get_latest_pnl_result(
+        self,
+        symbol: str,
+    ):
+        return float(self.get_closed_pnl(symbol=symbol)[0]["closedPnl"])
+
+    def create_long_hedge_mode_entry_market_order(
+        self,
+        asset_size: float,
+        symbol: str,
+    ):
+        return self.create_order(
+            symbol=symbol,
+            position_mode=1,
+            buy_sell="Buy",
+            order_type="Market",
+            asset_size=asset_size,
+            time_in_force="GoodTillCancel",
+        )
+
+    def create_long_hedge_mode_tp_limit_order(
+        self,
+        asset_size: float,
+        symbol: str,
+        tp_price: float,
+    ):
+        return self.create_order(
+            **self.get_long_hedge_mode_tp_limit_order_params(
+                asset_size=asset_size,
+                symbol=symbol,
+                tp_price=tp_price,
+            )
+        )
+
+    def get_long_hedge_mode_tp_limit_order_params(
+        self,
+        asset_size: float,
+        symbol: str,
+        tp_price: float,
+    ) -> dict:
+        return {
+            "symbol": symbol,
+            "position_mode": 1,
+            "buy_sell": "Sell",
+            "order_type": "Limit",
+            "asset_size": asset_size,
+            "price": tp_price,
+            "reduce_only": True,
+            "time_in_force": "PostOnly",
+        }
+
+    def create_long_hedge_mode_sl_order(
+        self,
+        asset_size: float,
+        symbol: str,
+        trigger_price: float,
+    ):
+        return self.create_order(
+            **self.get_long_hedge_mode_sl_order_params(
+                asset_size=asset_size,
+                symbol=symbol,
+                trigger_price=trigger_price,
+            )
+        )
+
+    def get_long_hedge_mode_sl_order_params(
+        self,
+        asset_size: float,
+        symbol: str,
+        trigger_price: float,
+    ) -> dict:
+        return {
+            "symbol": symbol,
+            "position_mode": 1,
+            "buy_sell": "Sell",
+            "order_type": "Market",
+            "asset_size": asset_size,
+            "triggerPrice": trigger_price,
+            "reduce_only": True,
+            "triggerDirection": TriggerDirectionType.Fall,
+            "time_in_force": "GoodTillCancel",
+        }
+
+
+def replay_live_mode(
+    live_mode,
+    exchange: SimulatedMufex,
+    candles_to_dl: int,
+    max_bars: int = None,
+):
+    """
+    Runs live_mode.run_bar on every bar exchange has left, the same way MufexLiveMode.run does after each bar close
+    but without waiting for anything. live_mode has to have been made with exchange.
+
+    Returns
+    -------
+    dict
+        bars, seconds, bars_per_sec, errors, fills, closed_trades, total_pnl, equity and slept_seconds, the time the
+        sleeps in run_bar would have taken
+    """
+    bars = 0
+    errors = 0
+    start = perf_counter()
+    while (max_bars is None or bars < max_bars) and exchange.advance():
+        candles = exchange.get_candles(
+            symbol=exchange.symbol,
+            timeframe=exchange.timeframe,
+            candles_to_dl=candles_to_dl,
+        )
+        try:
+            live_mode.run_bar(candles=candles)
+        except Exception as e:
+            logger.error(f"Exception -> {e}")
+            live_mode.last_pnl = 0
+            errors += 1
+        bars += 1
+    seconds = perf_counter() - start
+
+    stats = {
+        "bars": bars,
+        "seconds": round(seconds, 3),
+        "bars_per_sec": round(bars / seconds, 1) if seconds else 0.0,
+        "errors": errors,
+        "fills": len(exchange.fills),
+        "closed_trades": len(exchange.closed_pnl),
+        "total_pnl": round(sum(float(pnl["closedPnl"]) for pnl in exchange.closed_pnl), 4),
+        "equity": round(exchange.get_equity_of_asset(trading_with="USDT"), 4),
+        "slept_seconds": exchange.slept_seconds,
+    }
+    logger.info(f"Replayed live mode {stats}")
+    return stats